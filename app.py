@@ -3,17 +3,50 @@ PrintForge Pricing Calculator - Flask Web Application
 Clean web-based interface with Ant Design styling
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 from datetime import datetime
+import io
 import json
 import os
+import re
 from pathlib import Path
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-import tempfile
+
+import assets
+import backup_store
+import bulk_quotes
+import export_jobs
+import file_transfer
+import history_store
+import metrics
+import pricing_engine
+import printer_registry
+import quote_sessions
+from pricing_engine import Job, QuoteCache, RateCard, RateCardCache
+
+# excel_export (openpyxl), batch_pricing / mesh_analysis / risk_pricing (NumPy) and gcode_metadata
+# are imported by the routes that use them, so startup doesn't pay for them
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'printforge-pricing-2026'
+app.config['METRICS_ENABLED'] = os.environ.get('PRINTFORGE_METRICS', '').lower() in ('1', 'true', 'yes')
+
+# Per-route latency/size histograms served at /metrics (None when metrics are off)
+request_metrics = metrics.init_app(app, app.config['METRICS_ENABLED'])
+
+# Fingerprinted, precompressed static files built by `python assets.py`, served from /assets/
+static_assets = assets.init_app(app)
+
+# Derived machine/electricity rates, reused across quotes with the same settings
+rate_cards = RateCardCache(maxsize=32)
+
+# Encoded /calculate bodies keyed on a hash of the normalized inputs (also used as the ETag)
+quote_cache = QuoteCache(maxsize=1024)
+
+# Encoded /risk-quote bodies keyed on a hash of the inputs and risk settings
+risk_cache = QuoteCache(maxsize=128)
+
+# Live quote forms: last inputs/components per open form, updated with only the changed fields
+sessions = quote_sessions.QuoteSessionStore()
 
 # Ensure directories exist
 # Note: For desktop app, this will be set in app_desktop.py
@@ -23,10 +56,61 @@ if not getattr(sys, 'frozen', False):
     # Running as web app (not frozen exe)
     UPLOAD_FOLDER = Path('uploads')
     UPLOAD_FOLDER.mkdir(exist_ok=True)
+    DATA_FOLDER = Path('data')
+    DATA_FOLDER.mkdir(exist_ok=True)
 else:
     # Running as frozen exe - will be set by app_desktop.py
     UPLOAD_FOLDER = Path(os.environ.get('APPDATA', '')) / 'PrintForge' / 'uploads'
     UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
+    DATA_FOLDER = Path(os.environ.get('APPDATA', '')) / 'PrintForge' / 'data'
+    DATA_FOLDER.mkdir(parents=True, exist_ok=True)
+
+# Server-side stores (SQLite files under DATA_FOLDER)
+history = history_store.HistoryStore(DATA_FOLDER / 'history.db')
+
+# Saved printers with precomputed rates; payloads naming a printer_id get its machine settings
+registered_printers = printer_registry.PrinterRegistry(DATA_FOLDER / 'printers.db')
+
+# Snapshots of the browser's saved data as deduplicated, compressed chunks
+backups = backup_store.BackupStore(DATA_FOLDER / 'backups.db')
+
+# Excel exports run here so building a large workbook never ties up a request thread; jobs are
+# spooled to data/exports so any serve.py worker process can answer a poll or download
+export_queue = export_jobs.ExportJobQueue(
+    max_workers=int(os.environ.get('PRINTFORGE_EXPORT_WORKERS', export_jobs.DEFAULT_WORKERS)),
+    spool_dir=DATA_FOLDER / 'exports'
+)
+
+# Clients allowed to name files on the server by path (the desktop app serves on 127.0.0.1)
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+# File types /parse-gcode and /analyze-model will open by path
+GCODE_FILE_TYPES = ('.gcode', '.gco', '.g', '.3mf')
+MODEL_FILE_TYPES = ('.stl', '.3mf')
+
+def local_path(filepath, file_types=None):
+    """
+    Check a 'filepath' sent in a request body before the server opens it
+
+    Paths are only accepted from this computer (desktop mode); anyone else on the
+    network has to upload the file instead.
+
+    Args:
+        filepath: Path from the request
+        file_types: Allowed extensions, or None for any
+
+    Returns:
+        Path: The checked path
+
+    Raises:
+        PermissionError: The request came from another machine or names another file type
+    """
+    if request.remote_addr not in LOCAL_ADDRESSES:
+        raise PermissionError('File paths are only accepted from this computer; upload the file instead')
+    path = Path(filepath)
+    if file_types and path.suffix.lower() not in file_types:
+        raise PermissionError(f'Unsupported file type: {path.suffix or path.name}')
+    return path
 
 @app.route('/')
 def index():
@@ -35,100 +119,715 @@ def index():
 
 @app.route('/calculate', methods=['POST'])
 def calculate():
-    """Calculate pricing based on input data"""
+    """Calculate pricing based on input data (machine settings come from 'printer_id' when given)"""
     try:
-        data = request.json
-        
-        # Extract basic info
-        filament_cost = float(data.get('filament_cost', 40.0))
-        filament_required = float(data.get('filament_required', 0.0))
-        print_time = float(data.get('print_time', 0.0))
-        labor_time = float(data.get('labor_time', 0))
-        
-        # Extract hardware items
-        hardware_items = data.get('hardware_items', [])
-        hardware_total = sum(item['quantity'] * item['unit_cost'] 
-                           for item in hardware_items)
-        
-        # Extract packaging items
-        packaging_items = data.get('packaging_items', [])
-        packaging_total = sum(item['quantity'] * item['unit_cost'] 
-                            for item in packaging_items)
-        shipping_cost = float(data.get('shipping_cost', 0.0))
-        
-        # Extract advanced settings
-        printer_cost = float(data.get('printer_cost', 1000.0))
-        upfront_cost = float(data.get('upfront_cost', 0.0))
-        annual_maintenance = float(data.get('annual_maintenance', 75.0))
-        printer_life = float(data.get('printer_life', 3.0))
-        average_uptime = float(data.get('average_uptime', 50.0))
-        
-        power_consumption = float(data.get('power_consumption', 250.0))
-        electricity_rate = float(data.get('electricity_rate', 0.30))
-        electricity_daily = float(data.get('electricity_daily', 1.50))
-        
-        efficiency_factor = float(data.get('efficiency_factor', 1.1))
-        labor_rate = float(data.get('labor_rate', 20.0))
-        
-        # Calculate material cost
-        material_cost = (filament_required / 1000) * filament_cost * efficiency_factor
-        
-        # Calculate labor cost
-        labor_cost = (labor_time / 60) * labor_rate
-        
-        # Calculate machine depreciation cost
-        total_printer_cost = printer_cost + upfront_cost
-        annual_cost = annual_maintenance
-        lifetime_cost = total_printer_cost + (annual_cost * printer_life)
-        
-        hours_per_year = 365.25 * 24
-        uptime_fraction = average_uptime / 100
-        total_uptime_hours = hours_per_year * printer_life * uptime_fraction
-        
-        cost_per_hour = lifetime_cost / total_uptime_hours if total_uptime_hours > 0 else 0
-        machine_depreciation = print_time * cost_per_hour
-        
-        # Calculate electricity cost
-        power_kw = power_consumption / 1000
-        electricity_usage = power_kw * print_time * electricity_rate
-        electricity_fixed = (print_time / 24) * electricity_daily
-        electricity_cost = electricity_usage + electricity_fixed
-        
-        machine_cost_total = machine_depreciation + electricity_cost
-        
-        # Calculate packaging cost
-        total_packaging = packaging_total + shipping_cost
-        
-        # Calculate total landed cost
-        total_cost = material_cost + labor_cost + machine_cost_total + total_packaging
-        
-        # Calculate pricing at different margins
-        def calc_price(margin):
-            return total_cost / (1 - margin / 100) if margin < 100 else 0
-        
-        price_50 = calc_price(50)
-        price_60 = calc_price(60)
-        price_70 = calc_price(70)
-        custom_margin = float(data.get('custom_margin', 75))
-        price_custom = calc_price(custom_margin)
+        data = registered_printers.apply(request.json)
+        job = Job.from_dict(data)
+        etag = pricing_engine.quote_key(RateCard.settings_key(data), job)
+
+        # Same inputs as the client's last quote: nothing to send
+        if etag in request.if_none_match:
+            quote_cache.record_not_modified()
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        body = quote_cache.get(etag)
+        if body is None:
+            quote = pricing_engine.price(job, rate_cards.get(data))
+            response = jsonify({'success': True, **quote})
+            quote_cache.put(etag, response.get_data())
+        else:
+            response = app.response_class(body, mimetype=app.json.mimetype)
+
+        response.set_etag(etag)
+        return response
         
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/calculate-batch', methods=['POST'])
+def calculate_batch():
+    """
+    Price many jobs in one request
+    Expects: the /calculate settings plus 'jobs': [{ 'filament_required': .., 'print_time': .., 'quantity': .. }]
+    Any job field left out falls back to the top-level value; a job with a 'printer_id'
+    uses that printer's machine and electricity rates.
+    """
+    try:
+        import batch_pricing
+
+        data = registered_printers.apply(request.json)
+        jobs = data.get('jobs', [])
+        results = batch_pricing.price_batch(jobs, rate_cards.get(data), Job.from_dict(data), registered_printers)
+
         return jsonify({
             'success': True,
-            'material_cost': round(material_cost, 2),
-            'labor_cost': round(labor_cost, 2),
-            'machine_depreciation': round(machine_depreciation, 2),
-            'electricity_cost': round(electricity_cost, 2),
-            'machine_cost_total': round(machine_cost_total, 2),
-            'packaging_cost': round(total_packaging, 2),
-            'total_cost': round(total_cost, 2),
-            'price_50': round(price_50, 2),
-            'price_60': round(price_60, 2),
-            'price_70': round(price_70, 2),
-            'price_custom': round(price_custom, 2),
-            'custom_margin': custom_margin,
-            'cost_per_hour': round(cost_per_hour, 4)
+            'count': len(jobs),
+            'custom_margin': float(data.get('custom_margin', 75)),
+            'results': results
         })
-        
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/risk-quote', methods=['POST'])
+def risk_quote():
+    """
+    Monte Carlo landed-cost bands for one part
+    Expects: the /calculate payload plus optional 'failure_rate', 'material_volatility',
+             'time_overrun', 'time_spread' (%), 'uptime_spread' (percentage points),
+             'target_probability' (%) and 'trials'
+    Results are cached on the inputs (which also seed the simulation) and sent with an ETag.
+    """
+    try:
+        import risk_pricing
+
+        data = registered_printers.apply(request.json)
+        job = Job.from_dict(data)
+        model = risk_pricing.RiskModel.from_dict(data)
+        etag = risk_pricing.risk_key(RateCard.settings_key(data), job, model)
+
+        if etag in request.if_none_match:
+            risk_cache.record_not_modified()
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        body = risk_cache.get(etag)
+        if body is None:
+            result = risk_pricing.risk_quote(job, rate_cards.get(data), model, seed=int(etag, 16))
+            response = jsonify({'success': True, **result})
+            risk_cache.put(etag, response.get_data())
+        else:
+            response = app.response_class(body, mimetype=app.json.mimetype)
+
+        response.set_etag(etag)
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/schedule', methods=['POST'])
+def schedule():
+    """
+    Schedule a batch on a printer farm and return lead time, utilization and machine cost
+    Expects: the /calculate settings (defaults for every printer) plus
+             'printers': [{ 'name': 'MK4', 'count': 6, 'speed': 1.0, 'hours_per_day': 20,
+                            'available_from': 0, 'materials': ['PLA', 'PETG'], 'printer_cost': 1100, ... }],
+             (a fleet entry with a 'printer_id' uses that registered printer's settings)
+             'jobs': [{ 'print_time': 3.5, 'quantity': 40, 'material': 'PLA' }],
+             optional 'changeover_hours' between prints
+    """
+    try:
+        import farm_scheduler
+
+        data = registered_printers.apply(request.json)
+        base = {key: value for key, value in data.items() if key not in ('printers', 'jobs')}
+        printers = farm_scheduler.build_fleet(
+            [registered_printers.apply(entry) for entry in data.get('printers', [])],
+            base,
+            rate_cards
+        )
+
+        result = farm_scheduler.schedule(
+            data.get('jobs', []),
+            printers,
+            changeover_hours=float(data.get('changeover_hours', 0.0))
+        )
+
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/quantity-breaks', methods=['POST'])
+def quantity_breaks():
+    """
+    Price one part at several order quantities, nesting copies on the build plate
+    Expects: the /calculate payload for a single part plus
+             'part_width', 'part_depth' (footprint, mm) or 'parts_per_plate',
+             optional 'bed_width', 'bed_depth', 'spacing' (mm), 'quantities': [1, 10, 50, 100, 500],
+             'part_labor_time' (minutes per part) and 'plate_overhead_time' (hours per plate)
+    Labor time in the payload is charged once per plate.
+    """
+    try:
+        import plate_nesting
+
+        data = registered_printers.apply(request.json)
+        nesting = None
+        if data.get('parts_per_plate'):
+            per_plate = int(data['parts_per_plate'])
+        elif float(data.get('part_width') or 0) > 0 and float(data.get('part_depth') or 0) > 0:
+            nesting = plate_nesting.parts_per_plate(
+                float(data['part_width']),
+                float(data['part_depth']),
+                float(data.get('bed_width') or plate_nesting.DEFAULT_BED_WIDTH),
+                float(data.get('bed_depth') or plate_nesting.DEFAULT_BED_DEPTH),
+                float(data.get('spacing', plate_nesting.DEFAULT_SPACING))
+            )
+            per_plate = nesting['count']
+        else:
+            per_plate = 1
+
+        rows = plate_nesting.quantity_breaks(
+            Job.from_dict(data),
+            rate_cards.get(data),
+            per_plate,
+            quantities=data.get('quantities') or plate_nesting.DEFAULT_QUANTITIES,
+            part_labor_time=float(data.get('part_labor_time', 0.0)),
+            plate_overhead_time=float(data.get('plate_overhead_time', 0.0))
+        )
+
+        return jsonify({
+            'success': True,
+            'parts_per_plate': per_plate,
+            'nesting': nesting,
+            'breaks': rows
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/nest', methods=['POST'])
+def nest():
+    """
+    Pack a mixed set of parts onto build plates
+    Expects: { 'parts': [{ 'name': 'Bracket', 'width': 40, 'depth': 25, 'quantity': 12 }],
+               optional 'bed_width', 'bed_depth', 'spacing' (mm) }
+    """
+    try:
+        import plate_nesting
+
+        data = request.json
+        plates = plate_nesting.pack_plates(
+            data.get('parts', []),
+            float(data.get('bed_width') or plate_nesting.DEFAULT_BED_WIDTH),
+            float(data.get('bed_depth') or plate_nesting.DEFAULT_BED_DEPTH),
+            float(data.get('spacing', plate_nesting.DEFAULT_SPACING))
+        )
+
+        return jsonify({
+            'success': True,
+            'plate_count': len(plates),
+            'plates': plates
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/compare', methods=['POST'])
+def compare():
+    """
+    Price several scenarios of one quote in a single request
+    Expects: the /calculate payload as the shared base, plus
+             'scenarios': [{ 'name': 'PETG', 'filament_cost': 55, 'print_time': 3.5 }, ...]
+    Returns the scenarios ranked cheapest first, with deltas against the cheapest.
+    """
+    try:
+        data = registered_printers.apply(request.json)
+        scenarios = [registered_printers.apply(scenario) for scenario in data.get('scenarios', [])]
+        if not scenarios:
+            return jsonify({'success': False, 'error': 'No scenarios to compare'}), 400
+        base = {key: value for key, value in data.items() if key != 'scenarios'}
+
+        ranked = pricing_engine.compare(base, scenarios, rate_cards)
+
+        return jsonify({
+            'success': True,
+            'count': len(ranked),
+            'cheapest': ranked[0]['name'],
+            'results': ranked
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/quote-sessions', methods=['POST'])
+def create_quote_session():
+    """
+    Open a live quote session from a full /calculate payload
+    Later edits are posted to /quote-sessions/<id> as just the changed fields.
+    """
+    try:
+        session = sessions.create(registered_printers.apply(request.json))
+        return jsonify({
+            'success': True,
+            'session_id': session.id,
+            'seq': session.seq,
+            **session.quote
+        }), 201
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/quote-sessions/<session_id>', methods=['POST', 'PATCH'])
+def update_quote_session(session_id):
+    """
+    Apply changed fields to a live quote and return the new totals
+    Expects: only the /calculate fields that changed, e.g. { 'print_time': 4.25 }
+    Returns the quote plus which cost components were recomputed.
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({'success': False, 'error': 'Quote session expired'}), 404
+    try:
+        quote, recomputed = session.update(registered_printers.apply(request.json or {}))
+        return jsonify({
+            'success': True,
+            'seq': session.seq,
+            'recomputed': recomputed,
+            **quote
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/quote-sessions/<session_id>', methods=['DELETE'])
+def close_quote_session(session_id):
+    """Close a live quote session"""
+    return jsonify({'success': sessions.close(session_id)})
+
+@app.route('/calculate-stream', methods=['POST'])
+def calculate_stream():
+    """
+    Price a large NDJSON or CSV body of job rows, streaming priced rows back
+    Shop settings and job defaults come from the query string, e.g. ?filament_cost=45&labor_rate=25
+    The body is read lazily and priced in chunks, so memory stays flat for any input size.
+    Malformed rows are reported per row instead of failing the whole request.
+    """
+    try:
+        fmt = request.args.get('format')
+        if not fmt:
+            fmt = 'csv' if request.mimetype in ('text/csv', 'application/csv') else 'ndjson'
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({'success': False, 'error': f'Unsupported format: {fmt}'}), 400
+
+        chunk_size = int(request.args.get('chunk_size', bulk_quotes.DEFAULT_CHUNK_SIZE))
+        if chunk_size < 1:
+            return jsonify({'success': False, 'error': 'chunk_size must be at least 1'}), 400
+
+        # format and chunk_size control the stream; everything else is a shop setting or job default
+        settings = request.args.to_dict()
+        settings.pop('format', None)
+        settings.pop('chunk_size', None)
+        rate_card = rate_cards.get(settings)
+
+        # Raw byte lines: each row is decoded on its own, so bad UTF-8 is reported per row
+        output = bulk_quotes.stream_quotes(request.stream, rate_card, settings, fmt, chunk_size)
+        mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        return Response(stream_with_context(output), mimetype=mimetype)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 when quotes can be served, 503 while the server is shutting down"""
+    if app.config.get('SHUTTING_DOWN'):
+        return jsonify({'ready': False, 'reason': 'shutting down'}), 503
+    try:
+        history.ping()
+    except Exception as e:
+        return jsonify({'ready': False, 'reason': str(e)}), 503
+    return jsonify({'ready': True})
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Report hit/miss counters for the server-side caches"""
+    return jsonify({
+        'success': True,
+        'rate_cards': rate_cards.stats(),
+        'quotes': quote_cache.stats(),
+        'risk_quotes': risk_cache.stats(),
+        'quote_sessions': len(sessions)
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint (404 unless PRINTFORGE_METRICS is set)"""
+    if request_metrics is None:
+        return jsonify({'success': False, 'error': 'Metrics are disabled'}), 404
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def history_filters(args):
+    """Read history filters from query-string args"""
+    return {
+        'starred': args.get('starred') in ('1', 'true'),
+        'material': args.get('material', ''),
+        'client': args.get('client', ''),
+        'part_name': args.get('part_name', ''),
+        'days': args.get('days', type=int),
+    }
+
+@app.route('/history', methods=['GET'])
+def list_history():
+    """
+    Paginated quote history, newest first
+    Query: page, per_page, starred, material, client, part_name (prefix), days
+    """
+    try:
+        result = history.query(
+            history_filters(request.args),
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', 20, type=int)
+        )
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/history', methods=['POST'])
+def add_history():
+    """Append a quote to history"""
+    try:
+        entry = history.add(request.json)
+        return jsonify({'success': True, 'entry': entry})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/history/import', methods=['POST'])
+def import_history():
+    """
+    Import quotes saved in the browser before history moved server-side
+    Expects: { 'entries': [...] }
+    """
+    try:
+        count = history.add_many(request.json.get('entries', []))
+        return jsonify({'success': True, 'imported': count})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/history/stats', methods=['GET'])
+def history_stats():
+    """Aggregates (count, average/min/max cost, per-material) plus chart points for the filtered history"""
+    try:
+        filters = history_filters(request.args)
+        return jsonify({
+            'success': True,
+            'stats': history.stats(filters),
+            'series': history.series(filters, limit=request.args.get('limit', 500, type=int))
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/history/<int:entry_id>/star', methods=['POST'])
+def star_history(entry_id):
+    """Star or unstar a quote. Expects: { 'starred': true|false }"""
+    if not history.set_starred(entry_id, bool(request.json.get('starred'))):
+        return jsonify({'success': False, 'error': 'Quote not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/history/<int:entry_id>', methods=['DELETE'])
+def delete_history(entry_id):
+    """Remove a quote from history"""
+    if not history.delete(entry_id):
+        return jsonify({'success': False, 'error': 'Quote not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/history', methods=['DELETE'])
+def clear_history():
+    """Remove every quote from history"""
+    history.clear()
+    return jsonify({'success': True})
+
+@app.route('/printers', methods=['GET'])
+def list_printers():
+    """Registered printers with their settings and precomputed cost/electricity per hour"""
+    return jsonify({
+        'success': True,
+        'printers': [printer.to_dict() for printer in registered_printers.list()]
+    })
+
+@app.route('/printers', methods=['POST'])
+def add_printer():
+    """
+    Register a printer
+    Expects: { 'name': 'MK4 #2', 'printer_cost': 1100, 'power_consumption': 120, ... }
+             (machine/electricity settings missing from the payload use the defaults)
+    """
+    try:
+        printer = registered_printers.save(request.json)
+        return jsonify({'success': True, 'printer': printer.to_dict()}), 201
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/printers/<int:printer_id>', methods=['PUT'])
+def update_printer(printer_id):
+    """Replace a registered printer's name and settings"""
+    try:
+        printer = registered_printers.save(request.json, printer_id)
+        if printer is None:
+            return jsonify({'success': False, 'error': 'Printer not found'}), 404
+        return jsonify({'success': True, 'printer': printer.to_dict()})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/printers/<int:printer_id>', methods=['DELETE'])
+def delete_printer(printer_id):
+    """Remove a registered printer"""
+    if not registered_printers.delete(printer_id):
+        return jsonify({'success': False, 'error': 'Printer not found'}), 404
+    return jsonify({'success': True})
+
+# Backups are kept per browser: each sends its own random ID in this header
+BACKUP_CLIENT_HEADER = 'X-PrintForge-Client'
+BACKUP_CLIENT_PATTERN = re.compile(r'[A-Za-z0-9_-]{8,64}')
+
+def backup_client():
+    """The ID of the browser a backup request is for (raises ValueError if it is missing)"""
+    client = request.headers.get(BACKUP_CLIENT_HEADER, '')
+    if not BACKUP_CLIENT_PATTERN.fullmatch(client):
+        raise ValueError(f'Missing or invalid {BACKUP_CLIENT_HEADER} header')
+    return client
+
+@app.route('/backups', methods=['GET'])
+def list_backups():
+    """This browser's backup snapshots, newest first, plus logical vs stored size"""
+    try:
+        client = backup_client()
+        return jsonify({
+            'success': True,
+            'backups': backups.list(client),
+            'stats': backups.stats(client)
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/backups', methods=['POST'])
+def create_backup():
+    """
+    Snapshot the browser's saved data
+    Expects: { 'type': 'Manual'|'Automatic', 'data': { 'clients': '...', 'templates': '...', ... } }
+    Data types whose content is unchanged since an earlier snapshot are not stored again.
+    """
+    try:
+        data = request.json
+        snapshot = backups.create(backup_client(), data.get('data') or {}, kind=data.get('type') or 'Manual')
+        return jsonify({'success': True, 'backup': snapshot}), 201
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/backups/import', methods=['POST'])
+def import_backups():
+    """
+    Import backups kept in the browser before backups moved server-side
+    Expects: { 'backups': [{ 'timestamp': ..., 'type': ..., 'data': {...} }, ...] }
+    All or nothing; backups imported before are skipped, so a retried import adds no duplicates.
+    """
+    try:
+        imported = backups.import_snapshots(backup_client(), request.json.get('backups', []))
+        return jsonify({'success': True, 'imported': imported})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/backups/<int:backup_id>', methods=['GET'])
+def get_backup(backup_id):
+    """One snapshot with its data, in the same shape as a downloaded backup file"""
+    try:
+        snapshot = backups.get(backup_client(), backup_id)
+        if snapshot is None:
+            return jsonify({'success': False, 'error': 'Backup not found'}), 404
+        return jsonify({'success': True, 'backup': snapshot})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/backups/restore', methods=['GET'])
+def restore_backup_at():
+    """
+    Saved data as it stood at a point in time
+    Query: at (ISO timestamp) - each data type comes from the newest snapshot at or before it
+    """
+    try:
+        at = request.args.get('at')
+        if not at:
+            return jsonify({'success': False, 'error': 'No time given'}), 400
+        state = backups.restore_at(backup_client(), at)
+        if state is None:
+            return jsonify({'success': False, 'error': 'No backups at or before that time'}), 404
+        return jsonify({'success': True, 'backup': state})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/backups/<int:backup_id>', methods=['DELETE'])
+def delete_backup(backup_id):
+    """Delete a snapshot (chunks shared with other snapshots are kept)"""
+    try:
+        if not backups.delete(backup_client(), backup_id):
+            return jsonify({'success': False, 'error': 'Backup not found'}), 404
+        return jsonify({'success': True})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/backups', methods=['DELETE'])
+def clear_backups():
+    """Delete every snapshot this browser has"""
+    try:
+        backups.clear(backup_client())
+        return jsonify({'success': True})
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/parse-gcode', methods=['POST'])
+def parse_gcode():
+    """
+    Read filament usage and print time from sliced G-code (PrusaSlicer, OrcaSlicer, Bambu Studio, Cura)
+    Accepts a multipart 'file' upload (.gcode or sliced .3mf), or JSON { 'filepath': ... } in desktop mode.
+    Optional 'material' (form field or JSON) sets the density when the slicer only reports length.
+    Only the comment blocks at the start and end of the file are read.
+    """
+    try:
+        import gcode_metadata
+
+        if 'file' in request.files:
+            file = request.files['file']
+            if file.filename == '':
+                return jsonify({'success': False, 'error': 'No file selected'}), 400
+            metadata = gcode_metadata.extract_from_file(file.stream, request.form.get('material'))
+        else:
+            data = request.get_json(silent=True) or {}
+            filepath = data.get('filepath')
+            if not filepath:
+                return jsonify({'success': False, 'error': 'No file provided'}), 400
+            metadata = gcode_metadata.extract_from_path(local_path(filepath, GCODE_FILE_TYPES), data.get('material'))
+
+        return jsonify({'success': True, **metadata})
+
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+def mesh_settings(values):
+    """Read material density / infill / wall settings for /analyze-model from form or JSON values"""
+    import mesh_analysis
+
+    return {
+        'material': values.get('material') or None,
+        'density': float(values['density']) if values.get('density') else None,
+        'infill': float(values.get('infill') or mesh_analysis.DEFAULT_INFILL),
+        'wall_count': int(values.get('wall_count') or mesh_analysis.DEFAULT_WALL_COUNT),
+        'line_width': float(values.get('line_width') or mesh_analysis.DEFAULT_LINE_WIDTH),
+    }
+
+@app.route('/analyze-model', methods=['POST'])
+def analyze_model():
+    """
+    Estimate filament grams from an unsliced STL or 3MF model
+    Accepts a multipart 'file' upload, or JSON { 'filepath': ... } in desktop mode.
+    Optional: material, density (g/cm3), infill (%), wall_count, line_width (mm)
+    """
+    try:
+        import mesh_analysis
+
+        if 'file' in request.files:
+            file = request.files['file']
+            if file.filename == '':
+                return jsonify({'success': False, 'error': 'No file selected'}), 400
+            result = mesh_analysis.analyze_file(file.stream, **mesh_settings(request.form))
+        else:
+            data = request.get_json(silent=True) or {}
+            filepath = data.get('filepath')
+            if not filepath:
+                return jsonify({'success': False, 'error': 'No file provided'}), 400
+            result = mesh_analysis.analyze_path(local_path(filepath, MODEL_FILE_TYPES), **mesh_settings(data))
+
+        return jsonify({'success': True, **result})
+
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -188,233 +887,243 @@ def load_config():
 
 @app.route('/export-excel', methods=['POST'])
 def export_excel():
-    """Export pricing data to Excel"""
+    """
+    Export pricing data to Excel
+    Optional 'filepath' saves to that path directly (desktop mode) instead of returning the file
+    """
     try:
+        import excel_export
+
         data = request.json
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Pricing Breakdown"
-        
-        # Define styles
-        header_font = Font(name='Arial', size=14, bold=True, color='FFFFFF')
-        header_fill = PatternFill(start_color='FF6B35', end_color='FF6B35', fill_type='solid')
-        section_font = Font(name='Arial', size=12, bold=True)
-        section_fill = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
-        label_font = Font(name='Arial', size=10, bold=True)
-        value_font = Font(name='Arial', size=10)
-        currency_font = Font(name='Arial', size=10, bold=True, color='FF6B35')
-        total_font = Font(name='Arial', size=14, bold=True, color='FF6B35')
-        border = Border(
-            left=Side(style='thin', color='000000'),
-            right=Side(style='thin', color='000000'),
-            top=Side(style='thin', color='000000'),
-            bottom=Side(style='thin', color='000000')
+
+        filepath = data.get('filepath')
+        if filepath:
+            file_transfer.write_stream_atomic(excel_export.build_pricing_report(data), local_path(filepath, ('.xlsx',)))
+            return jsonify({
+                'success': True,
+                'message': f'File saved to {filepath}'
+            })
+
+        return send_file(
+            excel_export.build_pricing_report(data),
+            mimetype=excel_export.XLSX_MIMETYPE,
+            as_attachment=True,
+            download_name=excel_export.report_filename(data)
         )
         
-        row = 1
-        
-        # Title
-        ws.merge_cells(f'A{row}:D{row}')
-        cell = ws[f'A{row}']
-        cell.value = "PRINTFORGE PRICING BREAKDOWN"
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        ws.row_dimensions[row].height = 25
-        row += 2
-        
-        # Product Information
-        ws[f'A{row}'] = "PRODUCT INFORMATION"
-        ws[f'A{row}'].font = section_font
-        ws[f'A{row}'].fill = section_fill
-        ws.merge_cells(f'A{row}:D{row}')
-        row += 1
-        
-        product_info = [
-            ("Part Name:", data.get('part_name', 'New Part')),
-            ("Revision:", data.get('revision', 'V1')),
-            ("Prepared By:", data.get('prepared_by', 'Marcus')),
-            ("Date:", datetime.now().strftime("%Y-%m-%d")),
-            ("Material:", data.get('material_type', 'ABS')),
-        ]
-        
-        for label, value in product_info:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = label_font
-            ws[f'B{row}'] = value
-            ws[f'B{row}'].font = value_font
-            row += 1
-        row += 1
-        
-        # Material & Print Settings
-        ws[f'A{row}'] = "MATERIAL & PRINT SETTINGS"
-        ws[f'A{row}'].font = section_font
-        ws[f'A{row}'].fill = section_fill
-        ws.merge_cells(f'A{row}:D{row}')
-        row += 1
-        
-        print_settings = [
-            ("Filament Cost:", f"${data.get('filament_cost', 40):.2f} /kg"),
-            ("Filament Required:", f"{data.get('filament_required', 0):.2f} g"),
-            ("Print Time:", f"{data.get('print_time', 0):.2f} hours"),
-            ("Labor Time:", f"{data.get('labor_time', 0)} minutes"),
-        ]
-        
-        for label, value in print_settings:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = label_font
-            ws[f'B{row}'] = value
-            ws[f'B{row}'].font = value_font
-            row += 1
-        row += 1
-        
-        # Hardware Components
-        hardware_items = data.get('hardware_items', [])
-        if hardware_items:
-            ws[f'A{row}'] = "HARDWARE COMPONENTS"
-            ws[f'A{row}'].font = section_font
-            ws[f'A{row}'].fill = section_fill
-            ws.merge_cells(f'A{row}:D{row}')
-            row += 1
-            
-            # Headers
-            headers = ["Name", "Quantity", "Unit Cost", "Total"]
-            for col_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=row, column=col_idx)
-                cell.value = header
-                cell.font = label_font
-                cell.border = border
-            row += 1
-            
-            for item in hardware_items:
-                ws[f'A{row}'] = item.get('name', '')
-                ws[f'B{row}'] = item.get('quantity', 0)
-                ws[f'C{row}'] = f"${item.get('unit_cost', 0):.2f}"
-                total = item.get('quantity', 0) * item.get('unit_cost', 0)
-                ws[f'D{row}'] = f"${total:.2f}"
-                for col in ['A', 'B', 'C', 'D']:
-                    ws[f'{col}{row}'].font = value_font
-                    ws[f'{col}{row}'].border = border
-                row += 1
-            row += 1
-        
-        # Packaging Materials
-        packaging_items = data.get('packaging_items', [])
-        shipping_cost = data.get('shipping_cost', 0)
-        if packaging_items or shipping_cost > 0:
-            ws[f'A{row}'] = "PACKAGING & SHIPPING"
-            ws[f'A{row}'].font = section_font
-            ws[f'A{row}'].fill = section_fill
-            ws.merge_cells(f'A{row}:D{row}')
-            row += 1
-            
-            # Headers
-            headers = ["Name", "Quantity", "Unit Cost", "Total"]
-            for col_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=row, column=col_idx)
-                cell.value = header
-                cell.font = label_font
-                cell.border = border
-            row += 1
-            
-            for item in packaging_items:
-                ws[f'A{row}'] = item.get('name', '')
-                ws[f'B{row}'] = item.get('quantity', 0)
-                ws[f'C{row}'] = f"${item.get('unit_cost', 0):.2f}"
-                total = item.get('quantity', 0) * item.get('unit_cost', 0)
-                ws[f'D{row}'] = f"${total:.2f}"
-                for col in ['A', 'B', 'C', 'D']:
-                    ws[f'{col}{row}'].font = value_font
-                    ws[f'{col}{row}'].border = border
-                row += 1
-            
-            if shipping_cost > 0:
-                ws[f'A{row}'] = "Shipping"
-                ws[f'B{row}'] = 1
-                ws[f'C{row}'] = f"${shipping_cost:.2f}"
-                ws[f'D{row}'] = f"${shipping_cost:.2f}"
-                for col in ['A', 'B', 'C', 'D']:
-                    ws[f'{col}{row}'].font = value_font
-                    ws[f'{col}{row}'].border = border
-                row += 1
-            row += 1
-        
-        # Cost Breakdown
-        results = data.get('results', {})
-        ws[f'A{row}'] = "COST BREAKDOWN"
-        ws[f'A{row}'].font = section_font
-        ws[f'A{row}'].fill = section_fill
-        ws.merge_cells(f'A{row}:D{row}')
-        row += 1
-        
-        cost_breakdown = [
-            ("Materials Cost:", f"${results.get('material_cost', 0):.2f}"),
-            ("Labor Cost:", f"${results.get('labor_cost', 0):.2f}"),
-            ("Machine Cost:", f"${results.get('machine_cost_total', 0):.2f}"),
-            ("Packaging & Shipping:", f"${results.get('packaging_cost', 0):.2f}"),
-        ]
-        
-        for label, value in cost_breakdown:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = label_font
-            ws[f'C{row}'] = value
-            ws[f'C{row}'].font = currency_font
-            ws[f'C{row}'].alignment = Alignment(horizontal='right')
-            row += 1
-        
-        # Total Landed Cost
-        row += 1
-        ws[f'A{row}'] = "TOTAL LANDED COST:"
-        ws[f'A{row}'].font = total_font
-        ws[f'C{row}'] = f"${results.get('total_cost', 0):.2f}"
-        ws[f'C{row}'].font = total_font
-        ws[f'C{row}'].alignment = Alignment(horizontal='right')
-        row += 2
-        
-        # Suggested Pricing
-        ws[f'A{row}'] = "SUGGESTED PRICING"
-        ws[f'A{row}'].font = section_font
-        ws[f'A{row}'].fill = section_fill
-        ws.merge_cells(f'A{row}:D{row}')
-        row += 1
-        
-        pricing = [
-            ("50% Margin:", f"${results.get('price_50', 0):.2f}"),
-            ("60% Margin:", f"${results.get('price_60', 0):.2f}"),
-            ("70% Margin:", f"${results.get('price_70', 0):.2f}"),
-            (f"{results.get('custom_margin', 75)}% Margin (Custom):", f"${results.get('price_custom', 0):.2f}"),
-        ]
-        
-        for label, value in pricing:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = label_font
-            ws[f'C{row}'] = value
-            ws[f'C{row}'].font = currency_font
-            ws[f'C{row}'].alignment = Alignment(horizontal='right')
-            row += 1
-        
-        # Set column widths
-        ws.column_dimensions['A'].width = 30
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 15
-        
-        # Save to temporary file
-        part_name = data.get('part_name', 'New_Part').replace(' ', '_')
-        filename = f"{part_name}_Pricing.xlsx"
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        wb.save(temp_file.name)
-        temp_file.close()
-        
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/export-workbook', methods=['POST'])
+def export_workbook():
+    """
+    Export many quotes (batch, history or comparison) as one workbook
+    Expects: { 'title': 'Batch Quote', 'filename': 'batch.xlsx', 'custom_margin': 75,
+               'quotes': [{ 'part_name', 'material', 'weight', 'print_time', 'quantity',
+                            'material_cost', 'labor_cost', 'machine_cost', 'packaging_cost' }],
+               'filepath': optional path to save to directly (desktop mode) }
+    """
+    try:
+        import excel_export
+
+        data = request.json
+        quotes = data.get('quotes', [])
+        if not quotes:
+            return jsonify({'success': False, 'error': 'No quotes to export'}), 400
+
+        output = excel_export.build_quote_workbook(
+            quotes,
+            title=data.get('title', 'Quotes'),
+            custom_margin=float(data.get('custom_margin', 75))
+        )
+
+        filepath = data.get('filepath')
+        if filepath:
+            # Desktop mode: write straight to the chosen path instead of round-tripping through the webview
+            with output:
+                file_transfer.write_stream_atomic(output, local_path(filepath, ('.xlsx',)))
+            return jsonify({
+                'success': True,
+                'message': f'File saved to {filepath}'
+            })
+
         return send_file(
-            temp_file.name,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            output,
+            mimetype=excel_export.XLSX_MIMETYPE,
             as_attachment=True,
-            download_name=filename
+            download_name=data.get('filename', 'PrintForge_Quotes.xlsx')
         )
-        
+
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+def queued_job_response(job):
+    """202 response pointing the client at the job's status and result URLs"""
+    return jsonify({
+        'success': True,
+        **job.to_dict(),
+        'status_url': f'/jobs/{job.id}',
+        'result_url': f'/jobs/{job.id}/result'
+    }), 202
+
+@app.route('/jobs/export-excel', methods=['POST'])
+def queue_export_excel():
+    """Queue the single-quote Excel report (same payload as /export-excel)"""
+    try:
+        import excel_export
+
+        data = request.json
+
+        job = export_queue.submit(
+            'excel',
+            excel_export.report_filename(data),
+            excel_export.XLSX_MIMETYPE,
+            export_jobs.render_pricing_report,
+            data
+        )
+        return queued_job_response(job)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/jobs/export-workbook', methods=['POST'])
+def queue_export_workbook():
+    """Queue a multi-quote workbook (same payload as /export-workbook, without filepath)"""
+    try:
+        import excel_export
+
+        data = request.json
+        quotes = data.get('quotes', [])
+        if not quotes:
+            return jsonify({'success': False, 'error': 'No quotes to export'}), 400
+
+        job = export_queue.submit(
+            'workbook',
+            data.get('filename', 'PrintForge_Quotes.xlsx'),
+            excel_export.XLSX_MIMETYPE,
+            export_jobs.render_quote_workbook,
+            quotes,
+            data.get('title', 'Quotes'),
+            float(data.get('custom_margin', 75))
+        )
+        return queued_job_response(job)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll an export job: queued, running, done or failed"""
+    job = export_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    return jsonify({'success': True, **job.to_dict()})
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """Download a finished export"""
+    job = export_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    if job.status == 'failed':
+        return jsonify({'success': False, 'error': job.error}), 500
+    if job.status != 'done':
+        return jsonify({'success': False, 'error': 'Job not finished', **job.to_dict()}), 409
+
+    return send_file(
+        io.BytesIO(job.result),
+        mimetype=job.mimetype,
+        as_attachment=True,
+        download_name=job.filename
+    )
+
+# File types the desktop file routes read and write
+DESKTOP_FILE_TYPES = ('.json', '.xlsx')
+
+# Largest file /read-file-from-path returns inside JSON; bigger files go through /stream-file-from-path
+MAX_JSON_READ_BYTES = 16 * 1024 * 1024
+
+@app.route('/stream-file-to-path', methods=['POST', 'PUT'])
+def stream_file_to_path():
+    """
+    Save the raw request body to a custom path (desktop mode only)
+    Query: filepath. Body: the file bytes, sent as application/octet-stream.
+    The body is written in chunks to a temporary file that replaces the target when complete.
+    """
+    try:
+        filepath = request.args.get('filepath')
+        if not filepath:
+            return jsonify({'success': False, 'error': 'No filepath provided'}), 400
+        # A non-form content type means a browser on another site has to pass a CORS preflight first
+        if request.mimetype != 'application/octet-stream':
+            return jsonify({'success': False, 'error': 'Send the file as application/octet-stream'}), 415
+
+        written = file_transfer.write_stream_atomic(request.stream, local_path(filepath, DESKTOP_FILE_TYPES))
+
+        return jsonify({
+            'success': True,
+            'bytes': written,
+            'message': f'File saved to {filepath}'
+        })
+
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/stream-file-from-path', methods=['GET'])
+def stream_file_from_path():
+    """
+    Stream a file from a custom path (desktop mode only)
+    Query: filepath. The file is sent in chunks and supports Range / If-Modified-Since requests.
+    """
+    try:
+        filepath = request.args.get('filepath')
+        if not filepath:
+            return jsonify({'success': False, 'error': 'File not found'}), 404
+        filepath = local_path(filepath, DESKTOP_FILE_TYPES)
+        if not filepath.is_file():
+            return jsonify({'success': False, 'error': 'File not found'}), 404
+
+        return send_file(filepath.resolve(), conditional=True)
+
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -426,6 +1135,7 @@ def save_file_to_path():
     """
     Save file to a custom path (desktop mode only)
     Expects: { 'filepath': '/path/to/file.json', 'content': '...', 'content_type': 'json|excel' }
+    Kept for older front-ends; /stream-file-to-path takes the raw bytes without base64.
     """
     try:
         import base64
@@ -437,24 +1147,30 @@ def save_file_to_path():
 
         if not filepath:
             return jsonify({'success': False, 'error': 'No filepath provided'}), 400
-
-        # Ensure directory exists
-        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        filepath = local_path(filepath, DESKTOP_FILE_TYPES)
 
         if content_type == 'json':
-            # Save JSON content
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            body = content.encode('utf-8')
         elif content_type == 'excel':
             # Content is base64 encoded
-            with open(filepath, 'wb') as f:
-                f.write(base64.b64decode(content))
+            body = base64.b64decode(content)
+        else:
+            return jsonify({'success': False, 'error': f'Unsupported content_type: {content_type}'}), 400
+
+        # Same atomic temp-file-and-rename write as /stream-file-to-path
+        file_transfer.write_stream_atomic(io.BytesIO(body), filepath)
 
         return jsonify({
             'success': True,
             'message': f'File saved to {filepath}'
         })
 
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -466,13 +1182,19 @@ def read_file_from_path():
     """
     Read file from custom path (desktop mode only)
     Expects: { 'filepath': '/path/to/file.json' }
+    Kept for older front-ends; /stream-file-from-path streams the file with range support.
     """
     try:
         data = request.json
         filepath = data.get('filepath')
 
-        if not filepath or not Path(filepath).exists():
+        if not filepath:
             return jsonify({'success': False, 'error': 'File not found'}), 404
+        filepath = local_path(filepath, ('.json',))
+        if not filepath.exists():
+            return jsonify({'success': False, 'error': 'File not found'}), 404
+        if filepath.stat().st_size > MAX_JSON_READ_BYTES:
+            return jsonify({'success': False, 'error': 'File too large; use /stream-file-from-path'}), 413
 
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -482,6 +1204,12 @@ def read_file_from_path():
             'content': content
         })
 
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+
     except Exception as e:
         return jsonify({
             'success': False,
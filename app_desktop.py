@@ -3,17 +3,35 @@ PrintForge Pricing Calculator - Desktop Application
 Uses PyWebView for native window and file dialogs
 """
 
+import startup
+
+# Installed first so the trace (--trace-startup) covers every import below
+trace = startup.StartupTrace(startup.trace_requested())
+
 import webview
 import threading
+import io
+import json
 import sys
 import os
+from datetime import datetime
 from pathlib import Path
 
-# Import Flask app
-from app import app
+# The Flask app is imported on the server thread once the window is up (see boot)
+from serve import serve
+import file_transfer
+import pricing_engine
+
+HOST = '127.0.0.1'
+PORT = 5000
+URL = f'http://{HOST}:{PORT}'
+
+# Shown while the server starts, instead of a blank window or a connection error
+LOADING_HTML = """<html><body style="margin:0;height:100vh;display:flex;align-items:center;justify-content:center;
+background:#1E1E1E;color:#8C8C8C;font-family:Segoe UI,sans-serif">Starting PrintForge...</body></html>"""
 
 # Create necessary directories
-def setup_directories():
+def setup_directories(app):
     """Create required directories for the application"""
     # When frozen (built as exe), use AppData for writable directories
     if getattr(sys, 'frozen', False):
@@ -33,14 +51,22 @@ def setup_directories():
         uploads_dir = base_dir / 'uploads'
         uploads_dir.mkdir(exist_ok=True)
 
-# Set up directories before starting Flask
-setup_directories()
+
+
+def write_bytes(filepath, content):
+    """Atomically write bytes to filepath, returning the bridge's success payload"""
+    written = file_transfer.write_stream_atomic(io.BytesIO(content), filepath)
+    return {'success': True, 'bytes': written, 'message': f'File saved to {filepath}'}
 
 
 class API:
     """
     JavaScript API for native file operations
     Exposed to JavaScript via window.pywebview.api
+
+    Pricing, config and export calls run in-process against the same engine
+    as the Flask routes, so the desktop window skips the loopback HTTP round
+    trip. Each returns the same payload as its route ({'success': ..., ...}).
     """
 
     def save_file_dialog(self, filename='', file_types=''):
@@ -102,24 +128,118 @@ class API:
         """Return 'desktop' to indicate we're running in desktop mode"""
         return 'desktop'
 
+    def calculate(self, data):
+        """Price the quote form (same result as POST /calculate)"""
+        try:
+            from app import rate_cards, registered_printers
+
+            data = registered_printers.apply(data)
+            quote = pricing_engine.price(pricing_engine.Job.from_dict(data), rate_cards.get(data))
+            return {'success': True, **quote}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def compare(self, data):
+        """Rank scenarios of one quote (same payload and result as POST /compare)"""
+        try:
+            from app import rate_cards, registered_printers
+
+            data = registered_printers.apply(data)
+            scenarios = [registered_printers.apply(scenario) for scenario in data.get('scenarios', [])]
+            if not scenarios:
+                return {'success': False, 'error': 'No scenarios to compare'}
+
+            base = {key: value for key, value in data.items() if key != 'scenarios'}
+            ranked = pricing_engine.compare(base, scenarios, rate_cards)
+            return {'success': True, 'count': len(ranked), 'cheapest': ranked[0]['name'], 'results': ranked}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def save_config(self, filepath, config):
+        """Save the form as a config file, stamped like /save-config"""
+        try:
+            config = {**config, 'version': '1.0', 'saved_date': datetime.now().isoformat()}
+            return write_bytes(filepath, json.dumps(config, indent=2).encode('utf-8'))
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def load_config(self, filepath):
+        """Read a config file (same result as POST /load-config)"""
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return {'success': True, 'config': json.load(f)}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def save_text(self, filepath, content):
+        """Write a text file (e.g. a backup) atomically"""
+        try:
+            return write_bytes(filepath, content.encode('utf-8'))
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def export_excel(self, data, filepath):
+        """Write the single-quote Excel report to filepath"""
+        try:
+            import excel_export
+
+            file_transfer.write_stream_atomic(excel_export.build_pricing_report(data), filepath)
+            return {'success': True, 'message': f'File saved to {filepath}'}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def export_workbook(self, data, filepath):
+        """Write a multi-quote workbook (same payload as /export-workbook) to filepath"""
+        try:
+            import excel_export
+
+            quotes = data.get('quotes', [])
+            if not quotes:
+                return {'success': False, 'error': 'No quotes to export'}
+            output = excel_export.build_quote_workbook(
+                quotes,
+                title=data.get('title', 'Quotes'),
+                custom_margin=float(data.get('custom_margin', 75))
+            )
+            with output:
+                file_transfer.write_stream_atomic(output, filepath)
+            return {'success': True, 'message': f'File saved to {filepath}'}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
 
 def start_flask():
-    """Start Flask server in a separate thread"""
-    app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
+    """Import the Flask app and run the multi-threaded WSGI server (runs in a background thread)"""
+    from app import app
+    trace.mark('app imported')
 
+    # Set up directories before starting Flask
+    setup_directories(app)
+    serve(app, host=HOST, port=PORT, threads=4, install_signals=False)
 
-if __name__ == '__main__':
-    # Start Flask in background thread
+
+def boot(window):
+    """Start the server once the window is showing, then load the UI as soon as the socket accepts connections"""
+    trace.mark('window shown')
     flask_thread = threading.Thread(target=start_flask, daemon=True)
     flask_thread.start()
 
+    if startup.wait_for_server(HOST, PORT):
+        trace.mark('server ready')
+        window.load_url(URL)
+    else:
+        window.load_html(f'<p style="font-family:sans-serif">PrintForge could not start its server on port {PORT}.</p>')
+    trace.report()
+
+
+if __name__ == '__main__':
     # Create API instance
     api = API()
 
     # Create and start PyWebView window
     window = webview.create_window(
         'PrintForge Pricing Calculator',
-        'http://127.0.0.1:5000',
+        html=LOADING_HTML,
         width=1600,
         height=1000,
         resizable=True,
@@ -129,6 +249,7 @@ if __name__ == '__main__':
         text_select=True,
         js_api=api
     )
+    trace.mark('window created')
 
-    # Start the app
-    webview.start(debug=False)
+    # Start the app; boot runs on its own thread once the GUI loop is up
+    webview.start(boot, (window,), debug=False)
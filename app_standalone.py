@@ -3,22 +3,30 @@ PrintForge Pricing Calculator - Standalone Desktop Version
 Launches Flask in a standalone window without browser chrome
 """
 
+import startup
+
+# Installed first so the trace (--trace-startup) covers every import below
+trace = startup.StartupTrace(startup.trace_requested())
+
 import subprocess
 import sys
 import time
 from threading import Thread
 from pathlib import Path
 
-# Import Flask app
-from app import app
+from serve import serve
+
+HOST = '127.0.0.1'
+PORT = 5000
 
 def run_flask():
-    """Run Flask server"""
-    app.run(port=5000, debug=False, use_reloader=False)
+    """Import the Flask app and run the multi-threaded WSGI server"""
+    from app import app
+    trace.mark('app imported')
+    serve(app, host=HOST, port=PORT, threads=4, install_signals=False)
 
 def open_app_window():
     """Open app in Edge app mode (standalone window)"""
-    time.sleep(1.5)  # Wait for Flask to start
 
     # Try to use Edge in app mode (creates borderless window)
     edge_paths = [
@@ -26,7 +34,7 @@ def open_app_window():
         r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
     ]
 
-    url = "http://localhost:5000"
+    url = f"http://{HOST}:{PORT}"
 
     # Try Edge app mode first (creates standalone window)
     for edge_path in edge_paths:
@@ -77,8 +85,14 @@ if __name__ == '__main__':
     flask_thread = Thread(target=run_flask, daemon=True)
     flask_thread.start()
 
-    # Open app window
+    # Open app window as soon as the server accepts connections
+    if not startup.wait_for_server(HOST, PORT):
+        print(f"Server did not start on port {PORT}")
+        sys.exit(1)
+    trace.mark('server ready')
     open_app_window()
+    trace.mark('window launched')
+    trace.report()
 
     # Keep running
     try:
@@ -0,0 +1,245 @@
+"""
+PrintForge Static Assets
+Build-time fingerprinting and precompression of static files, served with immutable caching
+
+Usage:
+    python assets.py                 # writes static/dist/ and static/dist/manifest.json
+
+Each file under static/ is copied to static/dist/ with a content hash in its
+name (css/style.css -> css/style.1a2b3c4d5e6f.css), plus .gz and, when the
+optional brotli package is installed, .br variants of text formats. CSS
+url() references are rewritten to the hashed names. Templates use
+asset_url('css/style.css'); without a build (or if a source file changed
+since the last build) it falls back to the plain /static URL.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import posixpath
+import re
+import sys
+from pathlib import Path
+
+from flask import jsonify, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+MAX_AGE = 365 * 24 * 3600
+
+# Already-compressed formats gain nothing from gzip/brotli
+COMPRESSIBLE = {'.js', '.css', '.html', '.svg', '.json', '.txt', '.ttf', '.otf', '.ico'}
+SKIPPED = {'.md'}
+MIN_SAVING = 0.05        # Keep a compressed variant only if it is at least 5% smaller
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+?)\1\s*\)""")
+
+# Encoding -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def content_hash(data, digest_size=6):
+    return hashlib.blake2b(data, digest_size=digest_size).hexdigest()
+
+
+def hashed_name(relative, data):
+    """css/style.css + contents -> css/style.<hash>.css"""
+    stem, ext = posixpath.splitext(relative)
+    return f'{stem}.{content_hash(data)}{ext}'
+
+
+def rewrite_css_urls(css, css_path, names):
+    """Point url() references in a stylesheet at the fingerprinted files"""
+    base = posixpath.dirname(css_path)
+
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        path, rest = re.match(r'([^?#]*)(.*)', ref).groups()
+        target = posixpath.normpath(posixpath.join(base, path))
+        if target not in names:
+            return match.group(0)
+        relative = posixpath.relpath(names[target], base or '.')
+        return f'url({quote}{relative}{rest}{quote})'
+
+    return CSS_URL.sub(replace, css)
+
+
+def compress(data, ext, use_brotli=True):
+    """Return {encoding: bytes} for the variants worth keeping"""
+    variants = {}
+    if ext not in COMPRESSIBLE:
+        return variants
+    limit = len(data) * (1 - MIN_SAVING)
+    if use_brotli and brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < limit:
+            variants['br'] = compressed
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < limit:
+        variants['gzip'] = compressed
+    return variants
+
+
+def build(static_dir, use_brotli=True):
+    """
+    Fingerprint and precompress every file under static_dir into static_dir/dist
+
+    Args:
+        static_dir: Flask static folder
+        use_brotli: Write .br variants when the brotli package is available
+
+    Returns:
+        dict: The manifest written to dist/manifest.json
+    """
+    static_dir = Path(static_dir)
+    dist = static_dir / DIST_DIR
+    sources = sorted(
+        path for path in static_dir.rglob('*')
+        if path.is_file() and dist not in path.parents and path.suffix.lower() not in SKIPPED
+    )
+
+    # Stylesheets last, so their url() references can be rewritten to already-hashed names
+    sources.sort(key=lambda path: path.suffix.lower() == '.css')
+
+    names = {}
+    files = {}
+    written = set()
+    for path in sources:
+        relative = path.relative_to(static_dir).as_posix()
+        source = path.read_bytes()
+        data = source
+        if path.suffix.lower() == '.css':
+            data = rewrite_css_urls(source.decode('utf-8'), relative, names).encode('utf-8')
+
+        target = hashed_name(relative, data)
+        names[relative] = target
+        variants = compress(data, path.suffix.lower(), use_brotli)
+
+        out = dist / target
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_bytes(data)
+        written.add(out)
+        for encoding, suffix in ENCODINGS:
+            if encoding in variants:
+                variant = out.with_name(out.name + suffix)
+                variant.write_bytes(variants[encoding])
+                written.add(variant)
+
+        files[relative] = {
+            'path': target,
+            'source_hash': content_hash(source),
+            'size': len(data),
+            'encodings': {encoding: len(body) for encoding, body in variants.items()},
+        }
+
+    # Drop fingerprinted files from earlier builds
+    for stale in dist.rglob('*'):
+        if stale.is_file() and stale not in written and stale.name != MANIFEST_NAME:
+            stale.unlink()
+
+    manifest = {'version': 1, 'files': files}
+    (dist / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return manifest
+
+
+class AssetManifest:
+    """Lookup from source names to fingerprinted files, loaded from dist/manifest.json"""
+
+    def __init__(self, static_dir):
+        self.dist = Path(static_dir) / DIST_DIR
+        self.files = {}
+        self.by_path = {}
+        self.stale = []
+
+        manifest_path = self.dist / MANIFEST_NAME
+        if not manifest_path.is_file():
+            return
+        files = json.loads(manifest_path.read_text(encoding='utf-8')).get('files', {})
+
+        # A source edited after the build keeps its plain /static URL until the next build
+        for relative, entry in files.items():
+            self.by_path[entry['path']] = entry
+            source = Path(static_dir) / relative
+            if source.is_file() and content_hash(source.read_bytes()) == entry['source_hash']:
+                self.files[relative] = entry
+            else:
+                self.stale.append(relative)
+
+    def url(self, filename):
+        """URL for a static file: the fingerprinted /assets/ URL when built, else /static/"""
+        entry = self.files.get(filename)
+        if entry is None:
+            return url_for('static', filename=filename)
+        return url_for('assets', filename=entry['path'])
+
+    def send(self, filename):
+        """Serve a fingerprinted file in the best encoding the client accepts"""
+        entry = self.by_path.get(filename)
+        path = safe_join(str(self.dist), filename) if entry else None
+        if path is None:
+            return jsonify({'success': False, 'error': 'Not found'}), 404
+
+        available = [encoding for encoding, _ in ENCODINGS if encoding in entry['encodings']]
+        encoding = request.accept_encodings.best_match(available + ['identity'], default='identity')
+        suffix = dict(ENCODINGS).get(encoding, '')
+
+        response = send_file(
+            path + suffix,
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+            etag=f"{entry['path']}-{encoding}",
+            max_age=MAX_AGE,
+            conditional=True,
+        )
+        if suffix:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+def init_app(app):
+    """
+    Serve fingerprinted assets at /assets/<path> and add asset_url() to templates
+
+    Returns:
+        AssetManifest: The loaded manifest (empty when no build exists)
+    """
+    manifest = AssetManifest(app.static_folder)
+    if manifest.stale:
+        app.logger.warning('Static assets changed since the last build (run python assets.py): %s',
+                           ', '.join(manifest.stale))
+
+    app.add_url_rule('/assets/<path:filename>', 'assets', manifest.send)
+    app.jinja_env.globals['asset_url'] = manifest.url
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress PrintForge static files')
+    parser.add_argument('--static', default=str(Path(__file__).parent / 'static'), help='Static folder')
+    parser.add_argument('--no-brotli', action='store_true', help='Only write gzip variants')
+    args = parser.parse_args(argv)
+
+    if brotli is None and not args.no_brotli:
+        print('brotli not installed - writing gzip variants only (pip install brotli)', file=sys.stderr)
+
+    manifest = build(args.static, use_brotli=not args.no_brotli)
+    for relative, entry in sorted(manifest['files'].items()):
+        sizes = '  '.join(f'{encoding} {size / 1024:.1f} KB' for encoding, size in entry['encodings'].items())
+        print(f"{relative:40} {entry['size'] / 1024:8.1f} KB  {sizes}")
+    print(f"\n{len(manifest['files'])} files written to {Path(args.static) / DIST_DIR}")
+
+
+if __name__ == '__main__':
+    main()
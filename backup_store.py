@@ -0,0 +1,338 @@
+"""
+PrintForge Backup Store
+Server-side snapshots of the browser's saved data, stored as compressed, content-hashed chunks
+
+Each data type in a snapshot (clients, templates, profiles, ...) is stored
+once per distinct content: a snapshot is a list of (data type, hash) pairs,
+and a chunk is only compressed and written when its hash is new. Unchanged
+data types cost nothing between snapshots. Chunks are compressed with zstd
+when the optional zstandard package is installed, zlib otherwise.
+
+Every snapshot belongs to one client (a browser's ID), and every query is
+scoped to it: listing, restoring or clearing never sees another client's
+snapshots. Chunks are shared, so identical data is still stored once.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAX_SNAPSHOTS = 100
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'Manual',
+    size INTEGER NOT NULL DEFAULT 0,
+    stored INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS snapshot_items (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    data_type TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES chunks (hash),
+    PRIMARY KEY (snapshot_id, data_type)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_client_timestamp ON snapshots (client, timestamp);
+CREATE INDEX IF NOT EXISTS idx_snapshot_items_hash ON snapshot_items (hash);
+"""
+
+
+def _utc_timestamp(dt):
+    """Format a datetime like JavaScript's toISOString() so stored timestamps sort as text"""
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def chunk_hash(raw):
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def compress(raw):
+    """Return (codec, compressed bytes) using zstd when available"""
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return 'zlib', zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress(codec, data):
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError('This backup was compressed with zstd; install zstandard to restore it')
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f'Unknown backup codec: {codec}')
+
+
+class BackupStore:
+    """
+    Point-in-time snapshots backed by a single SQLite file
+
+    A snapshot restores exactly the data types it was taken with; restore_at()
+    rebuilds the newest version of every data type saved at or before a time,
+    so data types left out of later snapshots are still recovered.
+    """
+
+    def __init__(self, db_path, max_snapshots=MAX_SNAPSHOTS):
+        self.db_path = str(db_path)
+        self.max_snapshots = max_snapshots
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(snapshots)')}
+            if columns and 'client' not in columns:
+                conn.execute("ALTER TABLE snapshots ADD COLUMN client TEXT NOT NULL DEFAULT ''")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def create(self, client, data, kind='Manual', timestamp=None):
+        """
+        Take a snapshot
+
+        Args:
+            client: ID of the browser the data belongs to
+            data: { data type: value } - any JSON value (localStorage strings, settings objects);
+                  None values are skipped
+            kind: 'Manual' or 'Automatic'
+            timestamp: ISO time of the snapshot (defaults to now)
+
+        Returns:
+            dict: The snapshot summary (see list())
+        """
+        with self._lock, self._connect() as conn:
+            snapshot = self._insert(conn, client, data, kind, timestamp)
+            self._prune(conn, client)
+        return snapshot
+
+    def import_snapshots(self, client, entries):
+        """
+        Add snapshots taken elsewhere (e.g. backups kept in the browser) in one transaction
+
+        Args:
+            client: ID of the browser the data belongs to
+            entries: [{ 'timestamp', 'type', 'data' }, ...]; an entry matching an existing
+                     snapshot's timestamp and content is skipped, so importing twice is harmless
+
+        Returns:
+            int: Number of snapshots added
+        """
+        imported = 0
+        with self._lock, self._connect() as conn:
+            for entry in sorted(entries, key=lambda entry: entry.get('timestamp') or ''):
+                if self._insert(conn, client, entry.get('data') or {}, entry.get('type') or 'Manual',
+                                entry.get('timestamp'), skip_existing=True) is not None:
+                    imported += 1
+            self._prune(conn, client)
+        return imported
+
+    def _insert(self, conn, client, data, kind, timestamp, skip_existing=False):
+        """Write one snapshot and its new chunks (caller holds the lock and the transaction)"""
+        items = {}
+        for data_type, value in data.items():
+            if value is None:
+                continue
+            raw = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            items[data_type] = (chunk_hash(raw), raw)
+
+        timestamp = timestamp or _utc_timestamp(datetime.now(timezone.utc))
+        size = sum(len(raw) for _, raw in items.values())
+
+        if skip_existing:
+            wanted = {(data_type, digest) for data_type, (digest, _) in items.items()}
+            for row in conn.execute('SELECT id FROM snapshots WHERE client = ? AND timestamp = ?',
+                                    (client, timestamp)).fetchall():
+                existing = {tuple(item) for item in conn.execute(
+                    'SELECT data_type, hash FROM snapshot_items WHERE snapshot_id = ?', (row['id'],)
+                )}
+                if existing == wanted:
+                    return None
+
+        hashes = [digest for digest, _ in items.values()]
+        known = {
+            row['hash'] for row in conn.execute(
+                f'SELECT hash FROM chunks WHERE hash IN ({", ".join("?" * len(hashes))})', hashes
+            )
+        } if hashes else set()
+
+        # Only new content is compressed and written; another worker may insert
+        # the same chunk first, so only rows this insert actually wrote count
+        stored = 0
+        for digest, raw in items.values():
+            if digest in known:
+                continue
+            codec, compressed = compress(raw)
+            cursor = conn.execute('INSERT OR IGNORE INTO chunks (hash, codec, size, data) VALUES (?, ?, ?, ?)',
+                                  (digest, codec, len(raw), compressed))
+            known.add(digest)
+            if cursor.rowcount == 1:
+                stored += len(compressed)
+
+        cursor = conn.execute('INSERT INTO snapshots (client, timestamp, kind, size, stored) VALUES (?, ?, ?, ?, ?)',
+                              (client, timestamp, kind, size, stored))
+        snapshot_id = cursor.lastrowid
+        conn.executemany('INSERT INTO snapshot_items (snapshot_id, data_type, hash) VALUES (?, ?, ?)',
+                         [(snapshot_id, data_type, digest) for data_type, (digest, _) in items.items()])
+
+        return {
+            'id': snapshot_id,
+            'timestamp': timestamp,
+            'type': kind,
+            'size': size,
+            'stored': stored,
+            'dataTypes': sorted(items),
+            'itemCount': len(items),
+        }
+
+    def _prune(self, conn, client):
+        """Drop a client's oldest snapshots beyond max_snapshots and any chunks they alone used"""
+        stale = [row['id'] for row in conn.execute(
+            'SELECT id FROM snapshots WHERE client = ? ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?',
+            (client, self.max_snapshots)
+        )]
+        if stale:
+            self._delete_snapshots(conn, stale)
+
+    @staticmethod
+    def _delete_snapshots(conn, snapshot_ids):
+        marks = ', '.join('?' * len(snapshot_ids))
+        conn.execute(f'DELETE FROM snapshot_items WHERE snapshot_id IN ({marks})', snapshot_ids)
+        cursor = conn.execute(f'DELETE FROM snapshots WHERE id IN ({marks})', snapshot_ids)
+        conn.execute('DELETE FROM chunks WHERE hash NOT IN (SELECT hash FROM snapshot_items)')
+        return cursor.rowcount
+
+    def list(self, client):
+        """A client's snapshot summaries, newest first: id, timestamp, type, size, stored, dataTypes, itemCount"""
+        rows = self._connect().execute(
+            'SELECT s.id, s.timestamp, s.kind, s.size, s.stored, GROUP_CONCAT(i.data_type) AS data_types '
+            'FROM snapshots s LEFT JOIN snapshot_items i ON i.snapshot_id = s.id WHERE s.client = ? '
+            'GROUP BY s.id ORDER BY s.timestamp DESC, s.id DESC', (client,)
+        ).fetchall()
+        summaries = []
+        for row in rows:
+            data_types = sorted(row['data_types'].split(',')) if row['data_types'] else []
+            summaries.append({
+                'id': row['id'],
+                'timestamp': row['timestamp'],
+                'type': row['kind'],
+                'size': row['size'],
+                'stored': row['stored'],
+                'dataTypes': data_types,
+                'itemCount': len(data_types),
+            })
+        return summaries
+
+    def _load(self, conn, items):
+        """Decompress {data type: hash} into {data type: value}"""
+        data = {}
+        for data_type, digest in items.items():
+            row = conn.execute('SELECT codec, data FROM chunks WHERE hash = ?', (digest,)).fetchone()
+            data[data_type] = json.loads(decompress(row['codec'], row['data']))
+        return data
+
+    def get(self, client, snapshot_id):
+        """
+        Rebuild one of a client's snapshots
+
+        Returns:
+            dict: { id, timestamp, type, data: { data type: value } }, or None if it does not exist
+        """
+        conn = self._connect()
+        snapshot = conn.execute('SELECT id, timestamp, kind FROM snapshots WHERE id = ? AND client = ?',
+                                (snapshot_id, client)).fetchone()
+        if snapshot is None:
+            return None
+        items = dict(conn.execute(
+            'SELECT data_type, hash FROM snapshot_items WHERE snapshot_id = ?', (snapshot_id,)
+        ).fetchall())
+        return {
+            'id': snapshot['id'],
+            'timestamp': snapshot['timestamp'],
+            'type': snapshot['kind'],
+            'data': self._load(conn, items),
+        }
+
+    def restore_at(self, client, timestamp):
+        """
+        Rebuild a client's saved data as it stood at a point in time
+
+        Args:
+            client: ID of the browser the data belongs to
+            timestamp: ISO time; every data type takes its newest version saved at or before it
+
+        Returns:
+            dict: { timestamp, data: { data type: value }, sources: { data type: snapshot timestamp } },
+                  or None if nothing was saved by then
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            'SELECT i.data_type, i.hash, s.timestamp FROM snapshot_items i '
+            'JOIN snapshots s ON s.id = i.snapshot_id WHERE s.client = ? AND s.timestamp <= ? '
+            'ORDER BY s.timestamp DESC, s.id DESC', (client, timestamp)
+        ).fetchall()
+        items, sources = {}, {}
+        for row in rows:
+            if row['data_type'] not in items:
+                items[row['data_type']] = row['hash']
+                sources[row['data_type']] = row['timestamp']
+        if not items:
+            return None
+        return {'timestamp': timestamp, 'data': self._load(conn, items), 'sources': sources}
+
+    def delete(self, client, snapshot_id):
+        """Delete one of a client's snapshots and any chunks no other snapshot uses; False if it does not exist"""
+        with self._lock, self._connect() as conn:
+            owned = conn.execute('SELECT 1 FROM snapshots WHERE id = ? AND client = ?', (snapshot_id, client)).fetchone()
+            return owned is not None and self._delete_snapshots(conn, [snapshot_id]) > 0
+
+    def clear(self, client):
+        """Delete all of a client's snapshots and any chunks only they used"""
+        with self._lock, self._connect() as conn:
+            snapshot_ids = [row['id'] for row in conn.execute('SELECT id FROM snapshots WHERE client = ?', (client,))]
+            if snapshot_ids:
+                self._delete_snapshots(conn, snapshot_ids)
+
+    def stats(self, client):
+        """Logical size of a client's snapshots against the bytes stored for the chunks they use"""
+        conn = self._connect()
+        snapshots = conn.execute(
+            'SELECT COUNT(*) AS count, COALESCE(SUM(size), 0) AS size FROM snapshots WHERE client = ?', (client,)
+        ).fetchone()
+        chunks = conn.execute(
+            'SELECT COUNT(*) AS count, COALESCE(SUM(LENGTH(data)), 0) AS stored FROM chunks WHERE hash IN '
+            '(SELECT i.hash FROM snapshot_items i JOIN snapshots s ON s.id = i.snapshot_id WHERE s.client = ?)',
+            (client,)
+        ).fetchone()
+        return {
+            'snapshots': snapshots['count'],
+            'chunks': chunks['count'],
+            'size': snapshots['size'],
+            'stored': chunks['stored'],
+            'codec': 'zstd' if zstandard is not None else 'zlib',
+        }
@@ -0,0 +1,153 @@
+"""
+PrintForge Batch Pricing
+Vectorized NumPy pricing of many jobs against one rate card
+"""
+
+import numpy as np
+
+from pricing_engine import items_total
+
+# Per-job inputs; any key missing from a row falls back to the base job
+JOB_COLUMNS = (
+    'filament_cost',
+    'filament_required',
+    'print_time',
+    'labor_time',
+    'packaging_total',
+    'shipping_cost',
+)
+
+# Output columns, in the same layout as a /calculate response
+RESULT_COLUMNS = (
+    'material_cost',
+    'labor_cost',
+    'machine_depreciation',
+    'electricity_cost',
+    'machine_cost_total',
+    'packaging_cost',
+    'total_cost',
+    'price_50',
+    'price_60',
+    'price_70',
+    'price_custom',
+)
+
+
+def job_columns(rows, base_job):
+    """
+    Turn a list of job dicts into one float64 array per input column
+
+    Args:
+        rows: List of dicts with any of JOB_COLUMNS plus an optional 'quantity'; a row's
+              'packaging_items' list is totalled into packaging_total as Job.from_dict does
+        base_job: Job whose values fill in missing keys
+
+    Returns:
+        dict: Column name -> np.ndarray, including an integer 'quantity' column
+    """
+    count = len(rows)
+    columns = {}
+    for key in JOB_COLUMNS:
+        default = getattr(base_job, key)
+        if key == 'packaging_total':
+            values = (items_total(row['packaging_items']) if 'packaging_items' in row
+                      else float(row.get(key, default)) for row in rows)
+        else:
+            values = (float(row.get(key, default)) for row in rows)
+        columns[key] = np.fromiter(values, dtype=np.float64, count=count)
+    columns['quantity'] = np.fromiter(
+        (int(row.get('quantity', 1)) for row in rows), dtype=np.int64, count=count
+    )
+    return columns
+
+
+def printer_rate_columns(rows, rate_card, printers):
+    """
+    Per-row machine rates for rows that name a registered printer
+
+    Args:
+        rows: List of job dicts, some with a 'printer_id'
+        rate_card: RateCard whose rates apply to rows without one
+        printers: PrinterRegistry
+
+    Returns:
+        dict: 'cost_per_hour' and 'electricity_per_hour' -> np.ndarray
+    """
+    cost_per_hour = np.full(len(rows), rate_card.cost_per_hour)
+    electricity_per_hour = np.full(len(rows), rate_card.electricity_per_hour)
+    for index, row in enumerate(rows):
+        printer_id = row.get('printer_id')
+        if printer_id not in (None, ''):
+            try:
+                printer = printers.require(printer_id)
+            except ValueError as e:
+                raise ValueError(f'Row {index + 1}: {e}')
+            cost_per_hour[index] = printer.cost_per_hour
+            electricity_per_hour[index] = printer.electricity_per_hour
+    return {'cost_per_hour': cost_per_hour, 'electricity_per_hour': electricity_per_hour}
+
+
+def price_columns(columns, rate_card):
+    """
+    Price job columns with whole-array operations
+
+    Args:
+        columns: Output of job_columns()
+        rate_card: RateCard shared by every job
+
+    Returns:
+        dict: RESULT_COLUMNS -> np.ndarray (rounded to cents), plus 'quantity' and 'line_total'
+    """
+    print_time = columns['print_time']
+
+    material_cost = columns['filament_required'] * columns['filament_cost'] * rate_card.material_per_gram
+    labor_cost = columns['labor_time'] * rate_card.labor_per_minute
+    # Rows priced on a registered printer carry their own rates
+    machine_depreciation = print_time * columns.get('cost_per_hour', rate_card.cost_per_hour)
+    electricity_cost = print_time * columns.get('electricity_per_hour', rate_card.electricity_per_hour)
+    machine_cost_total = machine_depreciation + electricity_cost
+    packaging_cost = columns['packaging_total'] + columns['shipping_cost']
+    total_cost = material_cost + labor_cost + machine_cost_total + packaging_cost
+
+    def calc_price(margin):
+        if margin >= 100:
+            return np.zeros_like(total_cost)
+        return total_cost / (1 - margin / 100)
+
+    results = {
+        'material_cost': material_cost,
+        'labor_cost': labor_cost,
+        'machine_depreciation': machine_depreciation,
+        'electricity_cost': electricity_cost,
+        'machine_cost_total': machine_cost_total,
+        'packaging_cost': packaging_cost,
+        'total_cost': total_cost,
+        'price_50': calc_price(50),
+        'price_60': calc_price(60),
+        'price_70': calc_price(70),
+        'price_custom': calc_price(rate_card.custom_margin),
+    }
+    results = {key: np.round(results[key], 2) for key in RESULT_COLUMNS}
+    results['quantity'] = columns['quantity']
+    results['line_total'] = np.round(total_cost * columns['quantity'], 2)
+    return results
+
+
+def price_batch(rows, rate_card, base_job, printers=None):
+    """
+    Price a list of job dicts and return plain lists ready for JSON
+
+    Args:
+        rows: List of job dicts
+        rate_card: RateCard shared by every job
+        base_job: Job supplying defaults for keys a row leaves out
+        printers: PrinterRegistry for rows that name a 'printer_id' (optional)
+
+    Returns:
+        dict: Column name -> list, one entry per row
+    """
+    columns = job_columns(rows, base_job)
+    if printers is not None and any(row.get('printer_id') not in (None, '') for row in rows):
+        columns.update(printer_rate_columns(rows, rate_card, printers))
+    results = price_columns(columns, rate_card)
+    return {key: value.tolist() for key, value in results.items()}
@@ -0,0 +1,381 @@
+"""
+PrintForge Benchmarks
+Times the pricing, export and config hot paths with synthetic job mixes
+
+Usage:
+    python benchmark.py -o bench.json
+    python benchmark.py --sizes 1,100 --cases calculate,calculate_batch
+    python benchmark.py -o new.json --compare bench.json
+
+Each case runs through the Flask test client (or the engine directly) so the
+numbers include request parsing and JSON encoding. Results are written as JSON
+so runs can be diffed between releases; --compare flags cases whose throughput
+dropped by more than --threshold percent and exits non-zero.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_SIZES = (1, 100, 10000, 100000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 10.0    # Percent drop in ops/sec reported as a regression
+MAX_REQUESTS = 100000       # Per-request cases send at most this many requests
+MAX_REPORTS = 200           # Single-quote reports built per size
+MAX_CONFIG_OPS = 1000       # Config saves/loads per size
+MAX_WORKBOOK_ROWS = 2000    # Larger workbook sizes are skipped unless raised
+
+SETTINGS = {
+    'printer_cost': 1200,
+    'upfront_cost': 150,
+    'annual_maintenance': 100,
+    'printer_life': 3,
+    'average_uptime': 50,
+    'power_consumption': 150,
+    'electricity_rate': 0.15,
+    'electricity_daily': 0,
+    'efficiency_factor': 1.1,
+    'labor_rate': 25,
+    'custom_margin': 75,
+}
+
+# (material, filament cost per kg, share of the mix)
+MATERIAL_MIX = (
+    ('PLA', 40, 0.5),
+    ('PETG', 55, 0.25),
+    ('ABS', 50, 0.1),
+    ('TPU', 75, 0.1),
+    ('Nylon', 80, 0.05),
+)
+
+
+def synthetic_jobs(count, seed=42):
+    """
+    Build a reproducible mix of jobs: mostly small PLA parts with a long tail of big prints
+
+    Returns:
+        list: Job dicts accepted by /calculate and /calculate-batch
+    """
+    rng = random.Random(seed)
+    materials = [m for m, _, _ in MATERIAL_MIX]
+    costs = {m: c for m, c, _ in MATERIAL_MIX}
+    weights = [w for _, _, w in MATERIAL_MIX]
+
+    jobs = []
+    for i in range(count):
+        material = rng.choices(materials, weights)[0]
+        grams = round(rng.lognormvariate(3.5, 0.9), 1)
+        jobs.append({
+            'part_name': f'Part {i + 1}',
+            'material': material,
+            'filament_cost': costs[material],
+            'filament_required': grams,
+            'print_time': round(grams / 12 + rng.uniform(0.2, 1.5), 2),
+            'labor_time': rng.choice((5, 10, 15, 30)),
+            'packaging_total': rng.choice((0, 0.5, 1.5)),
+            'shipping_cost': 0,
+            'quantity': rng.choice((1, 1, 1, 2, 5, 10)),
+        })
+    return jobs
+
+
+def workbook_quotes(jobs, rate_card):
+    """Price jobs and shape them like the /export-workbook payload"""
+    from pricing_engine import Job, price_many
+
+    quotes = []
+    for job, quote in zip(jobs, price_many([Job.from_dict(job) for job in jobs], rate_card)):
+        quotes.append({
+            'part_name': job['part_name'],
+            'material': job['material'],
+            'weight': job['filament_required'],
+            'print_time': job['print_time'],
+            'quantity': job['quantity'],
+            'material_cost': quote['material_cost'],
+            'labor_cost': quote['labor_cost'],
+            'machine_cost': quote['machine_cost_total'],
+            'packaging_cost': quote['packaging_cost'],
+        })
+    return quotes
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _check(response):
+    if response.status_code != 200:
+        raise RuntimeError(f'HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}')
+
+
+class Bench:
+    """Builds the operations for each case against one Flask test client"""
+
+    def __init__(self, client, repeat=DEFAULT_REPEAT, max_workbook_rows=MAX_WORKBOOK_ROWS,
+                 response_caches=(), rate_cards=None):
+        self.client = client
+        self.repeat = repeat
+        self.max_workbook_rows = max_workbook_rows
+        self.response_caches = response_caches
+        self.rate_cards = rate_cards
+
+    def reset(self, rate_cards=True):
+        """
+        Empty the app's caches so no operation is answered from another's cached response
+
+        Args:
+            rate_cards: Also drop derived rate cards (kept after the warm-up so only
+                        response caching is excluded from the timings)
+        """
+        for cache in self.response_caches:
+            cache.clear()
+        if rate_cards and self.rate_cards is not None:
+            self.rate_cards.clear()
+
+    def calculate(self, size):
+        """One /calculate request per part"""
+        payloads = [{**SETTINGS, **job} for job in synthetic_jobs(min(size, MAX_REQUESTS))]
+
+        def op(payload):
+            return lambda: _check(self.client.post('/calculate', json=payload))
+
+        return [op(p) for p in payloads], 1
+
+    def engine(self, size):
+        """pricing_engine.price_many over every part, without Flask"""
+        from pricing_engine import Job, RateCard, price_many
+
+        rate_card = RateCard.from_dict(SETTINGS)
+        jobs = synthetic_jobs(size)
+        return [lambda: price_many([Job.from_dict(job) for job in jobs], rate_card)] * self.repeat, size
+
+    def calculate_batch(self, size):
+        """One /calculate-batch request holding every part"""
+        payload = {**SETTINGS, 'jobs': synthetic_jobs(size)}
+        return [lambda: _check(self.client.post('/calculate-batch', json=payload))] * self.repeat, size
+
+    def export_excel(self, size):
+        """Single-quote /export-excel reports, one per part"""
+        from pricing_engine import Job, RateCard, price
+
+        rate_card = RateCard.from_dict(SETTINGS)
+        payloads = []
+        for job in synthetic_jobs(min(size, MAX_REPORTS)):
+            # Same shape the front-end posts: form fields plus the quote under 'results'
+            payloads.append({**SETTINGS, **job, 'results': price(Job.from_dict(job), rate_card)})
+
+        def op(payload):
+            return lambda: _check(self.client.post('/export-excel', json=payload))
+
+        return [op(p) for p in payloads], 1
+
+    def export_workbook(self, size):
+        """One /export-workbook request with a sheet per part"""
+        if size > self.max_workbook_rows:
+            return None, size
+        from pricing_engine import RateCard
+
+        payload = {
+            'title': 'Benchmark',
+            'custom_margin': SETTINGS['custom_margin'],
+            'quotes': workbook_quotes(synthetic_jobs(size), RateCard.from_dict(SETTINGS)),
+        }
+        return [lambda: _check(self.client.post('/export-workbook', json=payload))] * self.repeat, size
+
+    def save_config(self, size):
+        """/save-config round trips into a scratch folder"""
+        payload = {'filename': 'benchmark_config.json', 'config': dict(SETTINGS)}
+        return [lambda: _check(self.client.post('/save-config', json=payload))] * min(size, MAX_CONFIG_OPS), 1
+
+    def load_config(self, size):
+        """/load-config uploads of a saved configuration"""
+        body = json.dumps({**SETTINGS, 'version': '1.0'}).encode('utf-8')
+
+        def op():
+            data = {'file': (io.BytesIO(body), 'config.json')}
+            _check(self.client.post('/load-config', data=data, content_type='multipart/form-data'))
+
+        return [op] * min(size, MAX_CONFIG_OPS), 1
+
+
+CASES = ('calculate', 'engine', 'calculate_batch', 'export_excel', 'export_workbook', 'save_config', 'load_config')
+
+
+def run_case(bench, case, size):
+    """
+    Time one case at one size
+
+    Latency is measured per operation with tracing off; peak memory comes
+    from a separate traced run of the first operation. The app's caches are
+    emptied before the case, after the warm-up and before the traced run, so
+    repeated payloads (the same seed across sizes, the repeated first
+    operation) are priced rather than served from the response cache.
+
+    Returns:
+        dict: Result row, or None if the case skips this size
+    """
+    ops, items_per_op = getattr(bench, case)(size)
+    if ops is None:
+        return None
+
+    bench.reset()
+    ops[0]()  # Warm-up (imports, rate card cache, first-request setup)
+    bench.reset(rate_cards=False)
+
+    timings = []
+    started = time.perf_counter()
+    for op in ops:
+        t0 = time.perf_counter()
+        op()
+        timings.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    bench.reset(rate_cards=False)
+    tracemalloc.start()
+    ops[0]()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'case': case,
+        'size': size,
+        'ops': len(ops),
+        'seconds': round(elapsed, 4),
+        'ops_per_sec': round(len(ops) / elapsed, 2),
+        'items_per_sec': round(len(ops) * items_per_op / elapsed, 2),
+        'p50_ms': round(_percentile(timings, 50) * 1000, 3),
+        'p99_ms': round(_percentile(timings, 99) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run(cases=CASES, sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, max_workbook_rows=MAX_WORKBOOK_ROWS,
+        progress=None):
+    """
+    Run the benchmark suite
+
+    Returns:
+        dict: Environment metadata plus one result row per case and size
+    """
+    # Importing app creates data/ and uploads/ (and the SQLite stores) in the working directory;
+    # run from a scratch folder so a benchmark never touches the real ones
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='printforge-bench-')
+    os.chdir(workdir)
+    try:
+        import app as app_module
+
+        app_module.UPLOAD_FOLDER = Path(workdir) / 'uploads'
+        app_module.DATA_FOLDER = Path(workdir) / 'data'
+        app_module.UPLOAD_FOLDER.mkdir(exist_ok=True)
+        app_module.DATA_FOLDER.mkdir(exist_ok=True)
+        bench = Bench(app_module.app.test_client(), repeat, max_workbook_rows,
+                      response_caches=(app_module.quote_cache, app_module.risk_cache),
+                      rate_cards=app_module.rate_cards)
+
+        results = []
+        for case in cases:
+            for size in sizes:
+                result = run_case(bench, case, size)
+                if result is None:
+                    continue
+                results.append(result)
+                if progress:
+                    progress(result)
+    finally:
+        os.chdir(cwd)
+        # The app's SQLite files may still be open (Windows can't delete them until exit)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(baseline, current):
+    """
+    Compare two benchmark runs by ops/sec
+
+    Returns:
+        list: (case, size, baseline ops/sec, current ops/sec, percent change) for every shared row
+    """
+    previous = {(r['case'], r['size']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        old = previous.get((result['case'], result['size']))
+        if old is None or not old['ops_per_sec']:
+            continue
+        change = (result['ops_per_sec'] - old['ops_per_sec']) / old['ops_per_sec'] * 100
+        rows.append((result['case'], result['size'], old['ops_per_sec'], result['ops_per_sec'], change))
+    return rows
+
+
+def print_result(result):
+    print(f"{result['case']:<16} {result['size']:>7}  {result['ops_per_sec']:>12,.1f} ops/s  "
+          f"{result['items_per_sec']:>12,.1f} parts/s  p50 {result['p50_ms']:>9.3f} ms  "
+          f"p99 {result['p99_ms']:>9.3f} ms  peak {result['peak_memory_kb']:>10,.1f} KB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the PrintForge pricing and export paths')
+    parser.add_argument('-o', '--output', help='Write results to this JSON file')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma-separated cases to run')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated part counts')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Repetitions for whole-batch cases')
+    parser.add_argument('--max-workbook-rows', type=int, default=MAX_WORKBOOK_ROWS,
+                        help='Skip export_workbook sizes above this')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Percent drop in ops/sec reported as a regression')
+    args = parser.parse_args(argv)
+
+    cases = [c.strip() for c in args.cases.split(',') if c.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    report = run(cases, sizes, args.repeat, args.max_workbook_rows, progress=print_result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        regressions = 0
+        print(f"\nCompared with {args.compare} ({baseline.get('created', 'unknown date')}):")
+        for case, size, old, new, change in compare(baseline, report):
+            flag = ''
+            if change < -args.threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{case:<16} {size:>7}  {old:>12,.1f} -> {new:>12,.1f} ops/s  {change:+7.1f}%{flag}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
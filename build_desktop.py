@@ -46,6 +46,12 @@ def build_executable():
     # Get project directory
     project_dir = Path(__file__).parent
 
+    # Fingerprint and precompress static files (static/dist) so they are bundled and served with immutable caching
+    print("Building static assets...")
+    import assets
+    manifest = assets.build(project_dir / "static")
+    print(f"{len(manifest['files'])} static files fingerprinted\n")
+
     # Build command - use python -m PyInstaller instead of pyinstaller command
     cmd = [
         sys.executable,
@@ -57,7 +63,9 @@ def build_executable():
         "--add-data", f"{project_dir}/static{os.pathsep}static",
         "--hidden-import", "bottle",
         "--hidden-import", "openpyxl",
+        "--hidden-import", "lxml.etree",
         "--hidden-import", "werkzeug",
+        "--hidden-import", "waitress",
         "--hidden-import", "webview",
         "--clean",  # Clean cache
         str(project_dir / "app_desktop.py")
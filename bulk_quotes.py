@@ -0,0 +1,232 @@
+"""
+PrintForge Bulk Quotes
+Streams NDJSON/CSV job rows through the pricing engine in fixed-size chunks
+
+Used by the /calculate-stream route and runnable from the command line:
+
+    python bulk_quotes.py jobs.csv -o priced.csv --settings my_config.json
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from itertools import islice
+
+from pricing_engine import Job, RateCard, price_many
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Identifying columns copied from the input row to the priced row
+PASSTHROUGH_FIELDS = ('id', 'sku', 'part_name')
+
+RESULT_FIELDS = (
+    'material_cost',
+    'labor_cost',
+    'machine_depreciation',
+    'electricity_cost',
+    'machine_cost_total',
+    'packaging_cost',
+    'total_cost',
+    'price_50',
+    'price_60',
+    'price_70',
+    'price_custom',
+)
+
+CSV_FIELDS = ('row',) + PASSTHROUGH_FIELDS + ('success', 'error') + RESULT_FIELDS
+
+
+def _decode(line):
+    """Return a text line, decoding UTF-8 bytes (raises UnicodeDecodeError)"""
+    return line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def _decode_lines(lines, bad_lines):
+    """Decode lines one at a time; a line that is not valid UTF-8 is recorded in bad_lines and replaced"""
+    for line in lines:
+        try:
+            yield _decode(line)
+        except UnicodeDecodeError as e:
+            bad_lines.append(e)
+            yield line.decode('utf-8', errors='replace')
+
+
+def read_ndjson(lines):
+    """
+    Parse NDJSON lines (text, or UTF-8 bytes) lazily
+
+    Yields:
+        tuple: (row number, dict) or (row number, Exception) for a malformed line
+    """
+    row_number = 0
+    for line in lines:
+        try:
+            line = _decode(line).strip()
+        except UnicodeDecodeError as e:
+            row_number += 1
+            yield row_number, ValueError(f'Row is not valid UTF-8: {e}')
+            continue
+        if not line:
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError('Row must be a JSON object')
+            yield row_number, row
+        except ValueError as e:
+            yield row_number, e
+
+
+def read_csv(lines):
+    """
+    Parse CSV lines (text, or UTF-8 bytes) lazily; the header row names the job fields
+
+    Empty cells are treated as missing so the defaults apply.
+
+    Yields:
+        tuple: (row number, dict) or (row number, Exception) for a row that is
+               not valid UTF-8 or not valid CSV
+    """
+    bad_lines = []
+    reader = csv.DictReader(_decode_lines(lines, bad_lines))
+    row_number = 0
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            row = ValueError(f'Malformed CSV row: {e}')
+        row_number += 1
+        if bad_lines:
+            row = ValueError(f'Row is not valid UTF-8: {bad_lines[-1]}')
+            bad_lines.clear()
+        if isinstance(row, Exception):
+            yield row_number, row
+        else:
+            yield row_number, {key: value for key, value in row.items()
+                               if key and value not in ('', None)}
+
+
+def price_rows(rows, rate_card, defaults=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Price parsed rows a chunk at a time, keeping only one chunk in memory
+
+    Args:
+        rows: Iterable of (row number, dict or Exception) from read_ndjson/read_csv
+        rate_card: RateCard shared by every row
+        defaults: Job fields (e.g. filament_cost) applied where a row leaves them out
+        chunk_size: Rows priced per chunk
+
+    Yields:
+        dict: Priced row, or {'success': False, 'error': ...} for a row that failed
+    """
+    defaults = defaults or {}
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+
+        output = []
+        jobs = []
+        for row_number, row in chunk:
+            entry = {'row': row_number}
+            if not isinstance(row, Exception):
+                entry.update((key, row[key]) for key in PASSTHROUGH_FIELDS if key in row)
+                try:
+                    jobs.append(Job.from_dict({**defaults, **row}))
+                    output.append(entry)
+                    continue
+                except (TypeError, ValueError, KeyError) as e:
+                    row = e
+            entry['success'] = False
+            entry['error'] = str(row)
+            output.append(entry)
+
+        quotes = iter(price_many(jobs, rate_card))
+        for entry in output:
+            if 'error' not in entry:
+                entry['success'] = True
+                entry.update(next(quotes))
+            yield entry
+
+
+def write_ndjson(results):
+    """Serialize priced rows as NDJSON lines"""
+    for entry in results:
+        yield json.dumps(entry) + '\n'
+
+
+def write_csv(results):
+    """Serialize priced rows as CSV lines, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for entry in results:
+        writer.writerow(entry)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def stream_quotes(lines, rate_card, defaults=None, fmt='ndjson', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Price an input stream end to end
+
+    Args:
+        lines: Iterable of text lines, or UTF-8 byte lines
+        rate_card: RateCard shared by every row
+        defaults: Job fields applied where a row leaves them out
+        fmt: 'ndjson' or 'csv'; output uses the same format as input
+        chunk_size: Rows priced per chunk (at least 1)
+
+    Returns:
+        iterator: Serialized output lines
+
+    Raises:
+        ValueError: chunk_size is less than 1 (checked before any output is produced)
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    if fmt == 'csv':
+        return write_csv(price_rows(read_csv(lines), rate_card, defaults, chunk_size))
+    return write_ndjson(price_rows(read_ndjson(lines), rate_card, defaults, chunk_size))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Price NDJSON or CSV job rows in bulk')
+    parser.add_argument('input', help="Input file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output file ('-' for stdout)")
+    parser.add_argument('--format', choices=('ndjson', 'csv'),
+                        help='Input/output format (default: from the input file extension)')
+    parser.add_argument('--settings', help='Saved configuration JSON holding the shop rates')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.input.lower().endswith('.csv') else 'ndjson')
+
+    settings = {}
+    if args.settings:
+        with open(args.settings, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+    rate_card = RateCard.from_dict(settings)
+
+    # Read bytes so a line that isn't valid UTF-8 becomes a row error instead of stopping the run
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        for line in stream_quotes(source, rate_card, settings, fmt, args.chunk_size):
+            target.write(line)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == '__main__':
+    main()
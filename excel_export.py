@@ -0,0 +1,421 @@
+"""
+PrintForge Excel Export
+Write-only (streaming) workbook builder for pricing reports
+"""
+
+import io
+import re
+import tempfile
+from copy import copy
+from datetime import datetime
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.worksheet.cell_range import CellRange
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Styles are built once and shared by every cell in every export
+HEADER_FONT = Font(name='Arial', size=14, bold=True, color='FFFFFF')
+HEADER_FILL = PatternFill(start_color='FF6B35', end_color='FF6B35', fill_type='solid')
+SECTION_FONT = Font(name='Arial', size=12, bold=True)
+SECTION_FILL = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
+LABEL_FONT = Font(name='Arial', size=10, bold=True)
+VALUE_FONT = Font(name='Arial', size=10)
+CURRENCY_FONT = Font(name='Arial', size=10, bold=True, color='FF6B35')
+TOTAL_FONT = Font(name='Arial', size=14, bold=True, color='FF6B35')
+THIN_SIDE = Side(style='thin', color='000000')
+BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+CENTER = Alignment(horizontal='center', vertical='center')
+RIGHT = Alignment(horizontal='right')
+
+CURRENCY_FORMAT = '"$"#,##0.00'
+PERCENT_FORMAT = '0%'
+
+COLUMN_WIDTHS = {'A': 30, 'B': 15, 'C': 15, 'D': 15}
+SUMMARY_WIDTHS = {'A': 8, 'B': 32, 'C': 12, 'D': 12, 'E': 14, 'F': 8, 'G': 14, 'H': 14, 'I': 16}
+
+INVALID_TITLE_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+# Exports above this size spill from memory to a temporary file
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class SheetWriter:
+    """
+    Appends styled rows to a write-only worksheet
+
+    Rows are streamed to disk as they are appended, so only the current row
+    is ever held in memory.
+    """
+
+    def __init__(self, ws, widths=COLUMN_WIDTHS):
+        self.ws = ws
+        self.row = 0
+        self._styles = {}
+        for column, width in widths.items():
+            ws.column_dimensions[column].width = width
+
+    def cell(self, value, font=None, fill=None, border=None, alignment=None, number_format=None):
+        """Create a styled cell for this sheet"""
+        cell = WriteOnlyCell(self.ws, value=value)
+        style = (font, fill, border, alignment, number_format)
+        if any(part is not None for part in style):
+            cell._style = copy(self._style_array(style))
+        return cell
+
+    def text(self, value, font=None, fill=None, border=None, alignment=None, number_format=None):
+        """
+        Create a styled cell for user-entered text
+
+        openpyxl turns any string starting with '=' into a formula; a part
+        name like '=HYPERLINK(...)' must stay text, so strings are always
+        written as string cells.
+        """
+        cell = self.cell(value, font, fill, border, alignment, number_format)
+        if isinstance(value, str):
+            cell.data_type = 's'
+        return cell
+
+    def _style_array(self, style):
+        """
+        Resolve a style combination to openpyxl's internal style indexes once
+
+        Assigning Font/Border objects hashes them on every cell, which
+        dominates export time for large tables; copying the resolved
+        indexes is just an array copy.
+        """
+        key = tuple(id(part) for part in style)
+        cached = self._styles.get(key)
+        if cached is None:
+            font, fill, border, alignment, number_format = style
+            template = WriteOnlyCell(self.ws)
+            if font is not None:
+                template.font = font
+            if fill is not None:
+                template.fill = fill
+            if border is not None:
+                template.border = border
+            if alignment is not None:
+                template.alignment = alignment
+            if number_format is not None:
+                template.number_format = number_format
+            # Keep the style objects alive so their ids stay unique
+            cached = self._styles[key] = (template._style, style)
+        return cached[0]
+
+    def append(self, cells=()):
+        """Append a row of cells (or plain values) and return its row number"""
+        self.ws.append(list(cells))
+        self.row += 1
+        return self.row
+
+    def blank(self):
+        self.append()
+
+    def merge(self, row, first='A', last='D'):
+        self.ws.merged_cells.add(CellRange(f'{first}{row}:{last}{row}'))
+
+    def title(self, text, height=25):
+        # Row dimensions must be set before the row is streamed out
+        self.ws.row_dimensions[self.row + 1].height = height
+        row = self.append([self.text(text, HEADER_FONT, HEADER_FILL, alignment=CENTER)])
+        self.merge(row)
+
+    def section(self, text):
+        row = self.append([self.text(text, SECTION_FONT, SECTION_FILL)])
+        self.merge(row)
+
+    def label_value(self, label, value):
+        self.append([self.cell(label, LABEL_FONT), self.text(value, VALUE_FONT)])
+
+    def label_amount(self, label, value, font=CURRENCY_FONT, label_font=LABEL_FONT):
+        """Label in column A, right-aligned amount in column C"""
+        self.append([self.cell(label, label_font), None, self.cell(value, font, alignment=RIGHT)])
+
+    def table_header(self, headers):
+        self.append([self.cell(header, LABEL_FONT, border=BORDER) for header in headers])
+
+    def table_row(self, values):
+        self.append([self.text(value, VALUE_FONT, border=BORDER) for value in values])
+
+    def close(self):
+        """Finish the sheet so its temporary file is closed before the next one is written"""
+        self.ws.close()
+
+
+def _item_rows(writer, items):
+    for item in items:
+        quantity = item.get('quantity', 0)
+        unit_cost = item.get('unit_cost', 0)
+        writer.table_row([
+            item.get('name', ''),
+            quantity,
+            f"${unit_cost:.2f}",
+            f"${quantity * unit_cost:.2f}",
+        ])
+
+
+def write_pricing_report(wb, data, title='Pricing Breakdown'):
+    """
+    Append a single-quote pricing breakdown sheet to a write-only workbook
+
+    Args:
+        wb: Workbook created with write_only=True
+        data: /export-excel payload (form fields plus 'results')
+        title: Sheet title
+    """
+    writer = SheetWriter(wb.create_sheet(title))
+
+    writer.title("PRINTFORGE PRICING BREAKDOWN")
+    writer.blank()
+
+    writer.section("PRODUCT INFORMATION")
+    for label, value in (
+        ("Part Name:", data.get('part_name', 'New Part')),
+        ("Revision:", data.get('revision', 'V1')),
+        ("Prepared By:", data.get('prepared_by', 'Marcus')),
+        ("Date:", datetime.now().strftime("%Y-%m-%d")),
+        ("Material:", data.get('material_type', 'ABS')),
+    ):
+        writer.label_value(label, value)
+    writer.blank()
+
+    writer.section("MATERIAL & PRINT SETTINGS")
+    for label, value in (
+        ("Filament Cost:", f"${data.get('filament_cost', 40):.2f} /kg"),
+        ("Filament Required:", f"{data.get('filament_required', 0):.2f} g"),
+        ("Print Time:", f"{data.get('print_time', 0):.2f} hours"),
+        ("Labor Time:", f"{data.get('labor_time', 0)} minutes"),
+    ):
+        writer.label_value(label, value)
+    writer.blank()
+
+    hardware_items = data.get('hardware_items', [])
+    if hardware_items:
+        writer.section("HARDWARE COMPONENTS")
+        writer.table_header(["Name", "Quantity", "Unit Cost", "Total"])
+        _item_rows(writer, hardware_items)
+        writer.blank()
+
+    packaging_items = data.get('packaging_items', [])
+    shipping_cost = data.get('shipping_cost', 0)
+    if packaging_items or shipping_cost > 0:
+        writer.section("PACKAGING & SHIPPING")
+        writer.table_header(["Name", "Quantity", "Unit Cost", "Total"])
+        _item_rows(writer, packaging_items)
+        if shipping_cost > 0:
+            writer.table_row(["Shipping", 1, f"${shipping_cost:.2f}", f"${shipping_cost:.2f}"])
+        writer.blank()
+
+    results = data.get('results', {})
+    writer.section("COST BREAKDOWN")
+    for label, value in (
+        ("Materials Cost:", results.get('material_cost', 0)),
+        ("Labor Cost:", results.get('labor_cost', 0)),
+        ("Machine Cost:", results.get('machine_cost_total', 0)),
+        ("Packaging & Shipping:", results.get('packaging_cost', 0)),
+    ):
+        writer.label_amount(label, f"${value:.2f}")
+    writer.blank()
+
+    writer.label_amount("TOTAL LANDED COST:", f"${results.get('total_cost', 0):.2f}",
+                        font=TOTAL_FONT, label_font=TOTAL_FONT)
+    writer.blank()
+
+    writer.section("SUGGESTED PRICING")
+    for label, value in (
+        ("50% Margin:", results.get('price_50', 0)),
+        ("60% Margin:", results.get('price_60', 0)),
+        ("70% Margin:", results.get('price_70', 0)),
+        (f"{results.get('custom_margin', 75)}% Margin (Custom):", results.get('price_custom', 0)),
+    ):
+        writer.label_amount(label, f"${value:.2f}")
+
+
+def _sheet_title(index, name, used):
+    """Build a unique Excel-safe sheet title (max 31 chars, none of []:*?/\\)"""
+    safe_name = INVALID_TITLE_CHARS.sub('_', str(name or 'Part'))
+    base = f"{index} {safe_name}"[:31].rstrip(" '")
+    title = base
+    suffix = 2
+    while title.lower() in used:
+        tag = f" ({suffix})"
+        title = base[:31 - len(tag)] + tag
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+
+def _sheet_ref(title, cell):
+    """Formula reference to a cell on another sheet"""
+    return "'" + title.replace("'", "''") + "'!" + cell
+
+
+# Row layout of a quote breakdown sheet; the summary formulas point at these cells
+QUOTE_ROW_QUANTITY = 8
+QUOTE_ROW_FIRST_COST = 12
+QUOTE_ROW_LAST_COST = 15
+QUOTE_ROW_TOTAL = 17
+QUOTE_ROW_LINE_TOTAL = 18
+QUOTE_ROW_CUSTOM_PRICE = 24
+
+
+def _write_quote_sheet(wb, title, quote, custom_margin):
+    """
+    Write one part's breakdown sheet with live formulas
+
+    The rows follow the QUOTE_ROW_* layout so the summary sheet can link to them.
+    """
+    writer = SheetWriter(wb.create_sheet(title))
+    currency = dict(number_format=CURRENCY_FORMAT)
+
+    writer.title(f"{quote.get('part_name') or 'Part'} - PRICING BREAKDOWN")
+    writer.blank()
+
+    writer.section("PART")
+    writer.label_value("Part Name:", quote.get('part_name') or 'Part')
+    writer.label_value("Material:", quote.get('material') or '')
+    writer.label_value("Weight (g):", float(quote.get('weight') or 0))
+    writer.label_value("Print Time (h):", float(quote.get('print_time') or 0))
+    writer.label_value("Quantity:", int(quote.get('quantity') or 1))
+    writer.label_value("Date:", quote.get('date') or datetime.now().strftime("%Y-%m-%d"))
+    writer.blank()
+
+    writer.section("COST BREAKDOWN")
+    for label, key in (
+        ("Materials Cost:", 'material_cost'),
+        ("Labor Cost:", 'labor_cost'),
+        ("Machine Cost:", 'machine_cost'),
+        ("Packaging & Shipping:", 'packaging_cost'),
+    ):
+        writer.append([writer.cell(label, LABEL_FONT), None,
+                       writer.cell(float(quote.get(key) or 0), CURRENCY_FONT, alignment=RIGHT, **currency)])
+    writer.blank()
+
+    cost_range = f"C{QUOTE_ROW_FIRST_COST}:C{QUOTE_ROW_LAST_COST}"
+    writer.append([writer.cell("TOTAL LANDED COST:", TOTAL_FONT), None,
+                   writer.cell(f"=SUM({cost_range})", TOTAL_FONT, alignment=RIGHT, **currency)])
+    writer.append([writer.cell("Line Total (x Quantity):", LABEL_FONT), None,
+                   writer.cell(f"=C{QUOTE_ROW_TOTAL}*B{QUOTE_ROW_QUANTITY}", CURRENCY_FONT,
+                               alignment=RIGHT, **currency)])
+    writer.blank()
+
+    writer.section("SUGGESTED PRICING")
+    for label, margin in (
+        ("50% Margin:", 50),
+        ("60% Margin:", 60),
+        ("70% Margin:", 70),
+        ("Custom Margin:", custom_margin),
+    ):
+        row = writer.row + 1
+        price = f"=IF(B{row}<1,C{QUOTE_ROW_TOTAL}/(1-B{row}),0)"
+        writer.append([writer.cell(label, LABEL_FONT),
+                       writer.cell(margin / 100, VALUE_FONT, number_format=PERCENT_FORMAT),
+                       writer.cell(price, CURRENCY_FONT, alignment=RIGHT, **currency)])
+
+    writer.close()
+
+
+def write_quote_workbook(wb, quotes, title='Quotes', custom_margin=75):
+    """
+    Write a summary sheet plus one breakdown sheet per quote
+
+    Summary cells are formulas linked to each part sheet, so edits to a
+    part's costs flow through to the totals. Each part sheet is closed as
+    soon as it is written, so only one sheet is open at a time.
+
+    Args:
+        wb: Workbook created with write_only=True
+        quotes: List of dicts with part_name, material, weight, print_time,
+                quantity, date and material/labor/machine/packaging_cost
+        title: Heading for the summary sheet
+        custom_margin: Custom margin percentage used for the price column
+    """
+    used = {'summary'}
+    titles = [_sheet_title(index, quote.get('part_name'), used)
+              for index, quote in enumerate(quotes, start=1)]
+
+    summary = SheetWriter(wb.create_sheet('Summary'), widths=SUMMARY_WIDTHS)
+    summary.title(title.upper())
+    summary.merge(summary.row, last='I')
+    summary.blank()
+    summary.table_header(["#", "Part Name", "Material", "Weight (g)", "Print Time (h)",
+                          "Qty", "Unit Cost", "Line Total", f"Price @ {custom_margin:g}%"])
+
+    first_row = summary.row + 1
+    for index, (quote, sheet) in enumerate(zip(quotes, titles), start=1):
+        row = summary.row + 1
+        summary.append([
+            summary.cell(index, VALUE_FONT, border=BORDER),
+            summary.text(quote.get('part_name') or 'Part', VALUE_FONT, border=BORDER),
+            summary.text(quote.get('material') or '', VALUE_FONT, border=BORDER),
+            summary.cell(float(quote.get('weight') or 0), VALUE_FONT, border=BORDER),
+            summary.cell(float(quote.get('print_time') or 0), VALUE_FONT, border=BORDER),
+            summary.cell(f"={_sheet_ref(sheet, f'B{QUOTE_ROW_QUANTITY}')}", VALUE_FONT, border=BORDER),
+            summary.cell(f"={_sheet_ref(sheet, f'C{QUOTE_ROW_TOTAL}')}", VALUE_FONT, border=BORDER,
+                         number_format=CURRENCY_FORMAT),
+            summary.cell(f"=G{row}*F{row}", VALUE_FONT, border=BORDER, number_format=CURRENCY_FORMAT),
+            summary.cell(f"={_sheet_ref(sheet, f'C{QUOTE_ROW_CUSTOM_PRICE}')}", VALUE_FONT, border=BORDER,
+                         number_format=CURRENCY_FORMAT),
+        ])
+    last_row = max(summary.row, first_row)
+
+    summary.blank()
+    summary.append([
+        None,
+        summary.cell("TOTAL", TOTAL_FONT),
+        None, None, None,
+        summary.cell(f"=SUM(F{first_row}:F{last_row})", LABEL_FONT),
+        None,
+        summary.cell(f"=SUM(H{first_row}:H{last_row})", TOTAL_FONT, number_format=CURRENCY_FORMAT),
+    ])
+    summary.close()
+
+    for quote, sheet in zip(quotes, titles):
+        _write_quote_sheet(wb, sheet, quote, custom_margin)
+
+
+def build_quote_workbook(quotes, title='Quotes', custom_margin=75):
+    """
+    Build a multi-quote workbook (batch, history or comparison export)
+
+    Returns:
+        file: Spooled temporary file holding the .xlsx, rewound; deleted when closed
+    """
+    wb = Workbook(write_only=True)
+    write_quote_workbook(wb, quotes, title, custom_margin)
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+def save_to_bytes(wb):
+    """Serialize a workbook into an in-memory buffer, rewound and ready to send"""
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def build_pricing_report(data):
+    """
+    Build the single-quote Excel report
+
+    Args:
+        data: /export-excel payload
+
+    Returns:
+        io.BytesIO: The .xlsx file contents
+    """
+    wb = Workbook(write_only=True)
+    write_pricing_report(wb, data)
+    return save_to_bytes(wb)
+
+
+def report_filename(data):
+    """Download filename for a single-quote report"""
+    part_name = data.get('part_name', 'New_Part').replace(' ', '_')
+    return f"{part_name}_Pricing.xlsx"
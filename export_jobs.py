@@ -0,0 +1,219 @@
+"""
+PrintForge Export Jobs
+Background queue for Excel exports so large reports don't block pricing requests
+
+With a spool directory, every job's status and finished file are also written
+there by job id, so when serve.py runs several gunicorn worker processes a
+status poll or download that lands on a different worker still finds the job.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_WORKERS = 2
+DEFAULT_TTL = 15 * 60        # Seconds a finished result is kept for download
+DEFAULT_MAX_RESULTS = 32     # Finished jobs kept before the oldest are evicted
+
+JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+def render_pricing_report(data):
+    """Render the single-quote report to bytes (module-level so process pools can pickle it)"""
+    import excel_export
+    return excel_export.build_pricing_report(data).getvalue()
+
+
+def render_quote_workbook(quotes, title, custom_margin):
+    """Render a multi-quote workbook to bytes"""
+    import excel_export
+    with excel_export.build_quote_workbook(quotes, title, custom_margin) as output:
+        return output.read()
+
+
+class ExportJob:
+    """State of one queued export"""
+
+    def __init__(self, kind, filename, mimetype):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.filename = filename
+        self.mimetype = mimetype
+        self.status = 'queued'
+        self.error = None
+        self.result = None
+        self.future = None
+        self.created = time.time()
+        self.finished = None
+
+    @classmethod
+    def from_dict(cls, meta):
+        """Rebuild a job from its spooled status (see ExportJobQueue)"""
+        job = cls(meta['kind'], meta['filename'], meta['mimetype'])
+        job.id = meta['job_id']
+        job.status = meta['status']
+        job.error = meta['error']
+        job.created = meta['created']
+        job.finished = meta['finished']
+        return job
+
+    def to_dict(self):
+        status = self.status
+        if status == 'queued' and self.future is not None and self.future.running():
+            status = 'running'
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': status,
+            'filename': self.filename,
+            'error': self.error,
+            'size': len(self.result) if self.result is not None else None,
+            'created': self.created,
+            'finished': self.finished,
+        }
+
+
+class ExportJobQueue:
+    """
+    Runs export renderers on a worker pool and keeps finished files for a while
+
+    Finished results live in a bounded cache: anything older than `ttl`
+    seconds, or beyond the newest `max_results` finished jobs, is dropped.
+    Queued and running jobs are never evicted.
+
+    When `spool_dir` is set, each job is also written there as <id>.json
+    (status) and <id>.result (the finished file). get() falls back to the
+    spool for jobs this process doesn't know, which is how other worker
+    processes answer polls for it. A job owned by another process reports
+    'queued' until it finishes.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, use_processes=False,
+                 ttl=DEFAULT_TTL, max_results=DEFAULT_MAX_RESULTS, spool_dir=None):
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=max_workers)
+        self.ttl = ttl
+        self.max_results = max_results
+        self.spool_dir = Path(spool_dir) if spool_dir is not None else None
+        if self.spool_dir is not None:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, filename, mimetype, func, *args):
+        """
+        Queue an export
+
+        Args:
+            kind: Short label, e.g. 'excel' or 'workbook'
+            filename: Download name for the finished file
+            mimetype: MIME type of the finished file
+            func: Module-level renderer returning bytes
+            *args: Arguments for func
+
+        Returns:
+            ExportJob: The queued job
+        """
+        job = ExportJob(kind, filename, mimetype)
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+            self._sweep_spool()
+            self._spool(job)
+
+        job.future = self._executor.submit(func, *args)
+        job.future.add_done_callback(lambda f: self._finish(job, f))
+        return job
+
+    def _finish(self, job, future):
+        with self._lock:
+            try:
+                job.result = future.result()
+                job.status = 'done'
+            except Exception as e:
+                job.error = str(e)
+                job.status = 'failed'
+            job.future = None
+            job.finished = time.time()
+            self._spool(job)
+            # Move to the end so eviction drops the oldest finished jobs first
+            if job.id in self._jobs:
+                self._jobs.move_to_end(job.id)
+            self._evict()
+
+    def _evict(self):
+        """Drop expired results and keep at most max_results finished jobs (caller holds the lock)"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished is not None]
+        for job in finished:
+            if now - job.finished > self.ttl:
+                self._drop(job.id)
+        finished = [job for job in self._jobs.values() if job.finished is not None]
+        for job in finished[:max(len(finished) - self.max_results, 0)]:
+            self._drop(job.id)
+
+    def _drop(self, job_id):
+        self._jobs.pop(job_id, None)
+        if self.spool_dir is not None:
+            for suffix in ('.json', '.result'):
+                (self.spool_dir / f'{job_id}{suffix}').unlink(missing_ok=True)
+
+    def _spool(self, job):
+        """Write a job's status (and finished file) to the spool directory"""
+        if self.spool_dir is None:
+            return
+        if job.result is not None:
+            self._write_atomic(self.spool_dir / f'{job.id}.result', job.result)
+        meta = {**job.to_dict(), 'mimetype': job.mimetype}
+        self._write_atomic(self.spool_dir / f'{job.id}.json', json.dumps(meta).encode('utf-8'))
+
+    @staticmethod
+    def _write_atomic(path, content):
+        temp = path.with_name(path.name + '.tmp')
+        temp.write_bytes(content)
+        os.replace(temp, path)
+
+    def _sweep_spool(self):
+        """Remove spooled files other processes left behind once they are older than the TTL"""
+        if self.spool_dir is None:
+            return
+        cutoff = time.time() - self.ttl
+        for path in self.spool_dir.iterdir():
+            try:
+                if path.name.split('.')[0] not in self._jobs and path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def _load(self, job_id):
+        """Read a job spooled by another process, or None if it is unknown or has expired"""
+        if self.spool_dir is None or not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        try:
+            meta = json.loads((self.spool_dir / f'{job_id}.json').read_text(encoding='utf-8'))
+            job = ExportJob.from_dict(meta)
+            if job.finished is not None and time.time() - job.finished > self.ttl:
+                return None
+            if job.status == 'done':
+                job.result = (self.spool_dir / f'{job_id}.result').read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+        return job
+
+    def get(self, job_id):
+        """Return a job by id, or None if it is unknown or has expired"""
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(job_id)
+        if job is None:
+            job = self._load(job_id)
+        return job
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,204 @@
+"""
+PrintForge Farm Scheduler
+Assigns a batch of jobs to a fleet of printers and reports lead time, utilization and machine cost
+
+Jobs are placed longest-first (LPT list scheduling): each print goes to the
+printer that would finish it earliest. Printers that share a speed,
+availability and material list form a class with its own min-heap of free
+times, so a placement costs one heap operation per class rather than a
+scan of the whole fleet.
+"""
+
+import heapq
+from dataclasses import dataclass
+from operator import itemgetter
+
+from pricing_engine import RateCard
+
+HOURS_PER_DAY = 24.0
+MAX_PRINTERS = 1000      # Printers in one fleet
+MAX_UNITS = 100000       # Units (summed job quantities) in one schedule; about 0.1 s to place
+
+
+@dataclass(frozen=True)
+class Printer:
+    """
+    One machine in the farm
+
+    speed scales print times (2.0 prints a 4 h job in 2 h); hours_per_day is
+    how long it can run each day (e.g. 16 without overnight prints);
+    available_from is the number of hours until it finishes its current work.
+    """
+
+    name: str
+    rate_card: RateCard
+    speed: float = 1.0
+    hours_per_day: float = HOURS_PER_DAY
+    available_from: float = 0.0
+    materials: frozenset = None
+
+    @classmethod
+    def from_dict(cls, data, base, rate_cards=None):
+        """
+        Build the printers described by one fleet entry
+
+        Args:
+            data: { 'name', 'count', 'speed', 'hours_per_day', 'available_from', 'materials': [...],
+                    plus any machine/electricity setting overriding base }
+            base: /calculate-style payload supplying the default shop settings
+            rate_cards: RateCardCache to share cards between identical printers (optional)
+
+        Returns:
+            list: `count` Printer instances (named 'Name #1', 'Name #2', ... when count > 1)
+        """
+        merged = {**base, **data}
+        card = rate_cards.get(merged) if rate_cards else RateCard.from_dict(merged)
+        speed = float(data.get('speed', 1.0))
+        hours_per_day = float(data.get('hours_per_day', HOURS_PER_DAY))
+        if speed <= 0 or not 0 < hours_per_day <= HOURS_PER_DAY:
+            raise ValueError('speed must be positive and hours_per_day between 0 and 24')
+        materials = data.get('materials')
+        materials = frozenset(m.strip().lower() for m in materials if m.strip()) if materials else None
+
+        name = data.get('name') or 'Printer'
+        count = int(data.get('count', 1))
+        if count > MAX_PRINTERS:
+            raise ValueError(f'A fleet can have at most {MAX_PRINTERS} printers')
+        return [
+            cls(
+                name=f'{name} #{number}' if count > 1 else name,
+                rate_card=card,
+                speed=speed,
+                hours_per_day=hours_per_day,
+                available_from=float(data.get('available_from', 0.0)),
+                materials=materials,
+            )
+            for number in range(1, count + 1)
+        ]
+
+
+def build_fleet(entries, base, rate_cards=None):
+    """
+    Build the whole fleet from its entries, checking MAX_PRINTERS before each entry is expanded
+
+    Args:
+        entries: List of Printer.from_dict fleet entries
+        base: /calculate-style payload supplying the default shop settings
+        rate_cards: RateCardCache to share cards between identical printers (optional)
+
+    Returns:
+        list: Printer instances for every entry, in order
+    """
+    printers = []
+    for entry in entries:
+        if len(printers) + int(entry.get('count', 1)) > MAX_PRINTERS:
+            raise ValueError(f'A fleet can have at most {MAX_PRINTERS} printers')
+        printers.extend(Printer.from_dict(entry, base, rate_cards))
+    return printers
+
+
+def schedule(jobs, printers, changeover_hours=0.0):
+    """
+    Schedule every unit of every job on the fleet
+
+    Args:
+        jobs: List of dicts with 'print_time' (hours), optional 'quantity' and 'material';
+              quantities may add up to at most MAX_UNITS
+        printers: List of Printer (at most MAX_PRINTERS)
+        changeover_hours: Printer time between prints (plate swap, bed clear)
+
+    Returns:
+        dict: makespan_hours, lead_time_days, machine hours and costs, one summary per
+              printer, and job_finish_hours (when the last unit of each job is done)
+    """
+    if not printers:
+        raise ValueError('No printers in the fleet')
+    if len(printers) > MAX_PRINTERS:
+        raise ValueError(f'A fleet can have at most {MAX_PRINTERS} printers')
+
+    # One heap of (free_at, printer index) per class of interchangeable printers
+    classes = {}
+    for index, printer in enumerate(printers):
+        key = (printer.speed, printer.hours_per_day, printer.materials)
+        classes.setdefault(key, []).append((printer.available_from, index))
+    heaps = [(speed, HOURS_PER_DAY / hours_per_day, materials, heap)
+             for (speed, hours_per_day, materials), heap in classes.items()]
+    for _, _, _, heap in heaps:
+        heapq.heapify(heap)
+
+    tasks = []
+    for row, job in enumerate(jobs):
+        print_time = float(job.get('print_time', 0.0))
+        if print_time < 0:
+            raise ValueError(f'Job {row + 1}: print_time must not be negative')
+        quantity = int(job.get('quantity', 1))
+        if len(tasks) + quantity > MAX_UNITS:
+            raise ValueError(f'A schedule can have at most {MAX_UNITS} units in total')
+        tasks.extend([(print_time, row)] * quantity)
+    tasks.sort(key=itemgetter(0), reverse=True)
+
+    running = [0.0] * len(printers)
+    occupied = [0.0] * len(printers)
+    finished = [printer.available_from for printer in printers]
+    counts = [0] * len(printers)
+    job_finish = [0.0] * len(jobs)
+    compatible = {}
+
+    for print_time, row in tasks:
+        material = jobs[row].get('material') or ''
+        candidates = compatible.get(material)
+        if candidates is None:
+            candidates = [entry for entry in heaps
+                          if entry[2] is None or not material or material.lower() in entry[2]]
+            if not candidates:
+                raise ValueError(f'Job {row + 1}: no printer in the fleet can print {material}')
+            compatible[material] = candidates
+
+        best_end = best_heap = None
+        for speed, calendar_scale, _, heap in candidates:
+            end = heap[0][0] + (print_time / speed + changeover_hours) * calendar_scale
+            if best_end is None or end < best_end:
+                best_end, best_heap, best_speed = end, heap, speed
+
+        index = best_heap[0][1]
+        heapq.heapreplace(best_heap, (best_end, index))
+        running[index] += print_time / best_speed
+        occupied[index] += print_time / best_speed + changeover_hours
+        finished[index] = best_end
+        counts[index] += 1
+        if best_end > job_finish[row]:
+            job_finish[row] = best_end
+
+    makespan = max(job_finish, default=0.0)
+
+    summaries = []
+    depreciation_total = electricity_total = 0.0
+    for index, printer in enumerate(printers):
+        depreciation = running[index] * printer.rate_card.cost_per_hour
+        electricity = running[index] * printer.rate_card.electricity_per_hour
+        depreciation_total += depreciation
+        electricity_total += electricity
+
+        # Share of the hours it could run between becoming free and the batch finishing
+        window = max(makespan - printer.available_from, 0.0) * printer.hours_per_day / HOURS_PER_DAY
+        summaries.append({
+            'name': printer.name,
+            'jobs': counts[index],
+            'running_hours': round(running[index], 2),
+            'finish_hours': round(finished[index], 2),
+            'utilization_percent': round(occupied[index] / window * 100, 1) if window else 0.0,
+            'machine_cost': round(depreciation + electricity, 2),
+        })
+
+    return {
+        'tasks': len(tasks),
+        'printers_used': sum(1 for count in counts if count),
+        'makespan_hours': round(makespan, 2),
+        'lead_time_days': round(makespan / HOURS_PER_DAY, 2),
+        'machine_hours': round(sum(running), 2),
+        'depreciation_cost': round(depreciation_total, 2),
+        'electricity_cost': round(electricity_total, 2),
+        'machine_cost': round(depreciation_total + electricity_total, 2),
+        'printers': summaries,
+        'job_finish_hours': [round(hours, 2) for hours in job_finish],
+    }
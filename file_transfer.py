@@ -0,0 +1,51 @@
+"""
+PrintForge File Transfer
+Chunked, atomic writes for files saved from the desktop app
+
+A file is written to a temporary sibling and renamed over the target once
+complete, so a crash or cancelled upload never leaves a half-written export
+or backup behind.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def write_stream_atomic(stream, filepath, chunk_size=CHUNK_SIZE):
+    """
+    Copy a binary stream to filepath in fixed-size chunks, replacing it atomically
+
+    Args:
+        stream: Object with read(n) returning bytes (e.g. request.stream or an open file)
+        filepath: Destination path; parent folders are created
+        chunk_size: Bytes per read
+
+    Returns:
+        int: Bytes written
+    """
+    target = Path(filepath)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=f'.{target.name}.', suffix='.tmp')
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return written
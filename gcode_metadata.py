@@ -0,0 +1,371 @@
+"""
+PrintForge G-code Metadata
+Reads filament usage and print time from sliced G-code without loading the whole file
+
+Slicers write their estimates as comment blocks at the start (Cura, Bambu
+Studio) or end (PrusaSlicer, OrcaSlicer, Bambu Studio) of the file, so only a
+bounded head and tail region is scanned. Files on disk are memory-mapped;
+uploads are read through a fixed-size buffer.
+
+    python gcode_metadata.py plate_1.gcode
+"""
+
+import json
+import math
+import mmap
+import re
+import sys
+import zipfile
+from xml.etree import ElementTree
+
+from materials import DEFAULT_FILAMENT_DIAMETER, density_for
+
+HEAD_BYTES = 256 * 1024
+TAIL_BYTES = 1024 * 1024
+READ_CHUNK = 1024 * 1024
+
+BINARY_GCODE_MAGIC = b'GCDE'
+SLICE_INFO_ENTRY = 'Metadata/slice_info.config'
+
+SLICER_SIGNATURES = (
+    ('orcaslicer', 'orcaslicer'),
+    ('bambustudio', 'bambu'),
+    ('bambu studio', 'bambu'),
+    ('prusaslicer', 'prusaslicer'),
+    ('superslicer', 'prusaslicer'),
+    ('cura_steamengine', 'cura'),
+    ('simplify3d', 'simplify3d'),
+)
+
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)\s*(days?|d|hours?|h|minutes?|m|seconds?|s)\b', re.IGNORECASE)
+DURATION_SECONDS = {'d': 86400, 'h': 3600, 'm': 60, 's': 1}
+BAMBU_TOTAL_TIME = re.compile(r'total estimated time:\s*([^;]+)', re.IGNORECASE)
+NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def parse_duration(text):
+    """
+    Convert a slicer duration to seconds
+
+    Accepts '1d 2h 3m 4s', '2 hours 5 minutes' and bare seconds ('3723').
+
+    Returns:
+        float: Seconds, or None if nothing could be parsed
+    """
+    text = text.strip()
+    if re.fullmatch(r'\d+(?:\.\d+)?', text):
+        return float(text)
+    parts = DURATION_PART.findall(text)
+    if not parts:
+        return None
+    return sum(float(value) * DURATION_SECONDS[unit[0].lower()] for value, unit in parts)
+
+
+def parse_numbers(text):
+    """Parse a comma/semicolon separated list of numbers ('12.3, 0.00' -> [12.3, 0.0])"""
+    return [float(n) for n in NUMBER.findall(text)]
+
+
+def _comment_fields(text, fields):
+    """
+    Collect 'key = value' / 'key: value' pairs from comment lines into fields
+
+    Keys are lower-cased; the first occurrence wins, so header values are not
+    overwritten by the same key repeated in a config block.
+    """
+    for line in text.splitlines():
+        if not line.startswith(';'):
+            continue
+        line = line.lstrip('; \t')
+        match = BAMBU_TOTAL_TIME.search(line)
+        if match:
+            fields.setdefault('total estimated time', match.group(1))
+            continue
+        for separator in ('=', ':'):
+            if separator in line:
+                key, value = line.split(separator, 1)
+                fields.setdefault(key.strip().lower(), value.strip())
+                break
+
+
+def _detect_slicer(head, fields):
+    lowered = head[:4096].lower()
+    for signature, name in SLICER_SIGNATURES:
+        if signature in lowered:
+            return name
+    if 'flavor' in fields or 'time' in fields:
+        return 'cura'
+    return 'unknown'
+
+
+def _first(fields, *keys):
+    for key in keys:
+        if key in fields:
+            return fields[key]
+    return None
+
+
+def _interpret(fields, slicer, material=None, diameter=None):
+    """Turn raw comment fields into the metadata dict returned by the extract_* functions"""
+    lengths = parse_numbers(_first(fields, 'filament used [mm]') or '')
+    volumes = parse_numbers(_first(fields, 'filament used [cm3]') or '')
+    grams = parse_numbers(_first(fields, 'filament used [g]') or '')
+    types = [t.strip() for t in re.split(r'[;,]', _first(fields, 'filament_type') or '') if t.strip()]
+    densities = parse_numbers(_first(fields, 'filament_density') or '')
+    diameters = parse_numbers(_first(fields, 'filament_diameter') or '')
+
+    # Cura: ';Filament used: 1.23456m, 0.5m' (metres) and Griffin per-extruder volumes (mm3)
+    cura_used = _first(fields, 'filament used')
+    if not lengths and cura_used:
+        lengths = [n * 1000 for n in parse_numbers(cura_used)]
+    index = 0
+    while f'extruder_train.{index}.material.volume_used' in fields:
+        if len(volumes) <= index:
+            volumes.append(parse_numbers(fields[f'extruder_train.{index}.material.volume_used'])[0] / 1000)
+        index += 1
+
+    # Simplify3D
+    if not lengths and 'filament length' in fields:
+        lengths = parse_numbers(fields['filament length'])[:1]
+    if not grams and 'plastic weight' in fields:
+        grams = parse_numbers(fields['plastic weight'])[:1]
+
+    total_grams = _first(fields, 'total filament used [g]', 'total filament weight [g]')
+    total_length = _first(fields, 'total filament length [mm]')
+
+    extruders = []
+    weight_estimated = False
+    for i in range(max(len(lengths), len(volumes), len(grams))):
+        length = lengths[i] if i < len(lengths) else None
+        volume = volumes[i] if i < len(volumes) else None
+        weight = grams[i] if i < len(grams) else None
+        filament_type = types[i] if i < len(types) else (types[0] if types else material)
+        density = densities[i] if i < len(densities) and densities[i] else density_for(filament_type)
+
+        if volume is None and length is not None:
+            d = diameters[i] if i < len(diameters) and diameters[i] else (diameter or DEFAULT_FILAMENT_DIAMETER)
+            volume = length * math.pi * (d / 2) ** 2 / 1000
+        if weight is None and volume is not None:
+            weight = volume * density
+            weight_estimated = True
+
+        if not (weight or length or volume):
+            continue
+        extruders.append({
+            'index': i,
+            'filament_type': filament_type,
+            'length_mm': round(length, 1) if length is not None else None,
+            'volume_cm3': round(volume, 3) if volume is not None else None,
+            'grams': round(weight, 2) if weight is not None else None,
+        })
+
+    if total_grams is not None:
+        total_grams = parse_numbers(total_grams)[0]
+        weight_estimated = False
+    elif extruders:
+        total_grams = sum(e['grams'] or 0 for e in extruders)
+    if total_length is not None:
+        total_length = parse_numbers(total_length)[0]
+    elif lengths:
+        total_length = sum(lengths)
+    # Volume always comes from the extruders: Bambu's header "[cm^3]" total is really mm3
+    total_volume = None
+    if any(e['volume_cm3'] for e in extruders):
+        total_volume = sum(e['volume_cm3'] or 0 for e in extruders)
+
+    seconds = None
+    time_text = _first(fields, 'estimated printing time (normal mode)', 'total estimated time',
+                       'print.time', 'time', 'build time', 'estimated printing time')
+    if time_text is not None:
+        seconds = parse_duration(time_text)
+
+    return {
+        'slicer': slicer,
+        'filament_grams': round(total_grams, 2) if total_grams is not None else None,
+        'filament_length_mm': round(total_length, 1) if total_length is not None else None,
+        'filament_volume_cm3': round(total_volume, 3) if total_volume is not None else None,
+        'print_time_seconds': round(seconds) if seconds is not None else None,
+        'print_time_hours': round(seconds / 3600, 2) if seconds is not None else None,
+        'filament_type': types[0] if types else material,
+        'weight_estimated': weight_estimated,
+        'extruders': extruders,
+    }
+
+
+def parse_regions(head, tail=b'', material=None, diameter=None):
+    """
+    Extract metadata from the head and tail bytes of a G-code file
+
+    Args:
+        head: First bytes of the file (or the whole file if it is small)
+        tail: Last bytes of the file, or b'' if head already holds everything
+        material: Material name used for density when the file has none
+        diameter: Filament diameter in mm when the file has none
+
+    Returns:
+        dict: slicer, filament_grams, filament_length_mm, filament_volume_cm3,
+              print_time_seconds, print_time_hours, filament_type, weight_estimated, extruders
+    """
+    if head[:4] == BINARY_GCODE_MAGIC:
+        raise ValueError('Binary G-code (.bgcode) is not supported - export plain-text G-code instead')
+
+    head_text = head.decode('utf-8', errors='replace')
+    tail_text = tail.decode('utf-8', errors='replace')
+    if tail:
+        # Drop lines cut in half at the region boundaries
+        head_text = head_text.rsplit('\n', 1)[0]
+        tail_text = tail_text.split('\n', 1)[-1]
+
+    fields = {}
+    _comment_fields(head_text, fields)
+    _comment_fields(tail_text, fields)
+
+    result = _interpret(fields, _detect_slicer(head_text, fields), material, diameter)
+    if result['filament_grams'] is None and result['print_time_seconds'] is None:
+        raise ValueError('No slicer filament or time estimates found in the G-code comments')
+    return result
+
+
+def _regions_from_seekable(f, size, head_bytes, tail_bytes):
+    if size <= head_bytes + tail_bytes:
+        f.seek(0)
+        return f.read(), b''
+    f.seek(0)
+    head = f.read(head_bytes)
+    f.seek(size - tail_bytes)
+    return head, f.read(tail_bytes)
+
+
+def _regions_from_stream(read, head_bytes, tail_bytes):
+    """Keep the first head_bytes and a rolling window of the last tail_bytes of a non-seekable stream"""
+    head = bytearray()
+    while len(head) < head_bytes:
+        chunk = read(min(READ_CHUNK, head_bytes - len(head)))
+        if not chunk:
+            return bytes(head), b''
+        head += chunk
+
+    tail = bytearray()
+    while True:
+        chunk = read(READ_CHUNK)
+        if not chunk:
+            break
+        tail += chunk
+        if len(tail) > tail_bytes:
+            del tail[:len(tail) - tail_bytes]
+    return bytes(head), bytes(tail)
+
+
+def _from_slice_info(data):
+    """Read Bambu/Orca 3MF Metadata/slice_info.config (per-plate weight and time)"""
+    root = ElementTree.fromstring(data)
+    seconds = 0.0
+    grams = 0.0
+    extruders = {}
+    plates = 0
+    for plate in root.iter('plate'):
+        plates += 1
+        meta = {m.get('key'): m.get('value') for m in plate.findall('metadata')}
+        seconds += float(meta.get('prediction') or 0)
+        grams += float(meta.get('weight') or 0)
+        for filament in plate.findall('filament'):
+            index = int(filament.get('id', 1)) - 1
+            entry = extruders.setdefault(index, {
+                'index': index,
+                'filament_type': filament.get('type'),
+                'length_mm': 0.0,
+                'volume_cm3': None,
+                'grams': 0.0,
+            })
+            entry['length_mm'] += float(filament.get('used_m') or 0) * 1000
+            entry['grams'] += float(filament.get('used_g') or 0)
+    if not plates:
+        return None
+
+    extruders = [extruders[i] for i in sorted(extruders)]
+    for entry in extruders:
+        entry['length_mm'] = round(entry['length_mm'], 1)
+        entry['grams'] = round(entry['grams'], 2)
+    length = sum(e['length_mm'] for e in extruders)
+    return {
+        'slicer': 'bambu',
+        'filament_grams': round(grams, 2),
+        'filament_length_mm': round(length, 1) if length else None,
+        'filament_volume_cm3': None,
+        'print_time_seconds': round(seconds),
+        'print_time_hours': round(seconds / 3600, 2),
+        'filament_type': extruders[0]['filament_type'] if extruders else None,
+        'weight_estimated': False,
+        'extruders': extruders,
+        'plates': plates,
+    }
+
+
+def _extract_from_zip(f, material=None, diameter=None, head_bytes=HEAD_BYTES, tail_bytes=TAIL_BYTES):
+    """Sliced 3MF project (*.gcode.3mf): use slice_info.config, else stream the first embedded G-code"""
+    with zipfile.ZipFile(f) as archive:
+        names = archive.namelist()
+        if SLICE_INFO_ENTRY in names:
+            result = _from_slice_info(archive.read(SLICE_INFO_ENTRY))
+            if result is not None:
+                return result
+        gcode_names = sorted(n for n in names if n.lower().endswith('.gcode'))
+        if not gcode_names:
+            raise ValueError('3MF file contains no sliced G-code')
+        with archive.open(gcode_names[0]) as entry:
+            head, tail = _regions_from_stream(entry.read, head_bytes, tail_bytes)
+    return parse_regions(head, tail, material, diameter)
+
+
+def extract_from_path(path, material=None, diameter=None, head_bytes=HEAD_BYTES, tail_bytes=TAIL_BYTES):
+    """
+    Extract metadata from a G-code (or sliced 3MF) file on disk
+
+    The file is memory-mapped and only its head and tail regions are read.
+    """
+    with open(path, 'rb') as f:
+        if zipfile.is_zipfile(f):
+            return _extract_from_zip(f, material, diameter, head_bytes, tail_bytes)
+        f.seek(0, 2)
+        size = f.tell()
+        if size == 0:
+            raise ValueError('G-code file is empty')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if size <= head_bytes + tail_bytes:
+                return parse_regions(mapped[:], b'', material, diameter)
+            return parse_regions(mapped[:head_bytes], mapped[size - tail_bytes:], material, diameter)
+
+
+def extract_from_file(f, material=None, diameter=None, head_bytes=HEAD_BYTES, tail_bytes=TAIL_BYTES):
+    """
+    Extract metadata from an open binary file object (e.g. an uploaded file)
+
+    Seekable files are read at the head and tail only; other streams are read
+    once through a bounded buffer.
+    """
+    if not f.seekable():
+        head, tail = _regions_from_stream(f.read, head_bytes, tail_bytes)
+        return parse_regions(head, tail, material, diameter)
+
+    if zipfile.is_zipfile(f):
+        f.seek(0)
+        return _extract_from_zip(f, material, diameter, head_bytes, tail_bytes)
+    f.seek(0, 2)
+    size = f.tell()
+    if size == 0:
+        raise ValueError('G-code file is empty')
+    head, tail = _regions_from_seekable(f, size, head_bytes, tail_bytes)
+    return parse_regions(head, tail, material, diameter)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print('Usage: python gcode_metadata.py FILE [MATERIAL]')
+        sys.exit(2)
+    material = argv[1] if len(argv) > 1 else None
+    print(json.dumps(extract_from_path(argv[0], material), indent=2))
+
+
+if __name__ == '__main__':
+    main()
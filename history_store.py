@@ -0,0 +1,246 @@
+"""
+PrintForge Quote History Store
+Append-only SQLite quote history with paginated queries and server-side aggregates
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    part_name TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    material TEXT NOT NULL DEFAULT '',
+    client TEXT NOT NULL DEFAULT '',
+    weight REAL NOT NULL DEFAULT 0,
+    print_time REAL NOT NULL DEFAULT 0,
+    total_cost REAL NOT NULL DEFAULT 0,
+    material_cost REAL NOT NULL DEFAULT 0,
+    labor_cost REAL NOT NULL DEFAULT 0,
+    machine_cost REAL NOT NULL DEFAULT 0,
+    packaging_cost REAL NOT NULL DEFAULT 0,
+    notes TEXT NOT NULL DEFAULT '',
+    starred INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_quotes_timestamp ON quotes (timestamp);
+CREATE INDEX IF NOT EXISTS idx_quotes_part_name ON quotes (part_name);
+CREATE INDEX IF NOT EXISTS idx_quotes_material ON quotes (material);
+CREATE INDEX IF NOT EXISTS idx_quotes_client ON quotes (client);
+"""
+
+INSERT_SQL = """
+INSERT INTO quotes (timestamp, part_name, material, client, weight, print_time, total_cost,
+                    material_cost, labor_cost, machine_cost, packaging_cost, notes, starred)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+MAX_PER_PAGE = 1000
+MAX_SERIES_POINTS = 5000
+
+
+def _utc_timestamp(dt):
+    """Format a datetime like JavaScript's toISOString() so stored timestamps sort as text"""
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _entry_to_row(entry):
+    """Convert a history entry (the shape app.js uses) into an INSERT parameter tuple"""
+    breakdown = entry.get('breakdown') or {}
+    return (
+        entry.get('timestamp') or _utc_timestamp(datetime.now(timezone.utc)),
+        entry.get('partName') or 'Unnamed Part',
+        entry.get('material') or 'PLA',
+        entry.get('client') or '',
+        float(entry.get('weight') or 0),
+        float(entry.get('printTime') or 0),
+        float(entry.get('totalCost') or 0),
+        float(breakdown.get('material') or 0),
+        float(breakdown.get('labor') or 0),
+        float(breakdown.get('machine') or 0),
+        float(breakdown.get('packaging') or 0),
+        entry.get('notes') or '',
+        1 if entry.get('starred') else 0,
+    )
+
+
+def _row_to_entry(row):
+    """Convert a database row into the entry shape app.js renders"""
+    return {
+        'id': row['id'],
+        'timestamp': row['timestamp'],
+        'partName': row['part_name'],
+        'material': row['material'],
+        'client': row['client'],
+        'weight': row['weight'],
+        'printTime': row['print_time'],
+        'totalCost': row['total_cost'],
+        'notes': row['notes'],
+        'starred': bool(row['starred']),
+        'breakdown': {
+            'material': row['material_cost'],
+            'labor': row['labor_cost'],
+            'machine': row['machine_cost'],
+            'packaging': row['packaging_cost'],
+        },
+    }
+
+
+def _where(filters):
+    """
+    Build a WHERE clause from query filters
+
+    Args:
+        filters: dict with any of starred, material, client, part_name (prefix match), days
+
+    Returns:
+        tuple: (sql, params)
+    """
+    clauses = ['deleted = 0']
+    params = []
+    if filters.get('starred'):
+        clauses.append('starred = 1')
+    if filters.get('material'):
+        clauses.append('material = ?')
+        params.append(filters['material'])
+    if filters.get('client'):
+        clauses.append('client = ?')
+        params.append(filters['client'])
+    if filters.get('part_name'):
+        # Prefix match so the part_name index can be used
+        clauses.append("part_name LIKE ? ESCAPE '\\'")
+        escaped = filters['part_name'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params.append(escaped + '%')
+    if filters.get('days'):
+        cutoff = datetime.now(timezone.utc) - timedelta(days=int(filters['days']))
+        clauses.append('timestamp >= ?')
+        params.append(_utc_timestamp(cutoff))
+    return ' WHERE ' + ' AND '.join(clauses), params
+
+
+class HistoryStore:
+    """
+    Quote history backed by a single SQLite file
+
+    Quotes are only ever appended; starring flips a flag and deleting marks
+    the row hidden, so saving a quote never rewrites existing history.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def ping(self):
+        """Check the database is reachable"""
+        self._connect().execute('SELECT 1').fetchone()
+
+    def add(self, entry):
+        """Append one quote and return it as stored"""
+        with self._connect() as conn:
+            cursor = conn.execute(INSERT_SQL, _entry_to_row(entry))
+            row = conn.execute('SELECT * FROM quotes WHERE id = ?', (cursor.lastrowid,)).fetchone()
+        return _row_to_entry(row)
+
+    def add_many(self, entries):
+        """Append many quotes in one transaction (used to import browser history)"""
+        rows = [_entry_to_row(entry) for entry in entries]
+        with self._connect() as conn:
+            conn.executemany(INSERT_SQL, rows)
+        return len(rows)
+
+    def query(self, filters=None, page=1, per_page=20):
+        """
+        Return one page of quotes, newest first
+
+        Returns:
+            dict: entries, total, page, per_page
+        """
+        filters = filters or {}
+        page = max(int(page), 1)
+        per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+        where, params = _where(filters)
+
+        conn = self._connect()
+        total = conn.execute('SELECT COUNT(*) FROM quotes' + where, params).fetchone()[0]
+        rows = conn.execute(
+            'SELECT * FROM quotes' + where + ' ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?',
+            params + [per_page, (page - 1) * per_page]
+        ).fetchall()
+
+        return {
+            'entries': [_row_to_entry(row) for row in rows],
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+        }
+
+    def stats(self, filters=None):
+        """Return count, starred count and cost aggregates for the matching quotes"""
+        where, params = _where(filters or {})
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT COUNT(*) AS count, COALESCE(SUM(starred), 0) AS starred, '
+            'COALESCE(AVG(total_cost), 0) AS avg_cost, COALESCE(MIN(total_cost), 0) AS min_cost, '
+            'COALESCE(MAX(total_cost), 0) AS max_cost, COALESCE(SUM(total_cost), 0) AS sum_cost '
+            'FROM quotes' + where, params
+        ).fetchone()
+        by_material = conn.execute(
+            'SELECT material, COUNT(*) AS count, AVG(total_cost) AS avg_cost FROM quotes'
+            + where + ' GROUP BY material ORDER BY count DESC', params
+        ).fetchall()
+
+        return {
+            'count': row['count'],
+            'starred': row['starred'],
+            'avg_cost': row['avg_cost'],
+            'min_cost': row['min_cost'],
+            'max_cost': row['max_cost'],
+            'sum_cost': row['sum_cost'],
+            'by_material': [dict(r) for r in by_material],
+        }
+
+    def series(self, filters=None, limit=500):
+        """Return up to `limit` (1..MAX_SERIES_POINTS) timestamp/total_cost points for the history chart, oldest first"""
+        where, params = _where(filters or {})
+        # SQLite reads a negative LIMIT as no limit at all
+        limit = min(max(int(limit), 1), MAX_SERIES_POINTS)
+        rows = self._connect().execute(
+            'SELECT timestamp, total_cost FROM quotes' + where
+            + ' ORDER BY timestamp DESC, id DESC LIMIT ?', params + [limit]
+        ).fetchall()
+        return [{'timestamp': r['timestamp'], 'totalCost': r['total_cost']} for r in reversed(rows)]
+
+    def set_starred(self, entry_id, starred):
+        """Star or unstar a quote; returns False if it does not exist"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE quotes SET starred = ? WHERE id = ? AND deleted = 0',
+                (1 if starred else 0, entry_id)
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, entry_id):
+        """Hide a quote from history; returns False if it does not exist"""
+        with self._connect() as conn:
+            cursor = conn.execute('UPDATE quotes SET deleted = 1 WHERE id = ? AND deleted = 0', (entry_id,))
+        return cursor.rowcount > 0
+
+    def clear(self):
+        """Hide every quote from history"""
+        with self._connect() as conn:
+            conn.execute('UPDATE quotes SET deleted = 1 WHERE deleted = 0')
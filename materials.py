@@ -0,0 +1,68 @@
+"""
+PrintForge Material Properties
+Filament densities used to turn slicer lengths and mesh volumes into grams
+"""
+
+DEFAULT_DENSITY = 1.24          # g/cm3 (PLA)
+DEFAULT_FILAMENT_DIAMETER = 1.75  # mm
+
+# Typical densities in g/cm3, keyed by the material names in the material dropdown
+MATERIAL_DENSITY = {
+    'PLA': 1.24,
+    'PLA+': 1.24,
+    'ABS': 1.04,
+    'PETG': 1.27,
+    'ASA': 1.07,
+    'TPU': 1.21,
+    'TPE': 1.20,
+    'Nylon': 1.14,
+    'Nylon 6': 1.14,
+    'Nylon 12': 1.01,
+    'PC': 1.20,
+    'PC-ABS': 1.15,
+    'HIPS': 1.04,
+    'PVA': 1.23,
+    'BVOH': 1.14,
+    'Carbon Fiber PLA': 1.29,
+    'Carbon Fiber PETG': 1.30,
+    'Carbon Fiber Nylon': 1.15,
+    'Glass Fiber Nylon': 1.30,
+    'Wood PLA': 1.15,
+    'Metal PLA': 2.00,
+    'Marble PLA': 1.30,
+    'Silk PLA': 1.24,
+    'Glow in the Dark PLA': 1.30,
+    'PEEK': 1.30,
+    'PEKK': 1.30,
+    'PEI': 1.27,
+    'PPSU': 1.29,
+    'PP': 0.90,
+    'PMMA': 1.18,
+    'PET': 1.38,
+    'Flexible PLA': 1.24,
+    'TPU 95A': 1.21,
+    'TPU 85A': 1.20,
+    'PVB': 1.08,
+    'PVDF': 1.78,
+}
+
+_DENSITY_BY_LOWER = {name.lower(): density for name, density in MATERIAL_DENSITY.items()}
+
+
+def density_for(material, default=DEFAULT_DENSITY):
+    """
+    Look up a material's density in g/cm3
+
+    Matches case-insensitively, then falls back to the leading word
+    (so 'PLA Basic' or 'PETG-CF' resolve to PLA / PETG).
+    """
+    if not material:
+        return default
+    key = str(material).strip().lower()
+    if key in _DENSITY_BY_LOWER:
+        return _DENSITY_BY_LOWER[key]
+    for separator in (' ', '-', '_'):
+        head = key.split(separator)[0]
+        if head in _DENSITY_BY_LOWER:
+            return _DENSITY_BY_LOWER[head]
+    return default
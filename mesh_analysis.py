@@ -0,0 +1,340 @@
+"""
+PrintForge Mesh Analysis
+Estimates filament grams from STL/3MF geometry before a model is sliced
+
+Binary STL files are memory-mapped straight into a NumPy record array and
+processed in fixed-size chunks, so the triangle buffer is never copied as a
+whole. Volume comes from the signed-tetrahedron sum, surface area from the
+triangle cross products.
+
+    python mesh_analysis.py bracket.stl --material PETG --infill 20
+"""
+
+import argparse
+import io
+import json
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+
+from materials import density_for
+
+STL_HEADER_BYTES = 84
+STL_RECORD = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+CHUNK_TRIANGLES = 1 << 14     # Small enough for the float64 temporaries to stay in cache
+
+DEFAULT_INFILL = 15         # Percent
+DEFAULT_WALL_COUNT = 2      # Perimeters (also used for top/bottom skins)
+DEFAULT_LINE_WIDTH = 0.45   # mm
+
+ASCII_VERTEX = re.compile(rb'vertex\s+(\S+)\s+(\S+)\s+(\S+)')
+CORE_NAMESPACE = '{http://schemas.microsoft.com/3dmanufacturing/core/2015/02}'
+PRODUCTION_PATH = '{http://schemas.microsoft.com/3dmanufacturing/production/2015/06}path'
+ROOT_MODEL = '3D/3dmodel.model'
+
+
+def _stl_triangle_count(buffer_size, header):
+    """
+    Return the triangle count if the data is binary STL, or None for ASCII STL
+
+    Binary files may carry trailing bytes after the last triangle, so the size
+    only has to cover the declared triangles. A file that fails that check is
+    read as ASCII only if it starts with 'solid'.
+    """
+    if buffer_size >= STL_HEADER_BYTES:
+        count = int(np.frombuffer(header[80:84], dtype='<u4')[0])
+        if STL_HEADER_BYTES + count * STL_RECORD.itemsize <= buffer_size:
+            return count
+    if header.lstrip()[:5].lower() == b'solid':
+        return None
+    raise ValueError('Not a valid STL file')
+
+
+def _ascii_triangles(data):
+    coords = np.array(ASCII_VERTEX.findall(data), dtype=np.float64)
+    if coords.size == 0 or len(coords) % 3:
+        raise ValueError('Not a valid STL file')
+    return coords.reshape(-1, 3, 3)
+
+
+def load_stl(path):
+    """
+    Load an STL file as an (n, 3, 3) array of triangle vertices
+
+    Binary files are memory-mapped (a strided view, nothing is read until
+    used); ASCII files are parsed into memory.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(STL_HEADER_BYTES)
+        f.seek(0, 2)
+        size = f.tell()
+    count = _stl_triangle_count(size, header)
+    if count is not None:
+        if count == 0:
+            raise ValueError('STL file has no triangles')
+        records = np.memmap(path, dtype=STL_RECORD, mode='r', offset=STL_HEADER_BYTES, shape=(count,))
+        return records['vertices']
+    with open(path, 'rb') as f:
+        return _ascii_triangles(f.read())
+
+
+def stl_from_bytes(data):
+    """Same as load_stl for an in-memory buffer (zero-copy view for binary STL)"""
+    count = _stl_triangle_count(len(data), data[:STL_HEADER_BYTES])
+    if count is not None:
+        if count == 0:
+            raise ValueError('STL file has no triangles')
+        return np.frombuffer(data, dtype=STL_RECORD, count=count, offset=STL_HEADER_BYTES)['vertices']
+    return _ascii_triangles(data)
+
+
+def _parse_transform(text):
+    """3MF 'm00 m01 m02 m10 ... m32' transform as (3x3 linear part, translation)"""
+    if not text:
+        return np.eye(3), np.zeros(3)
+    values = np.array(text.split(), dtype=np.float64).reshape(4, 3)
+    return values[:3], values[3]
+
+
+def _read_model(data, path, objects):
+    """Collect the meshes and components of one 3MF model part"""
+    build = []
+    for _, element in ElementTree.iterparse(data):
+        tag = element.tag
+        if tag == CORE_NAMESPACE + 'object':
+            mesh = element.find(CORE_NAMESPACE + 'mesh')
+            components = []
+            for component in element.iter(CORE_NAMESPACE + 'component'):
+                components.append((component.get(PRODUCTION_PATH, path).lstrip('/'),
+                                   component.get('objectid'), component.get('transform')))
+            triangles = None
+            if mesh is not None:
+                vertices = np.array(
+                    [(v.get('x'), v.get('y'), v.get('z')) for v in mesh.iter(CORE_NAMESPACE + 'vertex')],
+                    dtype=np.float64)
+                indices = np.array(
+                    [(t.get('v1'), t.get('v2'), t.get('v3')) for t in mesh.iter(CORE_NAMESPACE + 'triangle')],
+                    dtype=np.int64)
+                if len(indices):
+                    triangles = vertices[indices]
+            objects[(path, element.get('id'))] = (triangles, components)
+            element.clear()
+        elif tag == CORE_NAMESPACE + 'item':
+            build.append((element.get(PRODUCTION_PATH, path).lstrip('/'),
+                          element.get('objectid'), element.get('transform')))
+    return build
+
+
+def load_3mf(source):
+    """
+    Load every build item of a 3MF file as a list of (n, 3, 3) triangle arrays
+
+    Component references (including Bambu/Orca per-object model files) are
+    resolved and their transforms applied.
+    """
+    objects = {}
+    with zipfile.ZipFile(source) as archive:
+        build = []
+        for name in archive.namelist():
+            if name.lower().endswith('.model'):
+                with archive.open(name) as data:
+                    items = _read_model(data, name, objects)
+                if name == ROOT_MODEL or not build:
+                    build = items or build
+
+    def instances(key, linear, offset, depth=0):
+        if key not in objects or depth > 16:
+            return
+        triangles, components = objects[key]
+        if triangles is not None:
+            yield triangles @ linear + offset
+        for path, object_id, transform in components:
+            child_linear, child_offset = _parse_transform(transform)
+            yield from instances((path, object_id), child_linear @ linear, child_offset @ linear + offset, depth + 1)
+
+    meshes = []
+    for path, object_id, transform in build:
+        linear, offset = _parse_transform(transform)
+        meshes.extend(instances((path, object_id), linear, offset))
+    if not meshes:
+        raise ValueError('3MF file contains no printable meshes')
+    return meshes
+
+
+def mesh_properties(triangles, chunk_size=CHUNK_TRIANGLES):
+    """
+    Volume, surface area and bounding box of a triangle array
+
+    Works through the array a chunk at a time in float64, so a memory-mapped
+    STL is read sequentially and never materialized in full.
+
+    Returns:
+        dict: triangles, volume_mm3, surface_area_mm2, bbox_min, bbox_max, size_mm
+    """
+    volume6 = 0.0
+    area2 = 0.0
+    low = np.full(3, np.inf)
+    high = np.full(3, -np.inf)
+
+    for start in range(0, len(triangles), chunk_size):
+        v = np.asarray(triangles[start:start + chunk_size], dtype=np.float64)
+        ax, ay, az = v[:, 0, 0], v[:, 0, 1], v[:, 0, 2]
+        bx, by, bz = v[:, 1, 0], v[:, 1, 1], v[:, 1, 2]
+        cx, cy, cz = v[:, 2, 0], v[:, 2, 1], v[:, 2, 2]
+
+        # Signed tetrahedron volumes against the origin: a . (b x c)
+        volume6 += (ax * (by * cz - bz * cy) + ay * (bz * cx - bx * cz) + az * (bx * cy - by * cx)).sum()
+
+        # Triangle areas: |(b - a) x (c - a)| / 2
+        ux, uy, uz = bx - ax, by - ay, bz - az
+        wx, wy, wz = cx - ax, cy - ay, cz - az
+        nx = uy * wz - uz * wy
+        ny = uz * wx - ux * wz
+        nz = ux * wy - uy * wx
+        area2 += np.sqrt(nx * nx + ny * ny + nz * nz).sum()
+
+        for axis, (p, q, r) in enumerate(((ax, bx, cx), (ay, by, cy), (az, bz, cz))):
+            low[axis] = min(low[axis], p.min(), q.min(), r.min())
+            high[axis] = max(high[axis], p.max(), q.max(), r.max())
+
+    return {
+        'triangles': int(len(triangles)),
+        'volume_mm3': float(abs(volume6) / 6),
+        'surface_area_mm2': float(area2 / 2),
+        'bbox_min': low.tolist(),
+        'bbox_max': high.tolist(),
+        'size_mm': (high - low).tolist(),
+    }
+
+
+def estimate_grams(volume_mm3, surface_area_mm2, density, infill=DEFAULT_INFILL,
+                   wall_count=DEFAULT_WALL_COUNT, line_width=DEFAULT_LINE_WIDTH):
+    """
+    Estimate printed grams from solid volume and surface area
+
+    The outer skin (walls plus top/bottom layers) is approximated as the
+    surface area times the wall thickness; the remaining interior is filled
+    at the infill percentage.
+
+    Returns:
+        tuple: (grams, shell_mm3, infill_mm3)
+    """
+    shell = min(surface_area_mm2 * wall_count * line_width, volume_mm3)
+    interior = (volume_mm3 - shell) * infill / 100
+    return (shell + interior) / 1000 * density, shell, interior
+
+
+def _combine(parts):
+    """Merge mesh_properties results for several objects"""
+    low = np.min([p['bbox_min'] for p in parts], axis=0)
+    high = np.max([p['bbox_max'] for p in parts], axis=0)
+    return {
+        'triangles': sum(p['triangles'] for p in parts),
+        'volume_mm3': sum(p['volume_mm3'] for p in parts),
+        'surface_area_mm2': sum(p['surface_area_mm2'] for p in parts),
+        'bbox_min': low.tolist(),
+        'bbox_max': high.tolist(),
+        'size_mm': (high - low).tolist(),
+    }
+
+
+def analyze_meshes(meshes, material=None, density=None, infill=DEFAULT_INFILL,
+                   wall_count=DEFAULT_WALL_COUNT, line_width=DEFAULT_LINE_WIDTH):
+    """
+    Analyze one or more triangle arrays and estimate the filament needed
+
+    Args:
+        meshes: List of (n, 3, 3) triangle arrays
+        material: Material name for the density lookup
+        density: Density in g/cm3 (overrides material)
+        infill: Infill percent
+        wall_count: Perimeters / skin layers
+        line_width: Extrusion width in mm
+
+    Returns:
+        dict: Geometry (triangles, volume, area, bounding box) plus filament_grams,
+              solid_grams and the settings used
+    """
+    parts = [mesh_properties(mesh) for mesh in meshes]
+    result = parts[0] if len(parts) == 1 else _combine(parts)
+    density = float(density) if density else density_for(material)
+    grams, shell, interior = estimate_grams(
+        result['volume_mm3'], result['surface_area_mm2'], density, infill, wall_count, line_width)
+
+    result.update({
+        'objects': len(parts),
+        'volume_cm3': round(result['volume_mm3'] / 1000, 3),
+        'volume_mm3': round(result['volume_mm3'], 2),
+        'surface_area_mm2': round(result['surface_area_mm2'], 2),
+        'bbox_min': [round(x, 3) for x in result['bbox_min']],
+        'bbox_max': [round(x, 3) for x in result['bbox_max']],
+        'size_mm': [round(x, 3) for x in result['size_mm']],
+        'shell_cm3': round(shell / 1000, 3),
+        'infill_cm3': round(interior / 1000, 3),
+        'filament_grams': round(grams, 2),
+        'solid_grams': round(result['volume_mm3'] / 1000 * density, 2),
+        'density': density,
+        'infill': infill,
+        'wall_count': wall_count,
+        'line_width': line_width,
+    })
+    return result
+
+
+def analyze_path(path, **settings):
+    """Analyze an STL or 3MF file on disk (see analyze_meshes for settings)"""
+    if zipfile.is_zipfile(path):
+        return analyze_meshes(load_3mf(path), **settings)
+    return analyze_meshes([load_stl(path)], **settings)
+
+
+def analyze_file(f, **settings):
+    """
+    Analyze an uploaded STL or 3MF file object
+
+    A binary STL backed by a real file (e.g. a spooled upload) is
+    memory-mapped; anything else is read once and viewed in place.
+    """
+    if zipfile.is_zipfile(f):
+        f.seek(0)
+        return analyze_meshes(load_3mf(f), **settings)
+
+    f.seek(0)
+    header = f.read(STL_HEADER_BYTES)
+    f.seek(0, 2)
+    count = _stl_triangle_count(f.tell(), header)
+    f.seek(0)
+    if count:
+        try:
+            f.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+        else:
+            records = np.memmap(f, dtype=STL_RECORD, mode='r', offset=STL_HEADER_BYTES, shape=(count,))
+            return analyze_meshes([records['vertices']], **settings)
+    return analyze_meshes([stl_from_bytes(f.read())], **settings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Estimate filament grams from an STL or 3MF model')
+    parser.add_argument('model', help='STL or 3MF file')
+    parser.add_argument('--material', default='PLA')
+    parser.add_argument('--density', type=float, help='g/cm3 (default: from --material)')
+    parser.add_argument('--infill', type=float, default=DEFAULT_INFILL, help='Infill percent')
+    parser.add_argument('--walls', type=int, default=DEFAULT_WALL_COUNT, help='Perimeter count')
+    parser.add_argument('--line-width', type=float, default=DEFAULT_LINE_WIDTH, help='Extrusion width in mm')
+    args = parser.parse_args(argv)
+
+    result = analyze_path(args.model, material=args.material, density=args.density, infill=args.infill,
+                          wall_count=args.walls, line_width=args.line_width)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+PrintForge Request Metrics
+Per-route latency and payload-size histograms, error counts and in-flight gauges in Prometheus text format
+
+Enabled with PRINTFORGE_METRICS=1 (or `python serve.py --metrics`). When
+disabled no request hooks are installed, so there is no per-request cost.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class Histogram:
+    """Cumulative-bucket histogram (bucket counts are converted to Prometheus `le` form on output)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Thread-safe request statistics keyed by (method, route rule)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.request_size = {}
+        self.response_size = {}
+        self.responses = {}
+        self.errors = {}
+        self.in_flight = {}
+
+    def start(self, key):
+        with self._lock:
+            self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def finish(self, key, duration, status, request_bytes, response_bytes, failed):
+        """
+        Record a completed request
+
+        Args:
+            key: (method, route rule)
+            duration: Seconds from before_request to teardown
+            status: HTTP status code (500 if the view raised)
+            request_bytes: Request body length, or None if unknown
+            response_bytes: Response body length, or None for streamed responses
+            failed: True for 4xx/5xx responses and unhandled exceptions
+        """
+        with self._lock:
+            self.in_flight[key] -= 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(duration)
+            if request_bytes is not None:
+                self.request_size.setdefault(key, Histogram(SIZE_BUCKETS)).observe(request_bytes)
+            if response_bytes is not None:
+                self.response_size.setdefault(key, Histogram(SIZE_BUCKETS)).observe(response_bytes)
+            status_key = key + (status,)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+            if failed:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def render(self):
+        """Return every metric in Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+
+            def labels(key):
+                return f'method="{_escape(key[0])}",route="{_escape(key[1])}"'
+
+            def histograms(name, help_text, table):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for key in sorted(table):
+                    lines.extend(table[key].lines(name, labels(key)))
+
+            histograms('printforge_request_duration_seconds', 'Request latency by route.', self.latency)
+            histograms('printforge_request_size_bytes', 'Request body size by route.', self.request_size)
+            histograms('printforge_response_size_bytes', 'Response body size by route (streamed responses excluded).',
+                       self.response_size)
+
+            lines.append('# HELP printforge_requests_total Completed requests by route and status.')
+            lines.append('# TYPE printforge_requests_total counter')
+            for key in sorted(self.responses):
+                lines.append(f'printforge_requests_total{{{labels(key)},status="{key[2]}"}} {self.responses[key]}')
+
+            lines.append('# HELP printforge_request_errors_total Requests that failed (4xx/5xx or unhandled exception).')
+            lines.append('# TYPE printforge_request_errors_total counter')
+            for key in sorted(self.errors):
+                lines.append(f'printforge_request_errors_total{{{labels(key)}}} {self.errors[key]}')
+
+            lines.append('# HELP printforge_requests_in_flight Requests currently being handled.')
+            lines.append('# TYPE printforge_requests_in_flight gauge')
+            for key in sorted(self.in_flight):
+                lines.append(f'printforge_requests_in_flight{{{labels(key)}}} {self.in_flight[key]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def init_app(app, enabled=False):
+    """
+    Install the timing hooks on a Flask app
+
+    Args:
+        app: Flask application
+        enabled: Install the hooks; when False nothing is recorded
+
+    Returns:
+        RequestMetrics: The collector, or None when disabled
+    """
+    if not enabled:
+        return None
+
+    collector = RequestMetrics()
+
+    @app.before_request
+    def start_timer():
+        rule = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+        g.metrics_key = (request.method, rule)
+        g.metrics_start = time.perf_counter()
+        g.metrics_status = 500
+        g.metrics_response_bytes = None
+        collector.start(g.metrics_key)
+
+    @app.after_request
+    def record_response(response):
+        if 'metrics_key' in g:
+            g.metrics_status = response.status_code
+            if not response.is_streamed:
+                g.metrics_response_bytes = response.calculate_content_length()
+        return response
+
+    @app.teardown_request
+    def stop_timer(exc):
+        key = g.pop('metrics_key', None)
+        if key is None:
+            return
+        status = 500 if exc is not None else g.metrics_status
+        collector.finish(
+            key,
+            time.perf_counter() - g.metrics_start,
+            status,
+            request.content_length,
+            g.metrics_response_bytes,
+            exc is not None or status >= 400,
+        )
+
+    return collector
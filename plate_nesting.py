@@ -0,0 +1,196 @@
+"""
+PrintForge Plate Nesting
+Packs part footprints onto the build plate and prices quantity breaks with per-plate labor
+
+A plate of identical parts is laid out as a grid, optionally with a strip
+of rotated parts in the leftover space. Mixed parts are packed onto plates
+shelf by shelf (first-fit decreasing height). Quantity breaks then charge
+setup labor and plate overhead once per plate instead of once per part.
+"""
+
+import math
+
+from pricing_engine import quote_result
+
+DEFAULT_BED_WIDTH = 250.0     # mm
+DEFAULT_BED_DEPTH = 210.0     # mm
+DEFAULT_SPACING = 5.0         # mm between parts
+DEFAULT_QUANTITIES = (1, 10, 50, 100, 500)
+MAX_PACKED_PARTS = 5000       # Parts (summed quantities) pack_plates will place; about 0.2 s
+
+
+def _grid(width, depth, bed_width, bed_depth, spacing):
+    """Columns and rows of width x depth parts that fit on the bed"""
+    if width <= 0 or depth <= 0 or width > bed_width or depth > bed_depth:
+        return 0, 0
+    return int((bed_width + spacing) // (width + spacing)), int((bed_depth + spacing) // (depth + spacing))
+
+
+def parts_per_plate(width, depth, bed_width=DEFAULT_BED_WIDTH, bed_depth=DEFAULT_BED_DEPTH,
+                    spacing=DEFAULT_SPACING):
+    """
+    How many copies of one footprint fit on a plate
+
+    Tries both orientations, and each split of the bed into a block of parts
+    in one orientation plus a strip of rotated parts in what is left.
+
+    Args:
+        width, depth: Part footprint in mm
+        bed_width, bed_depth: Usable bed area in mm
+        spacing: Gap between parts in mm
+
+    Returns:
+        dict: count, layout (columns/rows per orientation) and bed area utilization
+    """
+    best = {'count': 0, 'layout': []}
+
+    def consider(blocks):
+        count = sum(columns * rows for _, columns, rows in blocks)
+        if count > best['count']:
+            best['count'] = count
+            best['layout'] = [{'rotated': rotated, 'columns': columns, 'rows': rows}
+                              for rotated, columns, rows in blocks if columns * rows]
+
+    for rotated, (w, d) in ((False, (width, depth)), (True, (depth, width))):
+        columns, rows = _grid(w, d, bed_width, bed_depth, spacing)
+        consider([(rotated, columns, rows)])
+
+        # k rows of this orientation, rotated parts in the remaining depth
+        for k in range(1, rows):
+            rest = bed_depth - k * (d + spacing)
+            consider([(rotated, columns, k), (not rotated, *_grid(d, w, bed_width, rest, spacing))])
+
+        # k columns of this orientation, rotated parts in the remaining width
+        for k in range(1, columns):
+            rest = bed_width - k * (w + spacing)
+            consider([(rotated, k, rows), (not rotated, *_grid(d, w, rest, bed_depth, spacing))])
+
+    best['utilization_percent'] = round(best['count'] * width * depth / (bed_width * bed_depth) * 100, 1)
+    return best
+
+
+def pack_plates(parts, bed_width=DEFAULT_BED_WIDTH, bed_depth=DEFAULT_BED_DEPTH, spacing=DEFAULT_SPACING):
+    """
+    Pack a mixed set of parts onto as few plates as the shelf heuristic allows
+
+    Args:
+        parts: List of dicts with 'width', 'depth' (mm) and optional 'quantity' and 'name';
+               quantities may add up to at most MAX_PACKED_PARTS
+        bed_width, bed_depth: Usable bed area in mm
+        spacing: Gap between parts in mm
+
+    Returns:
+        list: One dict per plate with 'placements' ({part, x, y, width, depth, rotated})
+              and 'utilization_percent'
+    """
+    items = []
+    for index, part in enumerate(parts):
+        width, depth = float(part['width']), float(part['depth'])
+        # Lay each part with its short side front-to-back when it fits, to keep shelves shallow
+        rotated = depth > width and depth <= bed_width and width <= bed_depth
+        if rotated:
+            width, depth = depth, width
+        if width > bed_width or depth > bed_depth:
+            if depth <= bed_width and width <= bed_depth:
+                width, depth, rotated = depth, width, not rotated
+            else:
+                raise ValueError(f'Part {index + 1} ({part["width"]} x {part["depth"]} mm) does not fit on the bed')
+        quantity = int(part.get('quantity', 1))
+        if len(items) + quantity > MAX_PACKED_PARTS:
+            raise ValueError(f'At most {MAX_PACKED_PARTS} parts can be nested at once')
+        items.extend([(depth, width, index, rotated)] * quantity)
+    items.sort(key=lambda item: (item[0], item[1]), reverse=True)
+
+    plates = []
+    for depth, width, index, rotated in items:
+        placed = False
+        for plate in plates:
+            for shelf in plate['shelves']:
+                if depth <= shelf['depth'] and shelf['x'] + width <= bed_width:
+                    plate['placements'].append(_placement(index, shelf['x'], shelf['y'], width, depth, rotated))
+                    shelf['x'] += width + spacing
+                    placed = True
+                    break
+            if not placed and plate['y'] + depth <= bed_depth:
+                plate['shelves'].append({'y': plate['y'], 'depth': depth, 'x': width + spacing})
+                plate['placements'].append(_placement(index, 0.0, plate['y'], width, depth, rotated))
+                plate['y'] += depth + spacing
+                placed = True
+            if placed:
+                break
+        if not placed:
+            plates.append({'shelves': [{'y': 0.0, 'depth': depth, 'x': width + spacing}],
+                           'y': depth + spacing,
+                           'placements': [_placement(index, 0.0, 0.0, width, depth, rotated)]})
+
+    bed_area = bed_width * bed_depth
+    return [
+        {
+            'placements': plate['placements'],
+            'utilization_percent': round(sum(p['width'] * p['depth'] for p in plate['placements']) / bed_area * 100, 1),
+        }
+        for plate in plates
+    ]
+
+
+def _placement(index, x, y, width, depth, rotated):
+    return {'part': index, 'x': round(x, 2), 'y': round(y, 2), 'width': round(width, 2), 'depth': round(depth, 2),
+            'rotated': rotated}
+
+
+def quantity_breaks(job, rate_card, per_plate, quantities=DEFAULT_QUANTITIES,
+                    part_labor_time=0.0, plate_overhead_time=0.0):
+    """
+    Price a part at several order quantities, sharing plate labor across the parts on each plate
+
+    The job's labor_time is charged once per plate (setup, start, removal) and
+    part_labor_time once per part; plate_overhead_time (hours of heat-up,
+    calibration) is added to machine time once per plate. Shipping is charged
+    once per order; packaging items once per part. At quantity 1 with no
+    part labor or overhead the unit price equals price(job, rate_card).
+
+    Args:
+        job: Job for a single part
+        rate_card: RateCard holding the shop settings
+        per_plate: Parts that fit on one plate
+        quantities: Order quantities to price
+        part_labor_time: Minutes of per-part labor (post-processing)
+        plate_overhead_time: Machine hours added per plate
+
+    Returns:
+        list: One row per quantity with quantity, plates, the price() fields per unit,
+              order_total_cost, order_price_custom and saving_percent against one unit
+    """
+    if per_plate < 1:
+        raise ValueError('Part does not fit on the bed')
+
+    material = job.filament_required * job.filament_cost * rate_card.material_per_gram
+    machine_rate = rate_card.cost_per_hour
+    electricity_rate = rate_card.electricity_per_hour
+
+    def unit_costs(quantity):
+        plates = math.ceil(quantity / per_plate)
+        hours = quantity * job.print_time + plates * plate_overhead_time
+        labor = (plates * job.labor_time + quantity * part_labor_time) * rate_card.labor_per_minute
+        packaging = quantity * job.packaging_total + job.shipping_cost
+        return plates, (material, labor / quantity, hours * machine_rate / quantity,
+                        hours * electricity_rate / quantity, packaging / quantity)
+
+    single = sum(unit_costs(1)[1])
+    rows = []
+    for quantity in quantities:
+        quantity = int(quantity)
+        if quantity < 1:
+            raise ValueError('Quantities must be at least 1')
+        plates, components = unit_costs(quantity)
+        unit = quote_result(*components, rate_card.custom_margin, rate_card.cost_per_hour)
+        unit_total = sum(components)
+        rows.append({
+            'quantity': quantity,
+            'plates': plates,
+            **unit,
+            'order_total_cost': round(unit_total * quantity, 2),
+            'order_price_custom': round(unit['price_custom'] * quantity, 2),
+            'saving_percent': round((1 - unit_total / single) * 100, 1) if single else 0.0,
+        })
+    return rows
@@ -0,0 +1,361 @@
+"""
+PrintForge Pricing Engine
+Pure-Python cost model shared by the Flask routes and any background worker
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import astuple, dataclass, field
+
+HOURS_PER_YEAR = 365.25 * 24
+
+# Payload keys that make up a rate card, in RateCard field order, with their defaults
+RATE_CARD_SETTINGS = (
+    ('printer_cost', 1000.0),
+    ('upfront_cost', 0.0),
+    ('annual_maintenance', 75.0),
+    ('printer_life', 3.0),
+    ('average_uptime', 50.0),
+    ('power_consumption', 250.0),
+    ('electricity_rate', 0.30),
+    ('electricity_daily', 1.50),
+    ('efficiency_factor', 1.1),
+    ('labor_rate', 20.0),
+    ('custom_margin', 75.0),
+)
+
+
+def machine_cost_per_hour(printer_cost, upfront_cost, annual_maintenance, printer_life, average_uptime):
+    """Printer purchase, setup and maintenance spread over its expected running hours"""
+    lifetime_cost = printer_cost + upfront_cost + annual_maintenance * printer_life
+    total_uptime_hours = HOURS_PER_YEAR * printer_life * (average_uptime / 100)
+    return lifetime_cost / total_uptime_hours if total_uptime_hours > 0 else 0
+
+
+def electricity_cost_per_hour(power_consumption, electricity_rate, electricity_daily):
+    """Metered usage plus the daily standing charge spread over 24 hours"""
+    return (power_consumption / 1000) * electricity_rate + electricity_daily / 24
+
+
+def items_total(items):
+    """Total of hardware/packaging line items ({'quantity', 'unit_cost'})"""
+    return sum(item['quantity'] * item['unit_cost'] for item in items)
+
+
+@dataclass(frozen=True)
+class RateCard:
+    """
+    Shop-wide machine, electricity, labor and margin settings
+
+    The derived per-hour coefficients are computed once when the card is
+    built, so pricing a job is only a handful of multiply-adds.
+    """
+
+    printer_cost: float = 1000.0
+    upfront_cost: float = 0.0
+    annual_maintenance: float = 75.0
+    printer_life: float = 3.0
+    average_uptime: float = 50.0
+    power_consumption: float = 250.0
+    electricity_rate: float = 0.30
+    electricity_daily: float = 1.50
+    efficiency_factor: float = 1.1
+    labor_rate: float = 20.0
+    custom_margin: float = 75.0
+
+    cost_per_hour: float = field(init=False, repr=False, compare=False)
+    electricity_per_hour: float = field(init=False, repr=False, compare=False)
+    labor_per_minute: float = field(init=False, repr=False, compare=False)
+    material_per_gram: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        cost_per_hour = machine_cost_per_hour(self.printer_cost, self.upfront_cost, self.annual_maintenance,
+                                              self.printer_life, self.average_uptime)
+        electricity_per_hour = electricity_cost_per_hour(self.power_consumption, self.electricity_rate,
+                                                         self.electricity_daily)
+
+        object.__setattr__(self, 'cost_per_hour', cost_per_hour)
+        object.__setattr__(self, 'electricity_per_hour', electricity_per_hour)
+        object.__setattr__(self, 'labor_per_minute', self.labor_rate / 60)
+        # Filament is priced per kg; scale to grams with the waste factor applied
+        object.__setattr__(self, 'material_per_gram', self.efficiency_factor / 1000)
+
+    @staticmethod
+    def settings_key(data):
+        """Parse the rate card settings out of a /calculate-style payload into a hashable tuple"""
+        return tuple(float(data.get(key, default)) for key, default in RATE_CARD_SETTINGS)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a rate card from a /calculate-style payload, using defaults for missing keys"""
+        return cls(*cls.settings_key(data))
+
+
+class RateCardCache:
+    """
+    LRU cache of rate cards keyed on the parsed settings
+
+    The settings rarely change between quotes (only when Advanced Settings
+    are edited), so repeated requests reuse the derived coefficients instead
+    of rebuilding the card.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, data):
+        """Return the rate card for a /calculate-style payload, building it on a miss"""
+        key = RateCard.settings_key(data)
+        with self._lock:
+            card = self._cards.get(key)
+            if card is not None:
+                self._cards.move_to_end(key)
+                self.hits += 1
+                return card
+            self.misses += 1
+
+        card = RateCard(*key)
+        with self._lock:
+            self._cards[key] = card
+            self._cards.move_to_end(key)
+            while len(self._cards) > self.maxsize:
+                self._cards.popitem(last=False)
+        return card
+
+    def clear(self):
+        """Drop every cached card and reset the counters"""
+        with self._lock:
+            self._cards.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._cards),
+                'maxsize': self.maxsize,
+            }
+
+
+@dataclass(frozen=True)
+class Job:
+    """A single part to be priced against a rate card"""
+
+    filament_cost: float = 40.0
+    filament_required: float = 0.0
+    print_time: float = 0.0
+    labor_time: float = 0.0
+    hardware_total: float = 0.0
+    packaging_total: float = 0.0
+    shipping_cost: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a job from a /calculate-style payload, totalling hardware and packaging items"""
+        hardware_items = data.get('hardware_items', [])
+        packaging_items = data.get('packaging_items', [])
+        return cls(
+            filament_cost=float(data.get('filament_cost', 40.0)),
+            filament_required=float(data.get('filament_required', 0.0)),
+            print_time=float(data.get('print_time', 0.0)),
+            labor_time=float(data.get('labor_time', 0)),
+            hardware_total=items_total(hardware_items),
+            packaging_total=items_total(packaging_items),
+            shipping_cost=float(data.get('shipping_cost', 0.0)),
+        )
+
+
+def price(job, rate_card):
+    """
+    Price a single job
+
+    Args:
+        job: Job to price
+        rate_card: RateCard holding the shop settings
+
+    Returns:
+        dict: Cost breakdown and margin prices, rounded as returned by /calculate
+    """
+    material_cost = job.filament_required * job.filament_cost * rate_card.material_per_gram
+    labor_cost = job.labor_time * rate_card.labor_per_minute
+    machine_depreciation = job.print_time * rate_card.cost_per_hour
+    electricity_cost = job.print_time * rate_card.electricity_per_hour
+    total_packaging = job.packaging_total + job.shipping_cost
+
+    return quote_result(material_cost, labor_cost, machine_depreciation, electricity_cost, total_packaging,
+                        rate_card.custom_margin, rate_card.cost_per_hour)
+
+
+def quote_result(material_cost, labor_cost, machine_depreciation, electricity_cost, total_packaging,
+                 custom_margin, cost_per_hour):
+    """
+    Total the cost components and apply the margins
+
+    Returns:
+        dict: Cost breakdown and margin prices, rounded as returned by /calculate
+    """
+    machine_cost_total = machine_depreciation + electricity_cost
+
+    # Hardware is itemised on the quote but not part of the landed cost
+    total_cost = material_cost + labor_cost + machine_cost_total + total_packaging
+
+    def calc_price(margin):
+        return total_cost / (1 - margin / 100) if margin < 100 else 0
+
+    return {
+        'material_cost': round(material_cost, 2),
+        'labor_cost': round(labor_cost, 2),
+        'machine_depreciation': round(machine_depreciation, 2),
+        'electricity_cost': round(electricity_cost, 2),
+        'machine_cost_total': round(machine_cost_total, 2),
+        'packaging_cost': round(total_packaging, 2),
+        'total_cost': round(total_cost, 2),
+        'price_50': round(calc_price(50), 2),
+        'price_60': round(calc_price(60), 2),
+        'price_70': round(calc_price(70), 2),
+        'price_custom': round(calc_price(custom_margin), 2),
+        'custom_margin': custom_margin,
+        'cost_per_hour': round(cost_per_hour, 4),
+    }
+
+
+def price_many(jobs, rate_card):
+    """
+    Price many jobs against the same rate card
+
+    Args:
+        jobs: Iterable of Job
+        rate_card: RateCard shared by every job
+
+    Returns:
+        list: One price() result per job, in input order
+    """
+    return [price(job, rate_card) for job in jobs]
+
+
+def compare(base, scenarios, rate_cards=None):
+    """
+    Price several variations of one quote and rank them by total cost
+
+    Args:
+        base: /calculate-style payload shared by every scenario
+        scenarios: List of override dicts (any /calculate field, plus an optional 'name')
+        rate_cards: RateCardCache for scenarios that change shop settings (optional)
+
+    Returns:
+        list: One row per scenario, cheapest first, with the price() fields plus
+              name, index (input position), rank, delta and delta_percent vs the cheapest
+    """
+    base_card = rate_cards.get(base) if rate_cards else RateCard.from_dict(base)
+    setting_keys = {key for key, _ in RATE_CARD_SETTINGS}
+
+    rows = []
+    for index, overrides in enumerate(scenarios):
+        merged = {**base, **overrides}
+        try:
+            job = Job.from_dict(merged)
+            if setting_keys.isdisjoint(overrides):
+                card = base_card
+            else:
+                card = rate_cards.get(merged) if rate_cards else RateCard.from_dict(merged)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'Scenario {index + 1}: {e}')
+
+        rows.append({
+            'name': overrides.get('name') or f'Option {index + 1}',
+            'index': index,
+            **price(job, card),
+        })
+
+    rows.sort(key=lambda row: (row['total_cost'], row['index']))
+    cheapest = rows[0]['total_cost'] if rows else 0.0
+    for rank, row in enumerate(rows, start=1):
+        row['rank'] = rank
+        row['delta'] = round(row['total_cost'] - cheapest, 2)
+        row['delta_percent'] = round((row['total_cost'] - cheapest) / cheapest * 100, 2) if cheapest else 0.0
+    return rows
+
+
+def quote_key(settings, job):
+    """
+    Content hash of a quote's inputs
+
+    Args:
+        settings: RateCard.settings_key() tuple
+        job: Job
+
+    Returns:
+        str: Hex digest that is identical for any two payloads that price the
+             same (key order, int vs float and unrelated fields don't matter)
+    """
+    canonical = repr((settings, astuple(job))).encode('utf-8')
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+class QuoteCache:
+    """
+    LRU cache of serialized /calculate response bodies keyed on quote_key()
+
+    Storing the encoded body means a hit skips both pricing and JSON
+    serialization.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached body for key, or None"""
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._bodies.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._bodies[key] = body
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.maxsize:
+                self._bodies.popitem(last=False)
+
+    def record_not_modified(self):
+        """Count a request answered with 304 from the client's ETag"""
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        """Drop every cached body and reset the counters"""
+        with self._lock:
+            self._bodies.clear()
+            self.hits = 0
+            self.misses = 0
+            self.not_modified = 0
+
+    def stats(self):
+        """Return hit/miss/304 counters, hit rate and current size"""
+        with self._lock:
+            served = self.hits + self.misses + self.not_modified
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_rate': round((self.hits + self.not_modified) / served, 4) if served else 0.0,
+                'size': len(self._bodies),
+                'maxsize': self.maxsize,
+            }
@@ -0,0 +1,216 @@
+"""
+PrintForge Printer Registry
+SQLite-backed fleet of printers with their machine rates precomputed and indexed in memory
+
+Each printer stores its own machine and electricity settings. The derived
+cost-per-hour and electricity-per-hour coefficients are worked out when the
+printer is saved, and every printer is kept in a dict keyed on its ID, so a
+quote or batch row that names a printer_id gets its rates without the
+client re-sending the machine settings. When another process (a serve.py
+worker) or thread changes the table, SQLite's data_version moves and the
+index is reloaded before the next lookup.
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from pricing_engine import RATE_CARD_SETTINGS, electricity_cost_per_hour, machine_cost_per_hour
+
+# Rate card settings that belong to a printer (labor, waste and margin stay shop-wide)
+PRINTER_SETTINGS = tuple(
+    (key, default) for key, default in RATE_CARD_SETTINGS
+    if key in ('printer_cost', 'upfront_cost', 'annual_maintenance', 'printer_life', 'average_uptime',
+               'power_consumption', 'electricity_rate', 'electricity_daily')
+)
+SETTING_KEYS = tuple(key for key, _ in PRINTER_SETTINGS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS printers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    printer_cost REAL NOT NULL,
+    upfront_cost REAL NOT NULL,
+    annual_maintenance REAL NOT NULL,
+    printer_life REAL NOT NULL,
+    average_uptime REAL NOT NULL,
+    power_consumption REAL NOT NULL,
+    electricity_rate REAL NOT NULL,
+    electricity_daily REAL NOT NULL,
+    cost_per_hour REAL NOT NULL,
+    electricity_per_hour REAL NOT NULL,
+    updated TEXT NOT NULL
+);
+"""
+
+COLUMNS = ('name',) + SETTING_KEYS + ('cost_per_hour', 'electricity_per_hour', 'updated')
+
+
+@dataclass(frozen=True)
+class RegisteredPrinter:
+    """One saved printer with its precomputed rates"""
+
+    id: int
+    name: str
+    settings: tuple
+    cost_per_hour: float
+    electricity_per_hour: float
+    updated: str
+
+    def settings_dict(self):
+        """The printer's machine settings as /calculate payload keys"""
+        return dict(zip(SETTING_KEYS, self.settings))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            **self.settings_dict(),
+            'cost_per_hour': round(self.cost_per_hour, 4),
+            'electricity_per_hour': round(self.electricity_per_hour, 4),
+            'updated': self.updated,
+        }
+
+
+def _row_to_printer(row):
+    return RegisteredPrinter(
+        id=row['id'],
+        name=row['name'],
+        settings=tuple(row[key] for key in SETTING_KEYS),
+        cost_per_hour=row['cost_per_hour'],
+        electricity_per_hour=row['electricity_per_hour'],
+        updated=row['updated'],
+    )
+
+
+class PrinterRegistry:
+    """
+    Printers saved in a SQLite file, mirrored in an in-memory index
+
+    The index is updated alongside every write made through this instance.
+    Reads only ask SQLite for PRAGMA data_version, which changes when any
+    other connection commits; the table is read again only then.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._index = {}
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._current()
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _current(self):
+        """The index, reloaded first if another connection has committed since this thread last looked"""
+        conn = self._connect()
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if version != getattr(self._local, 'data_version', None):
+            with self._lock:
+                self._index = {row['id']: _row_to_printer(row) for row in conn.execute('SELECT * FROM printers')}
+            self._local.data_version = version
+        return self._index
+
+    def __len__(self):
+        return len(self._current())
+
+    def list(self):
+        """Every printer, sorted by name"""
+        return sorted(self._current().values(), key=lambda printer: (printer.name.lower(), printer.id))
+
+    def get(self, printer_id):
+        """Return the printer with this ID, or None"""
+        try:
+            printer_id = int(printer_id)
+        except (TypeError, ValueError):
+            return None
+        return self._current().get(printer_id)
+
+    def require(self, printer_id):
+        """Return the printer with this ID, raising ValueError if there is none"""
+        printer = self.get(printer_id)
+        if printer is None:
+            raise ValueError(f'Unknown printer: {printer_id}')
+        return printer
+
+    def save(self, data, printer_id=None):
+        """
+        Add a printer, or replace an existing one's name and settings
+
+        Args:
+            data: { 'name', plus any of the machine/electricity settings (defaults for missing keys) }
+            printer_id: ID to update, or None to add a new printer
+
+        Returns:
+            RegisteredPrinter: The stored printer, or None if printer_id does not exist
+        """
+        name = (data.get('name') or '').strip()
+        if not name:
+            raise ValueError('Printer name is required')
+        settings = tuple(float(data.get(key, default)) for key, default in PRINTER_SETTINGS)
+        values = dict(zip(SETTING_KEYS, settings))
+        if values['printer_life'] <= 0 or not 0 < values['average_uptime'] <= 100:
+            raise ValueError('printer_life must be positive and average_uptime between 0 and 100')
+
+        cost_per_hour = machine_cost_per_hour(values['printer_cost'], values['upfront_cost'],
+                                              values['annual_maintenance'], values['printer_life'],
+                                              values['average_uptime'])
+        electricity_per_hour = electricity_cost_per_hour(values['power_consumption'], values['electricity_rate'],
+                                                         values['electricity_daily'])
+        updated = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        row = (name,) + settings + (cost_per_hour, electricity_per_hour, updated)
+
+        with self._lock, self._connect() as conn:
+            if printer_id is None:
+                cursor = conn.execute(
+                    f'INSERT INTO printers ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})', row
+                )
+                printer_id = cursor.lastrowid
+            else:
+                printer_id = int(printer_id)
+                cursor = conn.execute(
+                    f'UPDATE printers SET {", ".join(f"{column} = ?" for column in COLUMNS)} WHERE id = ?',
+                    row + (printer_id,)
+                )
+                if cursor.rowcount == 0:
+                    return None
+
+            printer = RegisteredPrinter(printer_id, name, settings, cost_per_hour, electricity_per_hour, updated)
+            # Copy on write so lookups in other threads never see the dict change mid-iteration
+            self._index = {**self._index, printer_id: printer}
+        return printer
+
+    def delete(self, printer_id):
+        """Remove a printer; returns False if it does not exist"""
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute('DELETE FROM printers WHERE id = ?', (int(printer_id),))
+            self._index = {key: printer for key, printer in self._index.items() if key != int(printer_id)}
+        return cursor.rowcount > 0
+
+    def apply(self, data):
+        """
+        Fill a /calculate-style payload with the settings of the printer it names
+
+        Args:
+            data: Payload with an optional 'printer_id'
+
+        Returns:
+            dict: data unchanged without a printer_id, else a copy with the printer's
+                  machine settings taking precedence over any sent by the client
+        """
+        printer_id = data.get('printer_id')
+        if printer_id in (None, ''):
+            return data
+        return {**data, **self.require(printer_id).settings_dict()}
@@ -0,0 +1,170 @@
+"""
+PrintForge Quote Sessions
+Incremental recalculation for live quoting: only the cost components a change touches are recomputed
+
+A session holds the last parsed inputs and unrounded cost components for one
+open quote form. The client sends just the fields that changed since its
+last update; each component whose inputs are unchanged is reused as-is.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from pricing_engine import (RATE_CARD_SETTINGS, electricity_cost_per_hour, items_total,
+                            machine_cost_per_hour, quote_result)
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_TTL = 30 * 60        # Seconds an idle session is kept
+
+# Every input a session tracks, with the /calculate default
+SESSION_INPUTS = dict(RATE_CARD_SETTINGS, **{
+    'filament_cost': 40.0,
+    'filament_required': 0.0,
+    'print_time': 0.0,
+    'labor_time': 0.0,
+    'packaging_items': [],
+    'hardware_items': [],
+    'shipping_cost': 0.0,
+})
+
+# Cost component -> inputs it is computed from
+COMPONENT_INPUTS = {
+    'material': ('filament_required', 'filament_cost', 'efficiency_factor'),
+    'labor': ('labor_time', 'labor_rate'),
+    'machine': ('print_time', 'printer_cost', 'upfront_cost', 'annual_maintenance',
+                'printer_life', 'average_uptime'),
+    'electricity': ('print_time', 'power_consumption', 'electricity_rate', 'electricity_daily'),
+    'packaging': ('packaging_items', 'shipping_cost'),
+}
+
+# Input -> components to recompute when it changes (inputs mapping to nothing,
+# like custom_margin or hardware_items, only affect the final totals)
+DEPENDENTS = {key: tuple(name for name, inputs in COMPONENT_INPUTS.items() if key in inputs)
+              for key in SESSION_INPUTS}
+
+
+def _parse(key, value):
+    """Normalize one input the same way Job.from_dict / RateCard.from_dict do"""
+    if key in ('packaging_items', 'hardware_items'):
+        return items_total(value)
+    return float(value)
+
+
+class QuoteSession:
+    """Last inputs and cost components of one live quote"""
+
+    def __init__(self, data):
+        self.id = uuid.uuid4().hex
+        self.seq = 0
+        self.touched = time.monotonic()
+        self.quote = None
+        self._values = {key: _parse(key, data.get(key, default)) for key, default in SESSION_INPUTS.items()}
+        self._components = {}
+        self._lock = threading.Lock()
+        for name in COMPONENT_INPUTS:
+            self._compute(name)
+        self.quote = self._assemble()
+
+    def _compute(self, name):
+        v = self._values
+        if name == 'material':
+            # Same operation order as price() so results match to the last bit
+            material_per_gram = v['efficiency_factor'] / 1000
+            self._components['material'] = v['filament_required'] * v['filament_cost'] * material_per_gram
+        elif name == 'labor':
+            self._components['labor'] = v['labor_time'] * (v['labor_rate'] / 60)
+        elif name == 'machine':
+            cost_per_hour = machine_cost_per_hour(v['printer_cost'], v['upfront_cost'], v['annual_maintenance'],
+                                                  v['printer_life'], v['average_uptime'])
+            self._components['cost_per_hour'] = cost_per_hour
+            self._components['machine'] = v['print_time'] * cost_per_hour
+        elif name == 'electricity':
+            per_hour = electricity_cost_per_hour(v['power_consumption'], v['electricity_rate'],
+                                                 v['electricity_daily'])
+            self._components['electricity'] = v['print_time'] * per_hour
+        elif name == 'packaging':
+            self._components['packaging'] = v['packaging_items'] + v['shipping_cost']
+
+    def _assemble(self):
+        c = self._components
+        return quote_result(c['material'], c['labor'], c['machine'], c['electricity'], c['packaging'],
+                            self._values['custom_margin'], c['cost_per_hour'])
+
+    def update(self, changes):
+        """
+        Apply changed fields and recompute the components that depend on them
+
+        Args:
+            changes: Dict of /calculate fields that changed (unknown keys are ignored)
+
+        Returns:
+            tuple: (quote dict as returned by price(), sorted list of recomputed components)
+        """
+        with self._lock:
+            parsed = {key: _parse(key, value) for key, value in changes.items() if key in SESSION_INPUTS}
+            stale = set()
+            for key, value in parsed.items():
+                if self._values[key] != value:
+                    self._values[key] = value
+                    stale.update(DEPENDENTS[key])
+            for name in stale:
+                self._compute(name)
+            if parsed:
+                self.quote = self._assemble()
+            self.seq += 1
+            self.touched = time.monotonic()
+            quote = self.quote
+
+        return quote, sorted(stale)
+
+
+class QuoteSessionStore:
+    """
+    Bounded set of live sessions
+
+    Sessions idle for longer than `ttl` seconds, or beyond the newest
+    `maxsize`, are dropped; the client then simply opens a new one.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAX_SESSIONS, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, data):
+        """Open a session from a full /calculate payload"""
+        session = QuoteSession(data)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._evict()
+        return session
+
+    def get(self, session_id):
+        """Return a session by id, or None if it is unknown or has expired"""
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.touched = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def close(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self):
+        """Drop idle sessions and keep at most maxsize (caller holds the lock)"""
+        # Kept in access order, so idle sessions are always at the front
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions and next(iter(self._sessions.values())).touched < cutoff:
+            self._sessions.popitem(last=False)
+        while len(self._sessions) > self.maxsize:
+            self._sessions.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
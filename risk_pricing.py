@@ -0,0 +1,172 @@
+"""
+PrintForge Risk Pricing
+Monte Carlo landed-cost bands for print failures, filament price swings, time overruns and uptime
+
+Every trial draws its own reprint count, filament price, print time and
+printer uptime, and the whole run is priced with NumPy array operations
+(100k trials in a few milliseconds). The result reports P50/P90/P99 cost
+and the margin needed for the quote to stay profitable with a target
+probability.
+"""
+
+import hashlib
+from dataclasses import astuple, dataclass
+
+import numpy as np
+
+from pricing_engine import HOURS_PER_YEAR
+
+DEFAULT_TRIALS = 100_000
+MAX_TRIALS = 1_000_000
+PERCENTILES = (5, 25, 50, 75, 90, 95, 99)
+
+# Payload keys that make up a risk model, in RiskModel field order, with their defaults
+RISK_SETTINGS = (
+    ('failure_rate', 5.0),            # % of attempts that fail and are reprinted
+    ('material_volatility', 10.0),    # % standard deviation of the filament price
+    ('time_overrun', 5.0),            # % mean print time overrun over the estimate
+    ('time_spread', 10.0),            # % standard deviation of the print time
+    ('uptime_spread', 10.0),          # Percentage-point standard deviation of average uptime
+    ('target_probability', 90.0),     # % chance of a profit the margin should guarantee
+    ('trials', float(DEFAULT_TRIALS)),
+)
+
+
+@dataclass(frozen=True)
+class RiskModel:
+    """Spread of the uncertain inputs, with the target profit probability and trial count"""
+
+    failure_rate: float = 5.0
+    material_volatility: float = 10.0
+    time_overrun: float = 5.0
+    time_spread: float = 10.0
+    uptime_spread: float = 10.0
+    target_probability: float = 90.0
+    trials: float = float(DEFAULT_TRIALS)
+
+    def __post_init__(self):
+        if not 0 <= self.failure_rate < 100:
+            raise ValueError('failure_rate must be between 0 and 100')
+        if not 0 < self.target_probability < 100:
+            raise ValueError('target_probability must be between 0 and 100')
+        if not 1 <= self.trials <= MAX_TRIALS:
+            raise ValueError(f'trials must be between 1 and {MAX_TRIALS:,}')
+        if min(self.material_volatility, self.time_spread, self.uptime_spread) < 0:
+            raise ValueError('Spreads must not be negative')
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a risk model from a /calculate-style payload, using defaults for missing keys"""
+        return cls(*(float(data.get(key, default)) for key, default in RISK_SETTINGS))
+
+
+def risk_key(settings, job, model):
+    """
+    Content hash of a simulation's inputs, used as the cache key, ETag and random seed
+
+    Args:
+        settings: RateCard.settings_key() tuple
+        job: Job
+        model: RiskModel
+
+    Returns:
+        str: Hex digest
+    """
+    canonical = repr((settings, astuple(job), astuple(model))).encode('utf-8')
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+def simulate(job, rate_card, model, seed=None):
+    """
+    Sample the landed cost of one part
+
+    Failed attempts are drawn per trial from a geometric distribution; each
+    one wastes a random share of the material and print time before it is
+    caught. The filament price is lognormal around the entered price, the
+    print time is normal around the overrun-adjusted estimate, and uptime
+    (which sets the depreciation rate) is normal around the configured value.
+
+    Args:
+        job: Job to price
+        rate_card: RateCard holding the shop settings
+        model: RiskModel
+        seed: Seed for reproducible results
+
+    Returns:
+        np.ndarray: Landed cost of each trial
+    """
+    trials = int(model.trials)
+    rng = np.random.default_rng(seed)
+
+    failures = rng.geometric(1 - model.failure_rate / 100, trials) - 1
+    waste = 1 + failures * rng.random(trials)
+
+    # Lognormal with the entered price as its mean
+    sigma = np.log1p((model.material_volatility / 100) ** 2) ** 0.5
+    filament_cost = job.filament_cost * rng.lognormal(-sigma ** 2 / 2, sigma, trials)
+    material_cost = job.filament_required * filament_cost * rate_card.material_per_gram * waste
+
+    time_factor = rng.normal(1 + model.time_overrun / 100, model.time_spread / 100, trials)
+    hours = job.print_time * np.maximum(time_factor, 0.0) * waste
+
+    if rate_card.printer_life > 0 and rate_card.average_uptime > 0:
+        uptime = rng.normal(rate_card.average_uptime, model.uptime_spread, trials)
+        np.clip(uptime, 1.0, 100.0, out=uptime)
+        lifetime_cost = (rate_card.printer_cost + rate_card.upfront_cost
+                         + rate_card.annual_maintenance * rate_card.printer_life)
+        cost_per_hour = lifetime_cost / (HOURS_PER_YEAR * rate_card.printer_life * uptime / 100)
+    else:
+        # No running hours to spread the printer over: no machine cost, as in machine_cost_per_hour
+        cost_per_hour = 0.0
+
+    fixed = job.labor_time * rate_card.labor_per_minute + job.packaging_total + job.shipping_cost
+    return material_cost + hours * (cost_per_hour + rate_card.electricity_per_hour) + fixed
+
+
+def risk_quote(job, rate_card, model, seed=None):
+    """
+    Simulate a quote and summarize the cost distribution
+
+    Args:
+        job: Job to price
+        rate_card: RateCard holding the shop settings
+        model: RiskModel
+        seed: Seed for reproducible results
+
+    Returns:
+        dict: expected_cost (deterministic quote), mean/std, p50/p90/p99 and the
+              percentiles table, required_margin and required_price for the target
+              probability, and profit_probability at the current custom margin
+    """
+    costs = simulate(job, rate_card, model, seed)
+    levels = sorted(set(PERCENTILES) | {model.target_probability})
+    values = dict(zip(levels, np.percentile(costs, levels)))
+
+    expected = (job.filament_required * job.filament_cost * rate_card.material_per_gram
+                + job.labor_time * rate_card.labor_per_minute
+                + job.print_time * (rate_card.cost_per_hour + rate_card.electricity_per_hour)
+                + job.packaging_total + job.shipping_cost)
+
+    # Price that covers the cost in target_probability% of trials, as a margin on the quoted cost
+    required_price = values[model.target_probability]
+    required_margin = max(0.0, (1 - expected / required_price) * 100) if required_price > 0 else 0.0
+
+    margin = rate_card.custom_margin
+    custom_price = expected / (1 - margin / 100) if margin < 100 else 0.0
+
+    return {
+        'trials': len(costs),
+        'expected_cost': round(expected, 2),
+        'mean_cost': round(float(costs.mean()), 2),
+        'std_cost': round(float(costs.std()), 2),
+        'p50': round(float(values[50]), 2),
+        'p90': round(float(values[90]), 2),
+        'p99': round(float(values[99]), 2),
+        'percentiles': {str(level): round(float(values[level]), 2) for level in PERCENTILES},
+        'target_probability': model.target_probability,
+        'required_price': round(float(required_price), 2),
+        'required_margin': round(required_margin, 1),
+        'custom_margin': margin,
+        'price_custom': round(custom_price, 2),
+        'profit_probability': round(float(np.count_nonzero(costs < custom_price)) / len(costs) * 100, 1),
+    }
@@ -0,0 +1,178 @@
+"""
+PrintForge Pricing Calculator - Production Server
+Serves the Flask app with a multi-threaded WSGI server instead of the development server
+
+Usage:
+    python serve.py --host 0.0.0.0 --port 5000 --threads 8
+
+Waitress (threads, works on Windows) is used by default. On Linux/macOS,
+--workers N > 1 runs N gunicorn worker processes when gunicorn is installed.
+Worker processes share the data/ folder: queued export jobs are spooled there
+by job id so any worker can report their status and serve the result.
+"""
+
+import _thread
+import argparse
+import os
+import signal
+import sys
+import threading
+
+import startup
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+DEFAULT_THREADS = 8
+DEFAULT_KEEPALIVE = 30          # Seconds an idle keep-alive connection is held open
+DEFAULT_CONNECTION_LIMIT = 200
+DEFAULT_GRACEFUL_TIMEOUT = 10   # Seconds /ready reports 503 while in-flight requests finish on shutdown
+
+
+def mark_shutting_down(app):
+    """Make /ready report not-ready so load balancers stop sending new requests"""
+    app.config['SHUTTING_DOWN'] = True
+
+
+def serve_waitress(app, host=DEFAULT_HOST, port=DEFAULT_PORT, threads=DEFAULT_THREADS,
+                   keepalive=DEFAULT_KEEPALIVE, connection_limit=DEFAULT_CONNECTION_LIMIT,
+                   graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT, install_signals=True):
+    """
+    Serve with waitress until interrupted
+
+    The first SIGINT/SIGTERM starts a drain: /ready reports 503 so load
+    balancers stop sending new requests, and the server keeps answering for
+    `graceful_timeout` seconds before it stops and lets worker threads finish
+    what they are handling. A second signal stops it straight away.
+    """
+    from waitress.server import create_server
+
+    server = create_server(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        channel_timeout=keepalive,
+        connection_limit=connection_limit,
+        ident='PrintForge',
+    )
+
+    if install_signals:
+        def handle_signal(signum, frame):
+            if app.config.get('SHUTTING_DOWN') or graceful_timeout <= 0:
+                mark_shutting_down(app)
+                raise SystemExit(0)
+            mark_shutting_down(app)
+            # Interrupting the main thread re-enters this handler once the drain window is over
+            drain = threading.Timer(graceful_timeout, _thread.interrupt_main)
+            drain.daemon = True
+            drain.start()
+
+        signal.signal(signal.SIGINT, handle_signal)
+        if hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, handle_signal)
+
+    server.run()
+
+
+def serve_gunicorn(app, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=2, threads=DEFAULT_THREADS,
+                   keepalive=DEFAULT_KEEPALIVE, graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT):
+    """Serve with gunicorn worker processes (POSIX only)"""
+    from gunicorn.app.base import BaseApplication
+
+    class PrintForgeApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('keepalive', keepalive)
+            self.cfg.set('graceful_timeout', graceful_timeout)
+            self.cfg.set('worker_int', lambda worker: mark_shutting_down(app))
+
+        def load(self):
+            return app
+
+    PrintForgeApplication().run()
+
+
+def serve(app, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=1, threads=DEFAULT_THREADS,
+          keepalive=DEFAULT_KEEPALIVE, connection_limit=DEFAULT_CONNECTION_LIMIT,
+          graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT, install_signals=True):
+    """
+    Serve the app with the best available production server
+
+    Args:
+        app: Flask application
+        workers: Worker processes (gunicorn only; waitress always runs one process)
+        threads: Request threads per process
+        keepalive: Idle keep-alive timeout in seconds
+        connection_limit: Maximum simultaneous connections (waitress)
+        graceful_timeout: Seconds to keep serving with /ready at 503 before stopping on shutdown
+        install_signals: Install SIGINT/SIGTERM handlers (must be False off the main thread)
+    """
+    if workers > 1 and os.name != 'nt':
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("gunicorn not installed - serving with waitress in a single process")
+        else:
+            serve_gunicorn(app, host, port, workers, threads, keepalive, graceful_timeout)
+            return
+
+    serve_waitress(app, host, port, threads, keepalive, connection_limit, graceful_timeout, install_signals)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run PrintForge with a production WSGI server')
+    parser.add_argument('--host', default=os.environ.get('PRINTFORGE_HOST', DEFAULT_HOST))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PRINTFORGE_PORT', DEFAULT_PORT)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('PRINTFORGE_WORKERS', 1)),
+                        help='Worker processes (needs gunicorn, Linux/macOS only)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('PRINTFORGE_THREADS', DEFAULT_THREADS)),
+                        help='Request threads per process')
+    parser.add_argument('--keepalive', type=int, default=DEFAULT_KEEPALIVE,
+                        help='Idle keep-alive connection timeout in seconds')
+    parser.add_argument('--connection-limit', type=int, default=DEFAULT_CONNECTION_LIMIT)
+    parser.add_argument('--graceful-timeout', type=int, default=DEFAULT_GRACEFUL_TIMEOUT,
+                        help='Seconds to keep serving with /ready at 503 after SIGINT/SIGTERM before stopping')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Record per-route request metrics and serve them at /metrics')
+    parser.add_argument('--trace-startup', action='store_true',
+                        help='Print boot phase timings and the slowest imports once the server is ready')
+    args = parser.parse_args(argv)
+
+    trace = startup.StartupTrace(args.trace_startup or startup.trace_requested([]))
+
+    if args.metrics:
+        # Read by app.py at import time
+        os.environ['PRINTFORGE_METRICS'] = '1'
+
+    from app import app
+    trace.mark('app imported')
+
+    if trace.enabled:
+        probe_host = '127.0.0.1' if args.host in ('0.0.0.0', '::', '') else args.host
+
+        def report_when_ready():
+            if startup.wait_for_server(probe_host, args.port):
+                trace.mark('server accepting connections')
+            trace.report()
+
+        threading.Thread(target=report_when_ready, daemon=True).start()
+
+    print("\n" + "="*60)
+    print("PrintForge Pricing Calculator - Production Server")
+    print("="*60)
+    print(f"\nURL: http://{args.host}:{args.port}")
+    print(f"Workers: {args.workers}  Threads: {args.threads}  Keep-alive: {args.keepalive}s")
+    print("\nPress Ctrl+C to stop the server")
+    print("="*60 + "\n")
+
+    serve(app, args.host, args.port, args.workers, args.threads, args.keepalive,
+          args.connection_limit, args.graceful_timeout)
+    print("\nShutting down...")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
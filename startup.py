@@ -0,0 +1,113 @@
+"""
+PrintForge Startup
+Server readiness checks and an optional startup trace for the launchers
+
+Run any launcher with --trace-startup (or PRINTFORGE_TRACE_STARTUP=1) to print
+how long each boot phase took and which imports were the slowest.
+"""
+
+import builtins
+import os
+import socket
+import sys
+import threading
+import time
+
+TRACE_FLAG = '--trace-startup'
+READY_TIMEOUT = 30.0     # Seconds to wait for the server socket before giving up
+READY_INTERVAL = 0.02    # Seconds between connection attempts
+
+
+def wait_for_server(host, port, timeout=READY_TIMEOUT, interval=READY_INTERVAL):
+    """
+    Block until a TCP connection to host:port succeeds
+
+    Args:
+        host: Server host
+        port: Server port
+        timeout: Seconds to keep trying
+        interval: Seconds between attempts
+
+    Returns:
+        bool: True once the server accepts connections, False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=interval * 10):
+                return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+
+def trace_requested(argv=None):
+    """True if the startup trace was asked for on the command line or in the environment"""
+    argv = sys.argv if argv is None else argv
+    return TRACE_FLAG in argv or os.environ.get('PRINTFORGE_TRACE_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+
+class StartupTrace:
+    """
+    Boot phase timings plus a per-module import breakdown
+
+    While enabled, every first-time import is timed (cumulative, including the
+    modules it pulls in). When disabled, mark() and report() do nothing and
+    no import hook is installed.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.phases = []
+        self.imports = []
+        self._original_import = None
+        self._local = threading.local()
+        if enabled:
+            self._install()
+
+    def _install(self):
+        original = builtins.__import__
+        self._original_import = original
+
+        def traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._local.depth = depth
+                self.imports.append((time.perf_counter() - started, depth, name))
+
+        builtins.__import__ = traced_import
+
+    def mark(self, phase):
+        """Record that a boot phase finished"""
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter() - self.start))
+
+    def report(self, top=15, stream=None):
+        """Print the phase timings and the slowest imports, then remove the import hook"""
+        if not self.enabled:
+            return
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+        stream = stream or sys.stderr
+        print('\nStartup trace', file=stream)
+        print('-' * 60, file=stream)
+        previous = 0.0
+        for phase, elapsed in self.phases:
+            print(f'{elapsed * 1000:9.1f} ms  (+{(elapsed - previous) * 1000:7.1f})  {phase}', file=stream)
+            previous = elapsed
+
+        if self.imports:
+            print(f'\nSlowest imports (cumulative, {len(self.imports)} traced)', file=stream)
+            for elapsed, depth, name in sorted(self.imports, reverse=True)[:top]:
+                print(f'{elapsed * 1000:9.1f} ms  {"  " * min(depth, 4)}{name}', file=stream)
+        print('-' * 60, file=stream)
@@ -262,6 +262,92 @@ function validateForm() {
     return errors;
 }
 
+// Recent /calculate results by request body, revalidated with their ETag so an unchanged form gets a 304
+const quoteResponses = new Map();
+const QUOTE_RESPONSES_MAX = 50;
+
+// POST /calculate, returning a fresh copy of the result (callers modify it, e.g. for client discounts)
+async function fetchQuote(data) {
+    // Desktop mode: price in-process through the js_api bridge, no HTTP round trip
+    if (isDesktopMode()) {
+        return window.pywebview.api.calculate(data);
+    }
+
+    const body = JSON.stringify(data);
+    const cached = quoteResponses.get(body);
+    const headers = { 'Content-Type': 'application/json' };
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+
+    const response = await fetch('/calculate', { method: 'POST', headers, body });
+
+    let entry = cached;
+    if (response.status !== 304 || !cached) {
+        entry = { etag: response.headers.get('ETag'), result: await response.json() };
+    }
+
+    // Re-insert so the Map stays in least-recently-used order
+    quoteResponses.delete(body);
+    if (entry.result.success && entry.etag) {
+        quoteResponses.set(body, entry);
+        if (quoteResponses.size > QUOTE_RESPONSES_MAX) {
+            quoteResponses.delete(quoteResponses.keys().next().value);
+        }
+    }
+
+    return JSON.parse(JSON.stringify(entry.result));
+}
+
+// Live quote session: the first calculation posts the full form, later ones only the fields that changed
+let liveQuote = null;
+let liveQuoteQueue = Promise.resolve();
+
+// Requests go out one at a time, so each delta is built against the fields the previous
+// request actually sent and responses can't arrive out of order
+function fetchLiveQuote(data) {
+    const request = liveQuoteQueue.then(() => sendLiveQuote(data));
+    liveQuoteQueue = request.catch(() => {});
+    return request;
+}
+
+async function sendLiveQuote(data) {
+    if (isDesktopMode()) {
+        return window.pywebview.api.calculate(data);
+    }
+
+    const headers = { 'Content-Type': 'application/json' };
+    const fields = {};
+    for (const [key, value] of Object.entries(data)) {
+        fields[key] = JSON.stringify(value);
+    }
+
+    if (liveQuote) {
+        const changes = {};
+        for (const key of Object.keys(fields)) {
+            if (fields[key] !== liveQuote.sent[key]) {
+                changes[key] = data[key];
+            }
+        }
+        const response = await fetch(`/quote-sessions/${liveQuote.id}`, {
+            method: 'POST', headers, body: JSON.stringify(changes)
+        });
+        // 404 means the session expired on the server; fall through and open a new one
+        if (response.status !== 404) {
+            const result = await response.json();
+            if (result.success) {
+                liveQuote.sent = fields;
+            }
+            return result;
+        }
+    }
+
+    const response = await fetch('/quote-sessions', { method: 'POST', headers, body: JSON.stringify(data) });
+    const result = await response.json();
+    liveQuote = result.success ? { id: result.session_id, sent: fields } : null;
+    return result;
+}
+
 // Calculate Pricing
 async function calculate() {
     try {
@@ -275,15 +361,7 @@ async function calculate() {
 
         const data = collectFormData();
         
-        const response = await fetch('/calculate', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(data)
-        });
-        
-        const result = await response.json();
+        const result = await fetchLiveQuote(pricingPayload(data));
 
         if (result.success) {
             // Apply client discount if client selected
@@ -335,6 +413,11 @@ async function calculate() {
             // Check price alert
             checkPriceAlert(result);
 
+            // Keep the risk bands in step with the quote once they've been shown
+            if (riskBandsShown) {
+                runRiskQuote();
+            }
+
             // Add to history
             addToHistory({
                 partName: data.part_name,
@@ -346,7 +429,8 @@ async function calculate() {
                 laborCost: result.labor_cost,
                 machineCost: result.machine_cost_total,
                 packagingCost: result.packaging_cost,
-                notes: data.quote_notes
+                notes: data.quote_notes,
+                client: clientId ? (clients.find(c => c.id === clientId)?.name || '') : ''
             });
 
             // Update client stats if client selected
@@ -401,19 +485,7 @@ async function saveConfig() {
                 return;
             }
 
-            const response = await fetch('/save-file-to-path', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    filepath: filepath,
-                    content: JSON.stringify(config, null, 2),
-                    content_type: 'json'
-                })
-            });
-
-            const result = await response.json();
+            const result = await window.pywebview.api.save_config(filepath, config);
             if (result.success) {
                 showMessage('Configuration saved!', 'success');
             } else {
@@ -451,6 +523,179 @@ async function saveConfig() {
     }
 }
 
+// Import G-code: fill filament grams and print time from the slicer's estimates
+async function importGcode() {
+    if (!isDesktopMode()) {
+        document.getElementById('gcode-file').click();
+        return;
+    }
+
+    try {
+        // Desktop mode: the server reads the file in place instead of uploading it
+        const filepath = await window.pywebview.api.open_file_dialog();
+        if (!filepath) {
+            return;
+        }
+
+        const response = await fetch('/parse-gcode', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                filepath,
+                material: document.getElementById('material_type').value
+            })
+        });
+        applyGcodeMetadata(await response.json());
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+async function importGcodeFile(event) {
+    try {
+        const file = event.target.files[0];
+        if (!file) return;
+
+        const formData = new FormData();
+        formData.append('file', file);
+        formData.append('material', document.getElementById('material_type').value);
+
+        const response = await fetch('/parse-gcode', {
+            method: 'POST',
+            body: formData
+        });
+        applyGcodeMetadata(await response.json());
+
+        // Reset file input
+        event.target.value = '';
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+function applyGcodeMetadata(result) {
+    if (!result.success) {
+        showMessage('G-code import failed: ' + result.error, 'error');
+        return;
+    }
+
+    if (result.filament_grams !== null) {
+        document.getElementById('filament_required').value = result.filament_grams;
+    }
+    if (result.print_time_hours !== null) {
+        document.getElementById('print_time').value = result.print_time_hours;
+    }
+
+    const extruders = result.extruders.length > 1 ? ` across ${result.extruders.length} extruders` : '';
+    const estimated = result.weight_estimated ? ' (weight estimated from filament length)' : '';
+    showMessage(`Imported ${result.filament_grams ?? 0} g, ${result.print_time_hours ?? 0} h${extruders}${estimated}`, 'success');
+    calculate();
+}
+
+// Material settings for model estimates, taken from the selected material or preset
+function selectedMaterialSettings() {
+    const value = document.getElementById('material_type').value;
+
+    if (value.startsWith('preset-system-')) {
+        return { material: systemPresets[value].material };
+    }
+    if (value.startsWith('preset-user-')) {
+        const preset = customMaterialPresets.find(p => p.id === value.replace('preset-user-', ''));
+        if (preset) {
+            return {
+                material: preset.material,
+                density: preset.density || '',
+                infill: preset.infill ?? '',
+                wall_count: preset.wall_count || ''
+            };
+        }
+    }
+    return { material: value };
+}
+
+// Import Model: estimate filament grams from an unsliced STL/3MF
+async function importModel() {
+    if (!isDesktopMode()) {
+        document.getElementById('model-file').click();
+        return;
+    }
+
+    try {
+        // Desktop mode: the server memory-maps the file in place
+        const filepath = await window.pywebview.api.open_file_dialog();
+        if (!filepath) {
+            return;
+        }
+
+        const response = await fetch('/analyze-model', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ filepath, ...selectedMaterialSettings() })
+        });
+        applyModelAnalysis(await response.json());
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+async function importModelFile(event) {
+    try {
+        const file = event.target.files[0];
+        if (!file) return;
+
+        const formData = new FormData();
+        formData.append('file', file);
+        Object.entries(selectedMaterialSettings()).forEach(([key, value]) => formData.append(key, value));
+
+        const response = await fetch('/analyze-model', {
+            method: 'POST',
+            body: formData
+        });
+        applyModelAnalysis(await response.json());
+
+        // Reset file input
+        event.target.value = '';
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+function applyModelAnalysis(result) {
+    if (!result.success) {
+        showMessage('Model import failed: ' + result.error, 'error');
+        return;
+    }
+
+    document.getElementById('filament_required').value = result.filament_grams;
+    document.getElementById('qb_part_width').value = result.size_mm[0].toFixed(1);
+    document.getElementById('qb_part_depth').value = result.size_mm[1].toFixed(1);
+    const size = result.size_mm.map(x => x.toFixed(1)).join(' × ');
+    showMessage(`Estimated ${result.filament_grams} g (${result.volume_cm3} cm³, ${size} mm, ${result.infill}% infill)`, 'success');
+    calculate();
+}
+
+// Open a configuration: native dialog read in-process on desktop, file picker upload in the browser
+async function openConfig() {
+    if (!isDesktopMode()) {
+        document.getElementById('load-file').click();
+        return;
+    }
+
+    try {
+        const filepath = await window.pywebview.api.open_file_dialog('JSON Files (*.json)');
+        if (!filepath) {
+            return;
+        }
+        applyConfig(await window.pywebview.api.load_config(filepath));
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
 // Load Configuration
 async function loadConfig(event) {
     try {
@@ -465,71 +710,7 @@ async function loadConfig(event) {
             body: formData
         });
         
-        const result = await response.json();
-        
-        if (result.success) {
-            const config = result.config;
-            
-            // Load basic info
-            if (config.part_name) document.getElementById('part_name').value = config.part_name;
-            if (config.revision) document.getElementById('revision').value = config.revision;
-            if (config.prepared_by) document.getElementById('prepared_by').value = config.prepared_by;
-            if (config.material_type) document.getElementById('material_type').value = config.material_type;
-            if (config.filament_cost !== undefined) document.getElementById('filament_cost').value = config.filament_cost;
-            if (config.filament_required !== undefined) document.getElementById('filament_required').value = config.filament_required;
-            if (config.print_time !== undefined) document.getElementById('print_time').value = config.print_time;
-            if (config.labor_time !== undefined) document.getElementById('labor_time').value = config.labor_time;
-            
-            // Load hardware items
-            const hardwareTable = document.getElementById('hardware-table').getElementsByTagName('tbody')[0];
-            hardwareTable.innerHTML = '';
-            if (config.hardware_items) {
-                config.hardware_items.forEach(item => {
-                    addHardwareRow();
-                    const rows = hardwareTable.getElementsByTagName('tr');
-                    const lastRow = rows[rows.length - 1];
-                    lastRow.querySelector('.hw-name').value = item.name || '';
-                    lastRow.querySelector('.hw-quantity').value = item.quantity || 0;
-                    lastRow.querySelector('.hw-cost').value = item.unit_cost || 0;
-                    updateHardwareTotal(lastRow.querySelector('.hw-quantity'));
-                });
-            }
-            
-            // Load packaging items
-            const packagingTable = document.getElementById('packaging-table').getElementsByTagName('tbody')[0];
-            packagingTable.innerHTML = '';
-            if (config.packaging_items) {
-                config.packaging_items.forEach(item => {
-                    addPackagingRow();
-                    const rows = packagingTable.getElementsByTagName('tr');
-                    const lastRow = rows[rows.length - 1];
-                    lastRow.querySelector('.pkg-name').value = item.name || '';
-                    lastRow.querySelector('.pkg-quantity').value = item.quantity || 0;
-                    lastRow.querySelector('.pkg-cost').value = item.unit_cost || 0;
-                    updatePackagingTotal(lastRow.querySelector('.pkg-quantity'));
-                });
-            }
-            
-            if (config.shipping_cost !== undefined) document.getElementById('shipping_cost').value = config.shipping_cost;
-            
-            // Load advanced settings
-            if (config.printer_cost !== undefined) document.getElementById('printer_cost').value = config.printer_cost;
-            if (config.upfront_cost !== undefined) document.getElementById('upfront_cost').value = config.upfront_cost;
-            if (config.annual_maintenance !== undefined) document.getElementById('annual_maintenance').value = config.annual_maintenance;
-            if (config.printer_life !== undefined) document.getElementById('printer_life').value = config.printer_life;
-            if (config.average_uptime !== undefined) document.getElementById('average_uptime').value = config.average_uptime;
-            if (config.power_consumption !== undefined) document.getElementById('power_consumption').value = config.power_consumption;
-            if (config.electricity_rate !== undefined) document.getElementById('electricity_rate').value = config.electricity_rate;
-            if (config.electricity_daily !== undefined) document.getElementById('electricity_daily').value = config.electricity_daily;
-            if (config.efficiency_factor !== undefined) document.getElementById('efficiency_factor').value = config.efficiency_factor;
-            if (config.labor_rate !== undefined) document.getElementById('labor_rate').value = config.labor_rate;
-            if (config.custom_margin !== undefined) document.getElementById('custom_margin').value = config.custom_margin;
-            
-            showMessage('Configuration loaded!', 'success');
-            calculate();
-        } else {
-            showMessage('Load failed: ' + result.error, 'error');
-        }
+        applyConfig(await response.json());
         
         // Reset file input
         event.target.value = '';
@@ -538,6 +719,72 @@ async function loadConfig(event) {
     }
 }
 
+function applyConfig(result) {
+    if (result.success) {
+        const config = result.config;
+        
+        // Load basic info
+        if (config.part_name) document.getElementById('part_name').value = config.part_name;
+        if (config.revision) document.getElementById('revision').value = config.revision;
+        if (config.prepared_by) document.getElementById('prepared_by').value = config.prepared_by;
+        if (config.material_type) document.getElementById('material_type').value = config.material_type;
+        if (config.filament_cost !== undefined) document.getElementById('filament_cost').value = config.filament_cost;
+        if (config.filament_required !== undefined) document.getElementById('filament_required').value = config.filament_required;
+        if (config.print_time !== undefined) document.getElementById('print_time').value = config.print_time;
+        if (config.labor_time !== undefined) document.getElementById('labor_time').value = config.labor_time;
+        
+        // Load hardware items
+        const hardwareTable = document.getElementById('hardware-table').getElementsByTagName('tbody')[0];
+        hardwareTable.innerHTML = '';
+        if (config.hardware_items) {
+            config.hardware_items.forEach(item => {
+                addHardwareRow();
+                const rows = hardwareTable.getElementsByTagName('tr');
+                const lastRow = rows[rows.length - 1];
+                lastRow.querySelector('.hw-name').value = item.name || '';
+                lastRow.querySelector('.hw-quantity').value = item.quantity || 0;
+                lastRow.querySelector('.hw-cost').value = item.unit_cost || 0;
+                updateHardwareTotal(lastRow.querySelector('.hw-quantity'));
+            });
+        }
+        
+        // Load packaging items
+        const packagingTable = document.getElementById('packaging-table').getElementsByTagName('tbody')[0];
+        packagingTable.innerHTML = '';
+        if (config.packaging_items) {
+            config.packaging_items.forEach(item => {
+                addPackagingRow();
+                const rows = packagingTable.getElementsByTagName('tr');
+                const lastRow = rows[rows.length - 1];
+                lastRow.querySelector('.pkg-name').value = item.name || '';
+                lastRow.querySelector('.pkg-quantity').value = item.quantity || 0;
+                lastRow.querySelector('.pkg-cost').value = item.unit_cost || 0;
+                updatePackagingTotal(lastRow.querySelector('.pkg-quantity'));
+            });
+        }
+        
+        if (config.shipping_cost !== undefined) document.getElementById('shipping_cost').value = config.shipping_cost;
+        
+        // Load advanced settings
+        if (config.printer_cost !== undefined) document.getElementById('printer_cost').value = config.printer_cost;
+        if (config.upfront_cost !== undefined) document.getElementById('upfront_cost').value = config.upfront_cost;
+        if (config.annual_maintenance !== undefined) document.getElementById('annual_maintenance').value = config.annual_maintenance;
+        if (config.printer_life !== undefined) document.getElementById('printer_life').value = config.printer_life;
+        if (config.average_uptime !== undefined) document.getElementById('average_uptime').value = config.average_uptime;
+        if (config.power_consumption !== undefined) document.getElementById('power_consumption').value = config.power_consumption;
+        if (config.electricity_rate !== undefined) document.getElementById('electricity_rate').value = config.electricity_rate;
+        if (config.electricity_daily !== undefined) document.getElementById('electricity_daily').value = config.electricity_daily;
+        if (config.efficiency_factor !== undefined) document.getElementById('efficiency_factor').value = config.efficiency_factor;
+        if (config.labor_rate !== undefined) document.getElementById('labor_rate').value = config.labor_rate;
+        if (config.custom_margin !== undefined) document.getElementById('custom_margin').value = config.custom_margin;
+        
+        showMessage('Configuration loaded!', 'success');
+        calculate();
+    } else {
+        showMessage('Load failed: ' + result.error, 'error');
+    }
+}
+
 // Export to Excel
 async function exportToExcel() {
     try {
@@ -573,46 +820,11 @@ async function exportToExcel() {
                 return;
             }
 
-            const response = await fetch('/export-excel', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(data)
-            });
-
-            if (response.ok) {
-                const blob = await response.blob();
-                const arrayBuffer = await blob.arrayBuffer();
-                const bytes = new Uint8Array(arrayBuffer);
-
-                // Convert to base64 for transmission
-                let binary = '';
-                for (let i = 0; i < bytes.length; i++) {
-                    binary += String.fromCharCode(bytes[i]);
-                }
-                const base64 = btoa(binary);
-
-                const saveResponse = await fetch('/save-file-to-path', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        filepath: filepath,
-                        content: base64,
-                        content_type: 'excel'
-                    })
-                });
-
-                const result = await saveResponse.json();
-                if (result.success) {
-                    showMessage('Excel file exported!', 'success');
-                } else {
-                    showMessage('Export failed: ' + result.error, 'error');
-                }
+            // The report is built and written to the chosen path in-process
+            const result = await window.pywebview.api.export_excel(data, filepath);
+            if (result.success) {
+                showMessage('Excel file exported!', 'success');
             } else {
-                const result = await response.json();
                 showMessage('Export failed: ' + result.error, 'error');
             }
         } else {
@@ -718,6 +930,9 @@ document.addEventListener('DOMContentLoaded', () => {
     loadTemplates(); // Load quote templates
     loadBackupSettings(); // Load backup settings and backup history
     addBatchRow(); // Initialize batch with one row
+    loadFarmFleet(); // Load printer fleet for farm scheduling
+    loadPlateSettings(); // Load bed size for quantity breaks
+    loadRegisteredPrinters(); // Load server-side printer registry
 
     // Setup sidebar theme toggle
     const sidebarThemeToggle = document.getElementById('sidebarThemeToggle');
@@ -1000,6 +1215,9 @@ function openMaterialPresetModal(presetId = null) {
             document.getElementById('preset_material').value = preset.material;
             document.getElementById('preset_cost').value = preset.cost;
             document.getElementById('preset_supplier').value = preset.supplier || '';
+            document.getElementById('preset_density').value = preset.density || '';
+            document.getElementById('preset_infill').value = preset.infill ?? '';
+            document.getElementById('preset_walls').value = preset.wall_count || '';
         }
     } else {
         document.getElementById('material-preset-title').textContent = 'Add Material Preset';
@@ -1007,6 +1225,9 @@ function openMaterialPresetModal(presetId = null) {
         document.getElementById('preset_material').value = '';
         document.getElementById('preset_cost').value = '';
         document.getElementById('preset_supplier').value = '';
+        document.getElementById('preset_density').value = '';
+        document.getElementById('preset_infill').value = '';
+        document.getElementById('preset_walls').value = '';
     }
 
     // Close preset manager if open
@@ -1027,6 +1248,10 @@ function saveMaterialPreset() {
     const material = document.getElementById('preset_material').value.trim();
     const cost = parseFloat(document.getElementById('preset_cost').value);
     const supplier = document.getElementById('preset_supplier').value.trim() || 'Custom';
+    const density = parseFloat(document.getElementById('preset_density').value) || null;
+    const infillValue = parseFloat(document.getElementById('preset_infill').value);
+    const infill = isNaN(infillValue) ? null : infillValue;
+    const wall_count = parseInt(document.getElementById('preset_walls').value) || null;
 
     if (!name || !material || !cost || cost <= 0) {
         showMessage('Please fill in all required fields with valid values', 'error');
@@ -1041,6 +1266,9 @@ function saveMaterialPreset() {
             preset.material = material;
             preset.cost = cost;
             preset.supplier = supplier;
+            preset.density = density;
+            preset.infill = infill;
+            preset.wall_count = wall_count;
             showMessage(`Preset "${name}" updated successfully`, 'success');
         }
     } else {
@@ -1050,7 +1278,10 @@ function saveMaterialPreset() {
             name,
             material,
             cost,
-            supplier
+            supplier,
+            density,
+            infill,
+            wall_count
         };
         customMaterialPresets.push(preset);
         showMessage(`Preset "${name}" saved successfully`, 'success');
@@ -1225,8 +1456,8 @@ function clearBatchQuotes() {
     }
 }
 
-// Calculate all batch quotes
-function calculateBatchQuotes() {
+// Calculate all batch quotes (priced server-side in one request)
+async function calculateBatchQuotes() {
     const rows = document.querySelectorAll('#batch-tbody tr');
     if (rows.length === 0) {
         showMessage('No parts in batch. Click "Add Part" to get started.', 'error');
@@ -1235,6 +1466,7 @@ function calculateBatchQuotes() {
 
     batchQuotes = [];
     let hasErrors = false;
+    const parts = [];
 
     rows.forEach(row => {
         const rowId = row.dataset.rowId;
@@ -1252,23 +1484,56 @@ function calculateBatchQuotes() {
             return;
         }
 
-        // Calculate using current settings
-        const cost = calculateBatchPartCost(weight, printTime, quantity);
+        parts.push({ rowId, partName, material, weight, printTime, quantity });
+    });
 
-        batchQuotes.push({
-            rowId,
-            partName,
-            material,
-            weight,
-            printTime,
-            quantity,
-            unitCost: cost / quantity,
-            totalCost: cost
-        });
+    if (parts.length > 0) {
+        try {
+            // Price every valid row against the current settings in a single request
+            const response = await fetch('/calculate-batch', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    ...collectFormData(),
+                    jobs: parts.map(part => ({
+                        filament_required: part.weight,
+                        print_time: part.printTime,
+                        quantity: part.quantity
+                    }))
+                })
+            });
 
-        document.getElementById(`batch-cost-${rowId}`).textContent = `NZD $${cost.toFixed(2)}`;
-        document.getElementById(`batch-cost-${rowId}`).style.color = 'var(--text-primary)';
-    });
+            const result = await response.json();
+            if (!result.success) {
+                showMessage('Batch calculation failed: ' + result.error, 'error');
+                return;
+            }
+
+            parts.forEach((part, index) => {
+                const cost = result.results.line_total[index];
+
+                batchQuotes.push({
+                    ...part,
+                    unitCost: result.results.total_cost[index],
+                    totalCost: cost,
+                    breakdown: {
+                        material: result.results.material_cost[index],
+                        labor: result.results.labor_cost[index],
+                        machine: result.results.machine_cost_total[index],
+                        packaging: result.results.packaging_cost[index]
+                    }
+                });
+
+                document.getElementById(`batch-cost-${part.rowId}`).textContent = `NZD $${cost.toFixed(2)}`;
+                document.getElementById(`batch-cost-${part.rowId}`).style.color = 'var(--text-primary)';
+            });
+        } catch (error) {
+            showMessage('Error: ' + error.message, 'error');
+            return;
+        }
+    }
 
     if (hasErrors) {
         showMessage('Some rows have invalid data. Please check weight and print time values.', 'error');
@@ -1279,44 +1544,6 @@ function calculateBatchQuotes() {
     updateBatchTotals();
 }
 
-// Calculate cost for a single batch part
-function calculateBatchPartCost(weight, printTime, quantity) {
-    // Get current form values for calculation
-    const filamentCost = parseFloat(document.getElementById('filament_cost').value) || 40;
-    const laborRate = parseFloat(document.getElementById('labor_rate').value) || 20;
-    const printerCost = parseFloat(document.getElementById('printer_cost').value) || 1000;
-    const upfrontCost = parseFloat(document.getElementById('upfront_cost').value) || 0;
-    const annualMaintenance = parseFloat(document.getElementById('annual_maintenance').value) || 75;
-    const printerLife = parseFloat(document.getElementById('printer_life').value) || 3;
-    const avgUptime = parseFloat(document.getElementById('average_uptime').value) || 50;
-    const powerConsumption = parseFloat(document.getElementById('power_consumption').value) || 250;
-    const electricityRate = parseFloat(document.getElementById('electricity_rate').value) || 0.30;
-    const packagingCost = parseFloat(document.getElementById('packaging_cost').value) || 0;
-
-    // Material cost
-    const materialCost = (weight / 1000) * filamentCost;
-
-    // Labor cost
-    const laborCost = printTime * laborRate;
-
-    // Machine cost
-    const totalMachineCost = printerCost + upfrontCost;
-    const totalLifetimeHours = (printerLife * 365 * 24 * (avgUptime / 100));
-    const depreciationPerHour = totalMachineCost / totalLifetimeHours;
-    const maintenancePerHour = annualMaintenance / (365 * 24 * (avgUptime / 100));
-    const costPerHour = depreciationPerHour + maintenancePerHour;
-    const machineCost = printTime * costPerHour;
-
-    // Electricity cost
-    const electricityCost = ((powerConsumption / 1000) * printTime) * electricityRate;
-
-    // Total cost per unit
-    const unitCost = materialCost + laborCost + machineCost + electricityCost + packagingCost;
-
-    // Total cost for quantity
-    return unitCost * quantity;
-}
-
 // Update batch totals
 function updateBatchTotals() {
     let totalQty = 0;
@@ -1332,14 +1559,27 @@ function updateBatchTotals() {
 }
 
 // Export batch to Excel
-function exportBatchToExcel() {
+async function exportBatchToExcel() {
     if (batchQuotes.length === 0) {
         showMessage('No calculated quotes to export. Calculate batch first.', 'error');
         return;
     }
 
-    // TODO: Implement Excel export for batch quotes
-    showMessage('Batch Excel export coming soon!', 'info');
+    await exportQuoteWorkbook({
+        title: 'Batch Quote',
+        custom_margin: parseFloat(document.getElementById('custom_margin').value) || 75,
+        quotes: batchQuotes.map(quote => ({
+            part_name: quote.partName,
+            material: quote.material,
+            weight: quote.weight,
+            print_time: quote.printTime,
+            quantity: quote.quantity,
+            material_cost: quote.breakdown.material,
+            labor_cost: quote.breakdown.labor,
+            machine_cost: quote.breakdown.machine,
+            packaging_cost: quote.breakdown.packaging
+        }))
+    }, `printforge_batch_${new Date().toISOString().split('T')[0]}.xlsx`);
 }
 
 // Export batch to PDF
@@ -1355,6 +1595,455 @@ function exportBatchToPDF() {
 
 // (Batch initialization moved to main DOMContentLoaded listener)
 
+// ============================================================================
+// PRINT FARM SCHEDULE
+// ============================================================================
+
+let farmFleet = [];
+
+function loadFarmFleet() {
+    const saved = localStorage.getItem('printforge_farm_fleet');
+    if (saved) {
+        try {
+            farmFleet = JSON.parse(saved);
+        } catch (e) {
+            console.error('Failed to load printer fleet:', e);
+            farmFleet = [];
+        }
+    }
+    if (farmFleet.length === 0) {
+        farmFleet = [{ name: 'Printer', profileId: '', count: 1, speed: 1, hoursPerDay: 24, materials: '' }];
+    }
+    renderFarmFleet();
+}
+
+function saveFarmFleet() {
+    localStorage.setItem('printforge_farm_fleet', JSON.stringify(farmFleet));
+}
+
+function renderFarmFleet() {
+    const tbody = document.getElementById('farm-tbody');
+    if (!tbody) return;
+    tbody.innerHTML = '';
+
+    farmFleet.forEach((printer, index) => {
+        const row = document.createElement('tr');
+        row.innerHTML = `
+            <td><input type="text" class="batch-input" data-field="name"></td>
+            <td><select class="batch-input" data-field="profileId"><option value="">Current settings</option></select></td>
+            <td><input type="number" class="batch-input" data-field="count" min="1" step="1"></td>
+            <td><input type="number" class="batch-input" data-field="speed" min="0.1" step="0.1"></td>
+            <td><input type="number" class="batch-input" data-field="hoursPerDay" min="1" max="24" step="1"></td>
+            <td><input type="text" class="batch-input" data-field="materials" placeholder="PLA, PETG"></td>
+            <td class="batch-actions">
+                <button class="btn-icon btn-delete" onclick="removeFarmPrinter(${index})" title="Remove">
+                    <svg viewBox="0 0 24 24" width="16" height="16" fill="none" stroke="currentColor" stroke-width="2">
+                        <polyline points="3 6 5 6 21 6"/>
+                        <path d="M19 6v14a2 2 0 0 1-2 2H7a2 2 0 0 1-2-2V6m3 0V4a2 2 0 0 1 2-2h4a2 2 0 0 1 2 2v2"/>
+                    </svg>
+                </button>
+            </td>
+        `;
+
+        const profileSelect = row.querySelector('[data-field="profileId"]');
+        printProfiles.forEach(profile => profileSelect.add(new Option(profile.name, profile.id)));
+        registeredPrinters.forEach(registered =>
+            profileSelect.add(new Option(`${registered.name} (registered)`, `printer:${registered.id}`))
+        );
+
+        row.querySelectorAll('[data-field]').forEach(input => {
+            input.value = printer[input.dataset.field] ?? '';
+            input.addEventListener('change', () => {
+                const numeric = input.type === 'number';
+                printer[input.dataset.field] = numeric ? parseFloat(input.value) || 0 : input.value;
+                saveFarmFleet();
+            });
+        });
+
+        tbody.appendChild(row);
+    });
+}
+
+function addFarmPrinter() {
+    farmFleet.push({ name: `Printer ${farmFleet.length + 1}`, profileId: '', count: 1, speed: 1, hoursPerDay: 24, materials: '' });
+    saveFarmFleet();
+    renderFarmFleet();
+}
+
+function removeFarmPrinter(index) {
+    farmFleet.splice(index, 1);
+    saveFarmFleet();
+    renderFarmFleet();
+}
+
+// Schedule the batch rows across the fleet: lead time, per-printer utilization and machine cost
+async function scheduleBatchOnFarm() {
+    const jobs = [];
+    document.querySelectorAll('#batch-tbody tr').forEach(row => {
+        const rowId = row.dataset.rowId;
+        const printTime = parseFloat(document.getElementById(`batch-time-${rowId}`).value) || 0;
+        if (printTime > 0) {
+            jobs.push({
+                print_time: printTime,
+                quantity: parseInt(document.getElementById(`batch-qty-${rowId}`).value) || 1,
+                material: document.getElementById(`batch-material-${rowId}`).value
+            });
+        }
+    });
+
+    if (jobs.length === 0) {
+        showMessage('Add parts with a print time to the batch first', 'error');
+        return;
+    }
+    if (farmFleet.length === 0) {
+        showMessage('Add at least one printer to the fleet', 'error');
+        return;
+    }
+
+    const printers = farmFleet.map(printer => {
+        const profile = printProfiles.find(p => p.id === printer.profileId);
+        const registeredId = (printer.profileId || '').startsWith('printer:') ? printer.profileId.slice(8) : null;
+        return {
+            ...(profile ? profile.settings : {}),
+            ...(registeredId ? { printer_id: registeredId } : {}),
+            name: printer.name,
+            count: printer.count || 1,
+            speed: printer.speed || 1,
+            hours_per_day: printer.hoursPerDay || 24,
+            materials: (printer.materials || '').split(',').map(m => m.trim()).filter(Boolean)
+        };
+    });
+
+    try {
+        const response = await fetch('/schedule', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                ...collectFormData(),
+                printers,
+                jobs,
+                changeover_hours: (parseFloat(document.getElementById('farm_changeover').value) || 0) / 60
+            })
+        });
+
+        const result = await response.json();
+        if (!result.success) {
+            showMessage('Scheduling failed: ' + result.error, 'error');
+            return;
+        }
+
+        const ready = new Date(Date.now() + result.makespan_hours * 3600 * 1000);
+        document.getElementById('farm-summary').textContent =
+            `${result.tasks} prints on ${result.printers_used} printers - lead time ${result.lead_time_days} days ` +
+            `(${result.makespan_hours} h, ready ${ready.toLocaleString()}) - ` +
+            `machine cost NZD $${result.machine_cost.toFixed(2)} for ${result.machine_hours} machine hours`;
+
+        const tbody = document.getElementById('farm-results-tbody');
+        tbody.innerHTML = '';
+        result.printers.forEach(printer => {
+            const row = tbody.insertRow();
+            [
+                printer.name,
+                printer.jobs,
+                printer.running_hours.toFixed(1),
+                printer.finish_hours.toFixed(1),
+                `${printer.utilization_percent}%`,
+                `NZD $${printer.machine_cost.toFixed(2)}`
+            ].forEach(value => {
+                row.insertCell().textContent = value;
+            });
+        });
+
+        document.getElementById('farm-results').style.display = 'block';
+        showMessage(`Scheduled ${result.tasks} prints - lead time ${result.lead_time_days} days`, 'success');
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+// ============================================================================
+// QUANTITY BREAKS
+// ============================================================================
+
+const PLATE_SETTING_FIELDS = ['qb_bed_width', 'qb_bed_depth', 'qb_spacing', 'qb_part_labor'];
+
+function loadPlateSettings() {
+    const saved = localStorage.getItem('printforge_plate_settings');
+    if (!saved) return;
+    try {
+        const settings = JSON.parse(saved);
+        PLATE_SETTING_FIELDS.forEach(id => {
+            if (settings[id] !== undefined) {
+                document.getElementById(id).value = settings[id];
+            }
+        });
+    } catch (e) {
+        console.error('Failed to load plate settings:', e);
+    }
+}
+
+function savePlateSettings() {
+    const settings = {};
+    PLATE_SETTING_FIELDS.forEach(id => {
+        settings[id] = document.getElementById(id).value;
+    });
+    localStorage.setItem('printforge_plate_settings', JSON.stringify(settings));
+}
+
+// Nest the part on the bed and price 1, 10, 50, 100 and 500 units in one request
+async function buildQuantityBreaks() {
+    const partWidth = parseFloat(document.getElementById('qb_part_width').value) || 0;
+    const partDepth = parseFloat(document.getElementById('qb_part_depth').value) || 0;
+    if (partWidth <= 0 || partDepth <= 0) {
+        showMessage('Enter the part footprint (or import a model) to nest it on the plate', 'error');
+        return;
+    }
+
+    try {
+        const response = await fetch('/quantity-breaks', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                ...pricingPayload(collectFormData()),
+                part_width: partWidth,
+                part_depth: partDepth,
+                bed_width: parseFloat(document.getElementById('qb_bed_width').value) || 0,
+                bed_depth: parseFloat(document.getElementById('qb_bed_depth').value) || 0,
+                spacing: parseFloat(document.getElementById('qb_spacing').value) || 0,
+                part_labor_time: parseFloat(document.getElementById('qb_part_labor').value) || 0
+            })
+        });
+
+        const result = await response.json();
+        if (!result.success) {
+            showMessage('Price sheet failed: ' + result.error, 'error');
+            return;
+        }
+
+        document.getElementById('qb-summary').textContent =
+            `${result.parts_per_plate} parts per plate (${result.nesting.utilization_percent}% of the bed)`;
+
+        const tbody = document.getElementById('qb-tbody');
+        tbody.innerHTML = '';
+        result.breaks.forEach(row => {
+            const cells = tbody.insertRow();
+            [
+                row.quantity,
+                row.plates,
+                `NZD $${row.total_cost.toFixed(2)}`,
+                `NZD $${row.price_custom.toFixed(2)}`,
+                `NZD $${row.order_price_custom.toFixed(2)}`,
+                row.saving_percent > 0 ? `${row.saving_percent}%` : '-'
+            ].forEach(value => {
+                cells.insertCell().textContent = value;
+            });
+        });
+
+        document.getElementById('qb-results').style.display = 'block';
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+// ============================================================================
+// RISK BANDS
+// ============================================================================
+
+const RISK_FIELDS = ['failure_rate', 'material_volatility', 'time_overrun', 'time_spread', 'uptime_spread', 'target_probability'];
+let riskBandsShown = false;
+let lastRiskPayload = null;
+
+// Simulate the landed cost; results are cached server-side per input hash, so re-runs are cheap
+async function runRiskQuote() {
+    const payload = pricingPayload(collectFormData());
+    RISK_FIELDS.forEach(field => {
+        payload[field] = parseFloat(document.getElementById(`risk_${field}`).value) || 0;
+    });
+
+    const body = JSON.stringify(payload);
+    if (body === lastRiskPayload) return;
+    lastRiskPayload = body;
+
+    try {
+        const response = await fetch('/risk-quote', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body
+        });
+
+        const result = await response.json();
+        if (!result.success) {
+            lastRiskPayload = null;
+            showMessage('Risk simulation failed: ' + result.error, 'error');
+            return;
+        }
+
+        document.getElementById('risk_p50').textContent = `$${result.p50.toFixed(2)}`;
+        document.getElementById('risk_p90').textContent = `$${result.p90.toFixed(2)}`;
+        document.getElementById('risk_p99').textContent = `$${result.p99.toFixed(2)}`;
+        document.getElementById('risk_required_margin').textContent = `${result.required_margin}%`;
+        document.getElementById('risk-summary').textContent =
+            `Quoted cost $${result.expected_cost.toFixed(2)}, simulated mean $${result.mean_cost.toFixed(2)} ` +
+            `over ${result.trials.toLocaleString()} runs. A ${result.required_margin}% margin ($${result.required_price.toFixed(2)}) ` +
+            `covers the cost in ${result.target_probability}% of runs; your ${result.custom_margin}% margin ` +
+            `($${result.price_custom.toFixed(2)}) is profitable in ${result.profit_probability}%.`;
+
+        document.getElementById('risk-results').style.display = 'block';
+        riskBandsShown = true;
+    } catch (error) {
+        lastRiskPayload = null;
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+// ============================================================================
+// PRINTER REGISTRY
+// ============================================================================
+
+const PRINTER_SETTING_KEYS = [
+    'printer_cost', 'upfront_cost', 'annual_maintenance', 'printer_life',
+    'average_uptime', 'power_consumption', 'electricity_rate', 'electricity_daily'
+];
+
+let registeredPrinters = [];
+let activePrinterId = localStorage.getItem('printforge_active_printer') || '';
+
+async function loadRegisteredPrinters() {
+    try {
+        const response = await fetch('/printers');
+        const result = await response.json();
+        if (result.success) {
+            registeredPrinters = result.printers;
+        }
+    } catch (e) {
+        console.error('Failed to load registered printers:', e);
+    }
+    renderRegisteredPrinters();
+    renderFarmFleet();
+}
+
+// The selected registered printer, as long as the Advanced Settings still match it
+function activeRegisteredPrinter() {
+    const printer = registeredPrinters.find(p => String(p.id) === activePrinterId);
+    if (!printer) return null;
+    const matches = PRINTER_SETTING_KEYS.every(key =>
+        Math.abs((parseFloat(document.getElementById(key).value) || 0) - printer[key]) < 1e-9
+    );
+    return matches ? printer : null;
+}
+
+// Name the registered printer instead of sending its machine settings with every quote
+function pricingPayload(data) {
+    const printer = activeRegisteredPrinter();
+    if (!printer) return data;
+    const payload = { ...data, printer_id: printer.id };
+    PRINTER_SETTING_KEYS.forEach(key => delete payload[key]);
+    return payload;
+}
+
+function renderRegisteredPrinters() {
+    const list = document.getElementById('registered-printer-list');
+    if (!list) return;
+    list.innerHTML = '';
+
+    if (registeredPrinters.length === 0) {
+        list.innerHTML = '<p>No printers registered yet.</p>';
+        return;
+    }
+
+    const active = activeRegisteredPrinter();
+    registeredPrinters.forEach(printer => {
+        const card = document.createElement('div');
+        card.className = 'profile-card';
+        card.innerHTML = `
+            <div class="profile-info">
+                <h3></h3>
+                <p>$${printer.cost_per_hour.toFixed(4)}/h machine, $${printer.electricity_per_hour.toFixed(4)}/h electricity</p>
+            </div>
+            <div class="profile-card-actions">
+                <button class="btn btn-sm btn-primary" onclick="useRegisteredPrinter(${printer.id})">Use</button>
+                <button class="btn btn-sm btn-secondary" onclick="deleteRegisteredPrinter(${printer.id})">Delete</button>
+            </div>
+        `;
+        card.querySelector('h3').textContent = printer.name;
+        if (active && active.id === printer.id) {
+            card.querySelector('h3').insertAdjacentHTML('beforeend', ' <span class="badge">In Use</span>');
+        }
+        list.appendChild(card);
+    });
+}
+
+async function registerCurrentPrinter() {
+    const name = prompt('Enter printer name:');
+    if (!name) return;
+
+    const printer = { name };
+    PRINTER_SETTING_KEYS.forEach(key => {
+        printer[key] = parseFloat(document.getElementById(key).value) || 0;
+    });
+
+    try {
+        const response = await fetch('/printers', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(printer)
+        });
+        const result = await response.json();
+        if (!result.success) {
+            showMessage('Failed to register printer: ' + result.error, 'error');
+            return;
+        }
+
+        activePrinterId = String(result.printer.id);
+        localStorage.setItem('printforge_active_printer', activePrinterId);
+        await loadRegisteredPrinters();
+        showMessage(`Printer "${name}" registered`, 'success');
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+function useRegisteredPrinter(printerId) {
+    const printer = registeredPrinters.find(p => p.id === printerId);
+    if (!printer) return;
+
+    PRINTER_SETTING_KEYS.forEach(key => {
+        document.getElementById(key).value = printer[key];
+    });
+    activePrinterId = String(printer.id);
+    localStorage.setItem('printforge_active_printer', activePrinterId);
+
+    closeProfileManager();
+    showMessage(`Printer "${printer.name}" in use`, 'success');
+    calculate();
+}
+
+async function deleteRegisteredPrinter(printerId) {
+    const printer = registeredPrinters.find(p => p.id === printerId);
+    if (!printer || !confirm(`Delete printer "${printer.name}"?`)) return;
+
+    try {
+        const response = await fetch(`/printers/${printerId}`, { method: 'DELETE' });
+        const result = await response.json();
+        if (!result.success) {
+            showMessage('Failed to delete printer: ' + result.error, 'error');
+            return;
+        }
+        await loadRegisteredPrinters();
+        showMessage(`Printer "${printer.name}" deleted`, 'info');
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
 // ============================================================================
 // PRINT PROFILE TEMPLATES
 // ============================================================================
@@ -1444,6 +2133,7 @@ function openProfileManager() {
     }
 
     populateProfileList();
+    renderRegisteredPrinters();
     document.getElementById('profile-modal').style.display = 'flex';
 }
 
@@ -1479,6 +2169,17 @@ function createProfileModal() {
                         </button>
                         <input type="file" id="import-profiles-file" accept=".json" style="display: none;" onchange="importProfiles(event)">
                     </div>
+
+                    <h3 style="margin-top: 24px;">Registered Printers</h3>
+                    <p>Saved on the server with their hourly rates worked out once; quotes name the printer instead of resending its settings.</p>
+                    <div class="profile-list" id="registered-printer-list">
+                        <!-- Registered printers will be populated here -->
+                    </div>
+                    <div class="profile-actions">
+                        <button class="btn btn-primary" onclick="registerCurrentPrinter()">
+                            🖨️ Register Current Printer
+                        </button>
+                    </div>
                 </div>
             </div>
         </div>
@@ -1661,7 +2362,7 @@ document.addEventListener('keydown', (e) => {
     // Ctrl+L: Load Config
     if (e.ctrlKey && e.key === 'l') {
         e.preventDefault();
-        document.getElementById('load-file').click();
+        openConfig();
     }
 
     // Ctrl+R: Recalculate (override browser refresh)
@@ -1676,30 +2377,42 @@ document.addEventListener('keydown', (e) => {
 // Cost History & Analytics
 // ============================================================
 
-let quoteHistory = [];
+let quoteHistory = [];   // Current page of history, fetched from the server
+let historyStats = null;
+let historySeries = [];
 let historyChart = null;
 
-// Load history from localStorage
-function loadHistory() {
+// Load history from the server, importing any quotes left in localStorage first
+async function loadHistory() {
     const saved = localStorage.getItem('printforge_history');
     if (saved) {
-        quoteHistory = JSON.parse(saved);
-        updateHistoryDisplay();
+        try {
+            const response = await fetch('/history/import', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ entries: JSON.parse(saved) })
+            });
+            const result = await response.json();
+            if (result.success) {
+                localStorage.removeItem('printforge_history');
+            }
+        } catch (error) {
+            console.error('History import failed:', error);
+        }
     }
-}
 
-// Save history to localStorage
-function saveHistory() {
-    localStorage.setItem('printforge_history', JSON.stringify(quoteHistory));
+    updateHistoryDisplay();
 }
 
 // Add quote to history (called from calculate function)
-function addToHistory(quoteData) {
+async function addToHistory(quoteData) {
     const historyEntry = {
-        id: Date.now(),
         timestamp: new Date().toISOString(),
         partName: quoteData.partName || 'Unnamed Part',
         material: quoteData.material || 'PLA',
+        client: quoteData.client || '',
         weight: parseFloat(quoteData.weight) || 0,
         printTime: parseFloat(quoteData.printTime) || 0,
         totalCost: parseFloat(quoteData.totalCost) || 0,
@@ -1713,19 +2426,45 @@ function addToHistory(quoteData) {
         }
     };
 
-    quoteHistory.unshift(historyEntry); // Add to beginning
-
-    // Keep only last 100 quotes
-    if (quoteHistory.length > 100) {
-        quoteHistory = quoteHistory.slice(0, 100);
+    try {
+        await fetch('/history', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(historyEntry)
+        });
+        updateHistoryDisplay();
+    } catch (error) {
+        console.error('Failed to save quote to history:', error);
     }
-
-    saveHistory();
-    updateHistoryDisplay();
 }
 
 // Update history display (table and stats)
-function updateHistoryDisplay() {
+async function updateHistoryDisplay() {
+    const favoriteFilter = document.getElementById('history_favorite_filter')?.value || 'all';
+    const params = new URLSearchParams({ page: 1, per_page: 20 });
+    if (favoriteFilter === 'favorites') {
+        params.set('starred', '1');
+    }
+
+    try {
+        const [pageResponse, statsResponse] = await Promise.all([
+            fetch(`/history?${params}`),
+            fetch('/history/stats?limit=0')
+        ]);
+        const pageResult = await pageResponse.json();
+        const statsResult = await statsResponse.json();
+        if (pageResult.success) {
+            quoteHistory = pageResult.entries;
+        }
+        if (statsResult.success) {
+            historyStats = statsResult.stats;
+        }
+    } catch (error) {
+        console.error('Failed to load history:', error);
+    }
+
     updateHistoryTable();
     updateHistoryStats();
     updateHistoryChart();
@@ -1733,21 +2472,17 @@ function updateHistoryDisplay() {
 
 // Update history table
 function updateHistoryTable() {
-    const favoriteFilter = document.getElementById('history_favorite_filter')?.value || 'all';
     const tbody = document.getElementById('history-tbody');
 
-    // Filter data based on favorites
-    let displayData = quoteHistory;
-    if (favoriteFilter === 'favorites') {
-        displayData = quoteHistory.filter(q => q.starred);
-    }
+    // quoteHistory already holds the filtered page from the server
+    const displayData = quoteHistory;
 
     if (displayData.length === 0) {
         tbody.innerHTML = '<tr><td colspan="8" class="empty-state">No quotes found</td></tr>';
         return;
     }
 
-    tbody.innerHTML = displayData.slice(0, 20).map(entry => {
+    tbody.innerHTML = displayData.map(entry => {
         const date = new Date(entry.timestamp);
         const formattedDate = date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
         const starIcon = entry.starred ? '★' : '☆';
@@ -1781,66 +2516,76 @@ function updateHistoryTable() {
     }).join('');
 }
 
-// Update statistics
+// Update statistics (aggregates computed server-side)
 function updateHistoryStats() {
-    const totalQuotes = quoteHistory.length;
-    const starredCount = quoteHistory.filter(q => q.starred).length;
-    const costs = quoteHistory.map(q => q.totalCost);
-    const avgCost = costs.length > 0 ? costs.reduce((a, b) => a + b, 0) / costs.length : 0;
-    const maxCost = costs.length > 0 ? Math.max(...costs) : 0;
-    const minCost = costs.length > 0 ? Math.min(...costs) : 0;
+    const stats = historyStats || { count: 0, starred: 0, avg_cost: 0, max_cost: 0, min_cost: 0 };
 
-    document.getElementById('stat_total_quotes').textContent = `${totalQuotes} (${starredCount} starred)`;
-    document.getElementById('stat_avg_cost').textContent = `NZD $${avgCost.toFixed(2)}`;
-    document.getElementById('stat_max_cost').textContent = `NZD $${maxCost.toFixed(2)}`;
-    document.getElementById('stat_min_cost').textContent = `NZD $${minCost.toFixed(2)}`;
+    document.getElementById('stat_total_quotes').textContent = `${stats.count} (${stats.starred} starred)`;
+    document.getElementById('stat_avg_cost').textContent = `NZD $${stats.avg_cost.toFixed(2)}`;
+    document.getElementById('stat_max_cost').textContent = `NZD $${stats.max_cost.toFixed(2)}`;
+    document.getElementById('stat_min_cost').textContent = `NZD $${stats.min_cost.toFixed(2)}`;
 }
 
 // Toggle star status
-function toggleStarQuote(entryId) {
+async function toggleStarQuote(entryId) {
     const entry = quoteHistory.find(q => q.id === entryId);
     if (!entry) return;
 
-    entry.starred = !entry.starred;
-    saveHistory();
+    const starred = !entry.starred;
+    const response = await fetch(`/history/${entryId}/star`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ starred })
+    });
+    const result = await response.json();
+    if (!result.success) {
+        showMessage('Failed to update quote: ' + result.error, 'error');
+        return;
+    }
+
     updateHistoryDisplay();
 
-    const message = entry.starred ? 'Added to favorites' : 'Removed from favorites';
+    const message = starred ? 'Added to favorites' : 'Removed from favorites';
     showMessage(message, 'success');
 }
 
-// Update chart
-function updateHistoryChart() {
+// Update chart from the server-side cost series
+async function updateHistoryChart() {
     const canvas = document.getElementById('history_chart');
     const ctx = canvas.getContext('2d');
 
     // Get filter values
-    const dateFilter = parseInt(document.getElementById('history_date_filter')?.value || 'all');
+    const dateFilter = document.getElementById('history_date_filter')?.value || 'all';
     const materialFilter = document.getElementById('history_material_filter')?.value || 'all';
     const chartType = document.getElementById('history_chart_type')?.value || 'line';
 
-    // Filter data
-    let filteredData = quoteHistory;
-
-    // Filter by date
+    const params = new URLSearchParams();
     if (dateFilter !== 'all') {
-        const cutoffDate = new Date();
-        cutoffDate.setDate(cutoffDate.getDate() - dateFilter);
-        filteredData = filteredData.filter(q => new Date(q.timestamp) >= cutoffDate);
+        params.set('days', dateFilter);
     }
-
-    // Filter by material
     if (materialFilter !== 'all') {
-        filteredData = filteredData.filter(q => q.material === materialFilter);
+        params.set('material', materialFilter);
+    }
+
+    try {
+        const response = await fetch(`/history/stats?${params}`);
+        const result = await response.json();
+        if (result.success) {
+            historySeries = result.series;
+        }
+    } catch (error) {
+        console.error('Failed to load history chart:', error);
     }
 
-    // Prepare chart data
-    const labels = filteredData.slice().reverse().map(q => {
+    // Prepare chart data (series is already oldest first)
+    const labels = historySeries.map(q => {
         const date = new Date(q.timestamp);
         return date.toLocaleDateString();
     });
 
-    const costData = filteredData.slice().reverse().map(q => q.totalCost);
+    const costData = historySeries.map(q => q.totalCost);
 
     // Destroy existing chart
     if (historyChart) {
@@ -1932,57 +2677,135 @@ function loadHistoryEntry(entryId) {
 }
 
 // Delete a history entry
-function deleteHistoryEntry(entryId) {
+async function deleteHistoryEntry(entryId) {
     if (!confirm('Delete this quote from history?')) return;
 
-    quoteHistory = quoteHistory.filter(q => q.id !== entryId);
-    saveHistory();
+    await fetch(`/history/${entryId}`, { method: 'DELETE' });
     updateHistoryDisplay();
     showMessage('Quote deleted from history', 'success');
 }
 
 // Clear all history
-function clearHistory() {
+async function clearHistory() {
     if (!confirm('Clear all quote history? This cannot be undone.')) return;
 
-    quoteHistory = [];
-    saveHistory();
+    await fetch('/history', { method: 'DELETE' });
     updateHistoryDisplay();
     showMessage('History cleared', 'success');
 }
 
+// Fetch every history entry, page by page
+async function fetchAllHistory() {
+    const entries = [];
+    let page = 1;
+    while (true) {
+        const response = await fetch(`/history?page=${page}&per_page=1000`);
+        const result = await response.json();
+        if (!result.success) {
+            throw new Error(result.error);
+        }
+        entries.push(...result.entries);
+        if (entries.length >= result.total || result.entries.length === 0) {
+            return entries;
+        }
+        page++;
+    }
+}
+
 // Export history to Excel
-function exportHistoryToExcel() {
-    if (quoteHistory.length === 0) {
+async function exportHistoryToExcel() {
+    const allHistory = await fetchAllHistory();
+    if (allHistory.length === 0) {
         showMessage('No history to export', 'error');
         return;
     }
 
-    // Create workbook
-    const wb = XLSX.utils.book_new();
+    await exportQuoteWorkbook({
+        title: 'Quote History',
+        custom_margin: parseFloat(document.getElementById('custom_margin').value) || 75,
+        quotes: allHistory.map(entry => ({
+            part_name: entry.partName,
+            material: entry.material,
+            weight: entry.weight,
+            print_time: entry.printTime,
+            quantity: 1,
+            date: new Date(entry.timestamp).toLocaleString(),
+            material_cost: entry.breakdown.material,
+            labor_cost: entry.breakdown.labor,
+            machine_cost: entry.breakdown.machine,
+            packaging_cost: entry.breakdown.packaging
+        }))
+    }, `printforge_history_${new Date().toISOString().split('T')[0]}.xlsx`);
+}
+
+// Export several quotes as one server-generated workbook (summary + one sheet per part)
+async function exportQuoteWorkbook(payload, defaultFilename) {
+    try {
+        // Desktop mode: the workbook is built and written to the chosen path in-process
+        if (isDesktopMode()) {
+            const filepath = await window.pywebview.api.save_file_dialog(
+                defaultFilename,
+                'Excel Files (*.xlsx)'
+            );
+
+            if (!filepath) {
+                // User cancelled
+                return;
+            }
+
+            const result = await window.pywebview.api.export_workbook(payload, filepath);
+            if (result.success) {
+                showMessage('Excel file exported!', 'success');
+            } else {
+                showMessage('Export failed: ' + result.error, 'error');
+            }
+            return;
+        }
+
+        // Web mode: queue the workbook and download it once it is built
+        const response = await fetch('/jobs/export-workbook', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ ...payload, filename: defaultFilename })
+        });
+
+        const job = await response.json();
+        if (!job.success) {
+            showMessage('Export failed: ' + job.error, 'error');
+            return;
+        }
 
-    // Prepare data for history sheet
-    const historyData = quoteHistory.map(entry => ({
-        'Date': new Date(entry.timestamp).toLocaleString(),
-        'Part Name': entry.partName,
-        'Material': entry.material,
-        'Weight (g)': entry.weight,
-        'Print Time (h)': entry.printTime,
-        'Material Cost': entry.breakdown.material,
-        'Labor Cost': entry.breakdown.labor,
-        'Machine Cost': entry.breakdown.machine,
-        'Packaging Cost': entry.breakdown.packaging,
-        'Total Cost': entry.totalCost
-    }));
+        const status = await waitForExportJob(job.status_url);
+        if (status.status !== 'done') {
+            showMessage('Export failed: ' + status.error, 'error');
+            return;
+        }
 
-    const ws = XLSX.utils.json_to_sheet(historyData);
-    XLSX.utils.book_append_sheet(wb, ws, 'Quote History');
+        const a = document.createElement('a');
+        a.href = job.result_url;
+        a.download = defaultFilename;
+        a.click();
 
-    // Save file
-    const filename = `printforge_history_${new Date().toISOString().split('T')[0]}.xlsx`;
-    XLSX.writeFile(wb, filename);
+        showMessage('Excel file exported!', 'success');
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
 
-    showMessage('History exported to Excel', 'success');
+// Poll an export job until it finishes or fails
+async function waitForExportJob(statusUrl) {
+    let delay = 200;
+    while (true) {
+        const response = await fetch(statusUrl);
+        const status = await response.json();
+        if (!status.success || status.status === 'done' || status.status === 'failed') {
+            return status;
+        }
+        await new Promise(resolve => setTimeout(resolve, delay));
+        delay = Math.min(delay * 2, 2000);
+    }
 }
 
 // ============================================================
@@ -2020,12 +2843,7 @@ async function exportToPDF() {
         const data = collectFormData();
 
         // Calculate if not already done
-        const response = await fetch('/calculate', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(data)
-        });
-        const result = await response.json();
+        const result = await fetchQuote(data);
 
         if (!result.success) {
             showMessage('Please calculate quote first', 'error');
@@ -2372,10 +3190,11 @@ async function exportBatchToPDF() {
 
 let comparisonSlots = [];
 let comparisonIdCounter = 0;
+const MAX_COMPARISON_SLOTS = 20;
 
 function addCompareSlot() {
-    if (comparisonSlots.length >= 3) {
-        showMessage('Maximum 3 comparison slots', 'error');
+    if (comparisonSlots.length >= MAX_COMPARISON_SLOTS) {
+        showMessage(`Maximum ${MAX_COMPARISON_SLOTS} comparison slots`, 'error');
         return;
     }
 
@@ -2386,7 +3205,9 @@ function addCompareSlot() {
         material: 'PLA',
         weight: 50,
         printTime: 2,
-        cost: null
+        cost: null,
+        rank: null,
+        delta: null
     };
 
     comparisonSlots.push(slotData);
@@ -2445,6 +3266,12 @@ function renderComparisonSlots() {
                         <div class="result-label">Total Cost:</div>
                         <div class="result-value">NZD $${slot.cost.toFixed(2)}</div>
                     </div>
+                    ${slot.rank !== null ? `
+                        <div class="result-card">
+                            <div class="result-label">Rank:</div>
+                            <div class="result-value">#${slot.rank}${slot.delta > 0 ? ` (+NZD $${slot.delta.toFixed(2)}, +${slot.deltaPercent.toFixed(1)}%)` : ' (cheapest)'}</div>
+                        </div>
+                    ` : ''}
                 ` : '<p class="empty-state">Click Calculate</p>'}
             </div>
         </div>
@@ -2456,6 +3283,7 @@ function updateSlotField(slotId, field, value) {
     if (slot) {
         slot[field] = field === 'material' ? value : parseFloat(value);
         slot.cost = null; // Reset cost when inputs change
+        comparisonSlots.forEach(s => s.rank = null); // Ranking is stale
         renderComparisonSlots();
     }
 }
@@ -2481,16 +3309,12 @@ async function calculateCompareSlot(slotId) {
     };
 
     try {
-        const response = await fetch('/calculate', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(slotData)
-        });
-
-        const result = await response.json();
+        const result = await fetchQuote(slotData);
 
         if (result.success) {
             slot.cost = result.total_cost;
+            slot.result = result;
+            comparisonSlots.forEach(s => s.rank = null); // Ranking is stale
             renderComparisonSlots();
             showMessage(`${slot.name} calculated`, 'success');
         } else {
@@ -2501,6 +3325,80 @@ async function calculateCompareSlot(slotId) {
     }
 }
 
+// Price every option in one /compare request and rank them against the cheapest
+async function calculateAllCompareSlots() {
+    if (comparisonSlots.length === 0) {
+        showMessage('Add at least one option to compare', 'error');
+        return;
+    }
+
+    try {
+        const payload = {
+            ...collectFormData(),
+            scenarios: comparisonSlots.map(slot => ({
+                name: slot.name,
+                material_type: slot.material,
+                filament_required: slot.weight,
+                print_time: slot.printTime
+            }))
+        };
+
+        let data;
+        if (isDesktopMode()) {
+            data = await window.pywebview.api.compare(payload);
+        } else {
+            const response = await fetch('/compare', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(payload)
+            });
+            data = await response.json();
+        }
+        if (!data.success) {
+            showMessage('Comparison failed: ' + data.error, 'error');
+            return;
+        }
+
+        data.results.forEach(row => {
+            const slot = comparisonSlots[row.index];
+            slot.cost = row.total_cost;
+            slot.result = row;
+            slot.rank = row.rank;
+            slot.delta = row.delta;
+            slot.deltaPercent = row.delta_percent;
+        });
+        renderComparisonSlots();
+        showMessage(`Compared ${data.count} options - cheapest: ${data.cheapest}`, 'success');
+    } catch (error) {
+        showMessage('Error: ' + error.message, 'error');
+    }
+}
+
+// Export calculated comparison options to Excel
+async function exportComparisonToExcel() {
+    const calculated = comparisonSlots.filter(slot => slot.cost !== null && slot.result);
+    if (calculated.length === 0) {
+        showMessage('No calculated options to export. Calculate at least one option first.', 'error');
+        return;
+    }
+
+    await exportQuoteWorkbook({
+        title: 'Quote Comparison',
+        custom_margin: parseFloat(document.getElementById('custom_margin').value) || 75,
+        quotes: calculated.map(slot => ({
+            part_name: slot.name,
+            material: slot.material,
+            weight: slot.weight,
+            print_time: slot.printTime,
+            quantity: 1,
+            material_cost: slot.result.material_cost,
+            labor_cost: slot.result.labor_cost,
+            machine_cost: slot.result.machine_cost_total,
+            packaging_cost: slot.result.packaging_cost
+        }))
+    }, `printforge_comparison_${new Date().toISOString().split('T')[0]}.xlsx`);
+}
+
 function removeCompareSlot(slotId) {
     comparisonSlots = comparisonSlots.filter(s => s.id !== slotId);
     renderComparisonSlots();
@@ -3391,7 +4289,7 @@ let backupSettings = {
     lastBackup: null
 };
 
-// Load backup settings and backups from localStorage
+// Load backup settings from localStorage and move any browser-kept backups to the server
 function loadBackupSettings() {
     const saved = localStorage.getItem('printforge_backup_settings');
     if (saved) {
@@ -3402,29 +4300,58 @@ function loadBackupSettings() {
         }
     }
 
-    const savedBackups = localStorage.getItem('printforge_backups');
-    if (savedBackups) {
-        try {
-            backups = JSON.parse(savedBackups);
-        } catch (e) {
-            console.error('Error loading backups:', e);
-        }
-    }
+    importLocalBackups();
 
     // Update UI
     updateBackupSettingsUI();
 }
 
+// Backups are stored per browser: a random ID kept in localStorage is sent with every backup request
+function backupClientId() {
+    let clientId = localStorage.getItem('printforge_backup_client');
+    if (!clientId) {
+        clientId = window.crypto?.randomUUID?.() ??
+            Array.from(crypto.getRandomValues(new Uint8Array(16)), b => b.toString(16).padStart(2, '0')).join('');
+        localStorage.setItem('printforge_backup_client', clientId);
+    }
+    return clientId;
+}
+
+function backupHeaders(headers = {}) {
+    return { ...headers, 'X-PrintForge-Client': backupClientId() };
+}
+
+// Backups used to be kept as full copies in localStorage; import them once, then free the space
+let backupImport = null;
+function importLocalBackups() {
+    const savedBackups = localStorage.getItem('printforge_backups');
+    if (!savedBackups || backupImport) return backupImport;
+
+    backupImport = (async () => {
+        try {
+            const response = await fetch('/backups/import', {
+                method: 'POST',
+                headers: backupHeaders({
+                    'Content-Type': 'application/json'
+                }),
+                body: JSON.stringify({ backups: JSON.parse(savedBackups) })
+            });
+            const result = await response.json();
+            if (result.success) {
+                localStorage.removeItem('printforge_backups');
+            }
+        } catch (error) {
+            console.error('Backup import failed:', error);
+        }
+    })();
+    return backupImport;
+}
+
 // Save backup settings to localStorage
 function saveBackupSettings() {
     localStorage.setItem('printforge_backup_settings', JSON.stringify(backupSettings));
 }
 
-// Save backups to localStorage
-function saveBackups() {
-    localStorage.setItem('printforge_backups', JSON.stringify(backups));
-}
-
 // Update backup settings UI
 function updateBackupSettingsUI() {
     const enabledCheckbox = document.getElementById('backup_enabled');
@@ -3496,84 +4423,70 @@ document.getElementById('backup_auto_download')?.addEventListener('change', func
     });
 });
 
-// Create a backup
-function createBackup(isManual = false) {
-    const backup = {
-        id: Date.now().toString(),
-        timestamp: new Date().toISOString(),
-        type: isManual ? 'Manual' : 'Automatic',
-        data: {}
-    };
+// Gather the data types selected in the backup settings
+function collectBackupData() {
+    const data = {};
 
-    // Collect data based on settings
     if (backupSettings.include.settings) {
-        backup.data.settings = {
+        // lastBackup changes every time; leaving it out lets unchanged settings be deduplicated
+        const { lastBackup, ...settings } = backupSettings;
+        data.settings = {
             theme: localStorage.getItem('theme'),
-            backupSettings: backupSettings
+            backupSettings: settings
         };
     }
 
-    if (backupSettings.include.clients) {
-        backup.data.clients = localStorage.getItem('printforge_clients');
-    }
-
-    if (backupSettings.include.templates) {
-        backup.data.templates = localStorage.getItem('printforge_quote_templates');
-    }
-
-    if (backupSettings.include.inventory) {
-        backup.data.inventory = localStorage.getItem('printforge_inventory');
-    }
-
-    if (backupSettings.include.history) {
-        backup.data.history = localStorage.getItem('printforge_history');
-    }
-
-    if (backupSettings.include.profiles) {
-        backup.data.profiles = localStorage.getItem('printforge_profiles');
-    }
-
-    if (backupSettings.include.presets) {
-        backup.data.presets = localStorage.getItem('printforge_material_presets');
-    }
+    ['clients', 'templates', 'inventory', 'history', 'profiles', 'presets'].forEach(type => {
+        if (backupSettings.include[type]) {
+            data[type] = localStorage.getItem(getStorageKeyForDataType(type));
+        }
+    });
 
-    // Calculate backup stats
-    const dataStr = JSON.stringify(backup.data);
-    backup.size = new Blob([dataStr]).size;
-    backup.itemCount = Object.keys(backup.data).length;
-    backup.dataTypes = Object.keys(backup.data);
+    return data;
+}
 
-    // Add to backups array
-    backups.unshift(backup);
+// Create a backup on the server (only data types that changed since the last snapshot are stored)
+async function createBackup(isManual = false) {
+    const response = await fetch('/backups', {
+        method: 'POST',
+        headers: backupHeaders({
+            'Content-Type': 'application/json'
+        }),
+        body: JSON.stringify({
+            type: isManual ? 'Manual' : 'Automatic',
+            data: collectBackupData()
+        })
+    });
 
-    // Keep only last 30 backups
-    if (backups.length > 30) {
-        backups = backups.slice(0, 30);
+    const result = await response.json();
+    if (!result.success) {
+        throw new Error(result.error);
     }
 
-    // Save backups
-    saveBackups();
-
     // Update last backup time
-    backupSettings.lastBackup = backup.timestamp;
+    backupSettings.lastBackup = result.backup.timestamp;
     saveBackupSettings();
     updateBackupSettingsUI();
 
-    return backup;
+    return result.backup;
 }
 
 // Create manual backup
-function createManualBackup() {
-    const backup = createBackup(true);
-    showMessage('Backup created successfully!', 'success');
+async function createManualBackup() {
+    try {
+        const backup = await createBackup(true);
+        showMessage('Backup created successfully!', 'success');
 
-    // Auto-download if enabled
-    if (backupSettings.autoDownload) {
-        exportBackup(backup.id);
-    }
+        // Auto-download if enabled
+        if (backupSettings.autoDownload) {
+            exportBackup(backup.id);
+        }
 
-    // Refresh backup history (now using tab instead of modal)
-    loadBackupHistory();
+        // Refresh backup history (now using tab instead of modal)
+        loadBackupHistory();
+    } catch (error) {
+        showMessage('Backup failed: ' + error.message, 'error');
+    }
 }
 
 // Schedule next automatic backup
@@ -3602,13 +4515,19 @@ function scheduleNextBackup() {
         nextBackupTime = now;
     }
 
-    // If it's time for backup, create one
+    // If it's time for backup, create one when the page is idle
     if (now >= nextBackupTime) {
-        const backup = createBackup(false);
-
-        if (backupSettings.autoDownload) {
-            exportBackup(backup.id);
-        }
+        const whenIdle = window.requestIdleCallback || (callback => setTimeout(callback, 0));
+        whenIdle(async () => {
+            try {
+                const backup = await createBackup(false);
+                if (backupSettings.autoDownload) {
+                    exportBackup(backup.id);
+                }
+            } catch (error) {
+                console.error('Automatic backup failed:', error);
+            }
+        });
     }
 }
 
@@ -3623,16 +4542,30 @@ function closeBackupManager() {
 }
 
 // Load and display backup history
-function loadBackupHistory() {
-    console.log('loadBackupHistory called, backups array:', backups);
+async function loadBackupHistory() {
     const tbody = document.getElementById('backup-history-tbody');
-    if (!tbody) {
-        console.error('backup-history-tbody element not found!');
-        return;
+    if (!tbody) return;
+
+    try {
+        await importLocalBackups();
+        const response = await fetch('/backups', { headers: backupHeaders() });
+        const result = await response.json();
+        if (!result.success) {
+            throw new Error(result.error);
+        }
+        backups = result.backups;
+
+        const stats = document.getElementById('backup-storage-stats');
+        if (stats && result.stats.snapshots > 0) {
+            stats.textContent = `${result.stats.snapshots} backups totalling ${(result.stats.size / 1024).toFixed(1)} KB ` +
+                `are stored in ${(result.stats.stored / 1024).toFixed(1)} KB (${result.stats.codec}, unchanged data stored once).`;
+        }
+    } catch (error) {
+        console.error('Failed to load backups:', error);
+        backups = [];
     }
 
     if (backups.length === 0) {
-        console.log('No backups found, showing empty state');
         tbody.innerHTML = `
             <tr>
                 <td colspan="6" style="text-align: center; padding: 20px; color: var(--text-secondary);">
@@ -3643,10 +4576,10 @@ function loadBackupHistory() {
         return;
     }
 
-    console.log('Rendering', backups.length, 'backups');
     tbody.innerHTML = backups.map(backup => {
         const date = new Date(backup.timestamp);
         const sizeKB = (backup.size / 1024).toFixed(2);
+        const storedKB = (backup.stored / 1024).toFixed(2);
         const dataTypes = backup.dataTypes.join(', ');
 
         return `
@@ -3654,16 +4587,16 @@ function loadBackupHistory() {
                 <td>${date.toLocaleString()}</td>
                 <td><span class="badge ${backup.type === 'Manual' ? 'badge-primary' : 'badge-secondary'}">${backup.type}</span></td>
                 <td>${backup.itemCount} categories</td>
-                <td>${sizeKB} KB</td>
+                <td title="New data written by this backup: ${storedKB} KB">${sizeKB} KB (+${storedKB} KB)</td>
                 <td style="max-width: 200px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap;" title="${dataTypes}">${dataTypes}</td>
                 <td>
-                    <button class="btn btn-sm btn-secondary" onclick="restoreBackup('${backup.id}')" title="Restore this backup">
+                    <button class="btn btn-sm btn-secondary" onclick="restoreBackup(${backup.id})" title="Restore this backup">
                         Restore
                     </button>
-                    <button class="btn btn-sm btn-primary" onclick="exportBackup('${backup.id}')" title="Download as JSON">
+                    <button class="btn btn-sm btn-primary" onclick="exportBackup(${backup.id})" title="Download as JSON">
                         Download
                     </button>
-                    <button class="btn btn-sm btn-danger" onclick="deleteBackup('${backup.id}')" title="Delete backup">
+                    <button class="btn btn-sm btn-danger" onclick="deleteBackup(${backup.id})" title="Delete backup">
                         Delete
                     </button>
                 </td>
@@ -3672,28 +4605,27 @@ function loadBackupHistory() {
     }).join('');
 }
 
-// Restore from backup
-function restoreBackup(backupId) {
-    const backup = backups.find(b => b.id === backupId);
-    if (!backup) {
-        showMessage('Backup not found', 'error');
-        return;
-    }
-
-    if (!confirm(`Restore backup from ${new Date(backup.timestamp).toLocaleString()}?\n\nThis will overwrite your current data. This action cannot be undone.`)) {
-        return;
+// Fetch one backup with its data from the server
+async function fetchBackup(backupId) {
+    const response = await fetch(`/backups/${backupId}`, { headers: backupHeaders() });
+    const result = await response.json();
+    if (!result.success) {
+        throw new Error(result.error);
     }
+    return result.backup;
+}
 
-    // Restore data
-    Object.keys(backup.data).forEach(key => {
+// Write restored data back to localStorage and reload
+function applyBackupData(data) {
+    Object.keys(data).forEach(key => {
         if (key === 'settings') {
-            if (backup.data.settings.theme) {
-                localStorage.setItem('theme', backup.data.settings.theme);
+            if (data.settings.theme) {
+                localStorage.setItem('theme', data.settings.theme);
             }
         } else {
             const storageKey = getStorageKeyForDataType(key);
-            if (storageKey && backup.data[key]) {
-                localStorage.setItem(storageKey, backup.data[key]);
+            if (storageKey && data[key]) {
+                localStorage.setItem(storageKey, data[key]);
             }
         }
     });
@@ -3705,6 +4637,52 @@ function restoreBackup(backupId) {
     }, 1500);
 }
 
+// Restore from backup
+async function restoreBackup(backupId) {
+    const summary = backups.find(b => b.id === backupId);
+    if (!summary) {
+        showMessage('Backup not found', 'error');
+        return;
+    }
+
+    if (!confirm(`Restore backup from ${new Date(summary.timestamp).toLocaleString()}?\n\nThis will overwrite your current data. This action cannot be undone.`)) {
+        return;
+    }
+
+    try {
+        const backup = await fetchBackup(backupId);
+        applyBackupData(backup.data);
+    } catch (error) {
+        showMessage('Restore failed: ' + error.message, 'error');
+    }
+}
+
+// Restore every data type as it was at the chosen time
+async function restoreToTime() {
+    const value = document.getElementById('backup_restore_time').value;
+    if (!value) {
+        showMessage('Choose a date and time to restore to', 'error');
+        return;
+    }
+    const at = new Date(value).toISOString();
+
+    if (!confirm(`Restore your data as it was at ${new Date(at).toLocaleString()}?\n\nThis will overwrite your current data. This action cannot be undone.`)) {
+        return;
+    }
+
+    try {
+        const response = await fetch(`/backups/restore?at=${encodeURIComponent(at)}`, { headers: backupHeaders() });
+        const result = await response.json();
+        if (!result.success) {
+            showMessage('Restore failed: ' + result.error, 'error');
+            return;
+        }
+        applyBackupData(result.backup.data);
+    } catch (error) {
+        showMessage('Restore failed: ' + error.message, 'error');
+    }
+}
+
 // Get localStorage key for data type
 function getStorageKeyForDataType(type) {
     const keyMap = {
@@ -3720,8 +4698,10 @@ function getStorageKeyForDataType(type) {
 
 // Export backup to JSON file
 async function exportBackup(backupId) {
-    const backup = backups.find(b => b.id === backupId);
-    if (!backup) {
+    let backup;
+    try {
+        backup = await fetchBackup(backupId);
+    } catch (error) {
         showMessage('Backup not found', 'error');
         return;
     }
@@ -3743,19 +4723,7 @@ async function exportBackup(backupId) {
             return;
         }
 
-        const response = await fetch('/save-file-to-path', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                filepath: filepath,
-                content: dataStr,
-                content_type: 'json'
-            })
-        });
-
-        const result = await response.json();
+        const result = await window.pywebview.api.save_text(filepath, dataStr);
         if (result.success) {
             showMessage('Backup exported!', 'success');
         } else {
@@ -3779,7 +4747,7 @@ async function exportBackup(backupId) {
 }
 
 // Delete backup
-function deleteBackup(backupId) {
+async function deleteBackup(backupId) {
     const backup = backups.find(b => b.id === backupId);
     if (!backup) return;
 
@@ -3787,20 +4755,18 @@ function deleteBackup(backupId) {
         return;
     }
 
-    backups = backups.filter(b => b.id !== backupId);
-    saveBackups();
+    await fetch(`/backups/${backupId}`, { method: 'DELETE', headers: backupHeaders() });
     loadBackupHistory();
     showMessage('Backup deleted', 'info');
 }
 
 // Clear all backup history
-function clearBackupHistory() {
+async function clearBackupHistory() {
     if (!confirm('Delete all backups? This cannot be undone.\n\nConsider exporting important backups before clearing.')) {
         return;
     }
 
-    backups = [];
-    saveBackups();
+    await fetch('/backups', { method: 'DELETE', headers: backupHeaders() });
     loadBackupHistory();
     showMessage('All backups cleared', 'info');
 }
@@ -3824,25 +4790,7 @@ function restoreFromFile(event) {
                 return;
             }
 
-            // Restore data
-            Object.keys(backup.data).forEach(key => {
-                if (key === 'settings') {
-                    if (backup.data.settings.theme) {
-                        localStorage.setItem('theme', backup.data.settings.theme);
-                    }
-                } else {
-                    const storageKey = getStorageKeyForDataType(key);
-                    if (storageKey && backup.data[key]) {
-                        localStorage.setItem(storageKey, backup.data[key]);
-                    }
-                }
-            });
-
-            showMessage('Backup restored successfully! Reloading page...', 'success');
-
-            setTimeout(() => {
-                location.reload();
-            }, 1500);
+            applyBackupData(backup.data);
 
         } catch (error) {
             console.error('Error restoring backup:', error);
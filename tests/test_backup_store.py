@@ -0,0 +1,22 @@
+import backup_store
+from backup_store import BackupStore
+
+
+def test_chunk_inserted_by_another_worker_is_not_counted(tmp_path, monkeypatch):
+    first = BackupStore(tmp_path / 'backups.db')
+    second = BackupStore(tmp_path / 'backups.db')
+    data = {'settings': {'printer_cost': 1100}}
+    compress = backup_store.compress
+
+    def racing_compress(raw):
+        # The other worker stores the same chunk after this one looked for it
+        monkeypatch.setattr(backup_store, 'compress', compress)
+        second.create('client-b', data)
+        return compress(raw)
+
+    monkeypatch.setattr(backup_store, 'compress', racing_compress)
+    snapshot = first.create('client-a', data)
+
+    assert snapshot['stored'] == 0
+    assert second.list('client-b')[0]['stored'] > 0
+    assert first.get('client-a', snapshot['id'])
@@ -0,0 +1,22 @@
+import batch_pricing
+from pricing_engine import Job, RateCard, price
+
+
+def test_row_with_packaging_items_matches_single_quote():
+    row = {
+        'filament_required': 120,
+        'print_time': 4.5,
+        'labor_time': 10,
+        'shipping_cost': 6,
+        'packaging_items': [{'name': 'Box', 'quantity': 2, 'unit_cost': 1.25},
+                            {'name': 'Foam', 'quantity': 1, 'unit_cost': 0.4}],
+    }
+    rate_card = RateCard.from_dict({})
+
+    batch = batch_pricing.price_batch([row, {'filament_required': 10}], rate_card, Job.from_dict({}))
+    single = price(Job.from_dict(row), rate_card)
+
+    for key in batch_pricing.RESULT_COLUMNS:
+        assert batch[key][0] == single[key]
+    assert batch['packaging_cost'][0] == 8.9
+    assert batch['packaging_cost'][1] == 0
@@ -0,0 +1,24 @@
+import pytest
+
+import farm_scheduler
+
+
+def test_fleet_cap_is_checked_before_expanding(monkeypatch):
+    built = []
+    from_dict = farm_scheduler.Printer.from_dict.__func__
+
+    def counting_from_dict(cls, data, base, rate_cards=None):
+        built.append(data['count'])
+        return from_dict(cls, data, base, rate_cards)
+
+    monkeypatch.setattr(farm_scheduler.Printer, 'from_dict', classmethod(counting_from_dict))
+    entries = [{'name': 'MK4', 'count': 1000}] * 1000
+
+    with pytest.raises(ValueError):
+        farm_scheduler.build_fleet(entries, {})
+    assert built == [1000]
+
+
+def test_fleet_within_cap():
+    fleet = farm_scheduler.build_fleet([{'name': 'MK4', 'count': 3}, {'name': 'Mini'}], {})
+    assert [printer.name for printer in fleet] == ['MK4 #1', 'MK4 #2', 'MK4 #3', 'Mini']
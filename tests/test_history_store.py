@@ -0,0 +1,21 @@
+import history_store
+from history_store import HistoryStore
+
+
+def _store(tmp_path, count):
+    store = HistoryStore(tmp_path / 'history.db')
+    store.add_many([{'partName': f'Part {i}', 'totalCost': i} for i in range(count)])
+    return store
+
+
+def test_series_negative_limit_is_clamped(tmp_path):
+    store = _store(tmp_path, 5)
+    assert len(store.series(limit=-1)) == 1
+    assert len(store.series(limit=0)) == 1
+
+
+def test_series_limit_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, 'MAX_SERIES_POINTS', 3)
+    store = _store(tmp_path, 5)
+    assert len(store.series(limit=10 ** 9)) == 3
+    assert len(store.series(limit=2)) == 2
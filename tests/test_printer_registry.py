@@ -0,0 +1,18 @@
+from printer_registry import PrinterRegistry
+
+
+def test_changes_from_another_instance_are_seen(tmp_path):
+    db_path = tmp_path / 'printers.db'
+    first = PrinterRegistry(db_path)
+    second = PrinterRegistry(db_path)
+
+    printer = first.save({'name': 'MK4', 'printer_cost': 1100})
+    assert second.get(printer.id).settings_dict()['printer_cost'] == 1100
+
+    first.save({'name': 'MK4', 'printer_cost': 1500}, printer_id=printer.id)
+    assert second.get(printer.id).settings_dict()['printer_cost'] == 1500
+    assert second.apply({'printer_id': printer.id})['printer_cost'] == 1500
+
+    second.delete(printer.id)
+    assert first.get(printer.id) is None
+    assert len(first) == 0